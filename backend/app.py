@@ -1,32 +1,167 @@
-import json
-import networkx as nx  # type: ignore
 from networkx.readwrite import json_graph  # type: ignore
-from community_detection import detect_communities, analyze_centrality
-from graph_operations import calculate_graph_metrics
+from community_detection import (
+    get_centrality,
+    get_community_activity,
+    get_community_labels,
+    get_partition,
+)
+from community_profiles import get_community_profiles
+from community_quotient import get_community_quotient
+from community_engines import DEFAULT_ENGINE, ENGINES
+from geo import GeocodeCache, get_location_index
+from graph_export import COMMUNITY_FIELD, parse_cursor, parse_fields, stream_node_link
+from graph_operations import calculate_graph_metrics, get_interest_counts
+from interest_index import get_interest_index
+from layout_engine import graph_layout
+from columnar import build_graph_from_dataset, open_fresh_dataset
+from compact_graph import MISSING_TIMESTAMP, get_compact_graph, parse_timestamp
+from graph_store import GraphStore
+from http_cache import ResponseCache, versioned
+from ingest import aggregate_edges, build_graph_streaming, iter_records
+from live_ingest import InteractionLog, ingest_interactions, validate_interaction
+from rollups import DEFAULT_GRANULARITY, get_interaction_rollup
+from recommendations import DEFAULT_LIMIT, MAX_LIMIT, recommend_connections
+from render_cache import (
+    DEFAULT_DPI,
+    DEFAULT_LAYOUT_SEED,
+    RenderCache,
+    cache_key,
+    draw_png,
+)
 import os
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, url_for
 from flask import send_file
-import matplotlib.pyplot as plt
-from chatbot import get_chatbot_response
+from chat_data import ChatDataClient
+from chat_sessions import new_conversation_id, validate_conversation_id
+from chatbot import chat_cache, chat_sessions, get_chatbot_response
 from flask_cors import CORS
-import random
-
 
 # Get the absolute path to the data files
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 USERS_FILE = os.path.join(BASE_DIR, "data/users.json")
 INTERACTIONS_FILE = os.path.join(BASE_DIR, "data/interactions.json")
+# Interactions posted to /api/interactions, replayed on top of INTERACTIONS_FILE
+INTERACTIONS_LOG_FILE = os.path.join(BASE_DIR, "data/interactions_log.jsonl")
+# Compiled columnar snapshot (see columnar.py), used when it matches the JSON files
+SNAPSHOT_DIR = os.path.join(BASE_DIR, "data/snapshot")
+# Location -> coordinates cache used by /api/geographic-insights
+GEOCODE_CACHE_FILE = os.path.join(BASE_DIR, "data/geocode_cache.sqlite")
+# Worker processes for centrality computation (1 = serial)
+CENTRALITY_WORKERS = int(os.getenv("CENTRALITY_WORKERS", "1"))
+# Default community engine (greedy, louvain or leiden); ?engine= overrides it
+COMMUNITY_ENGINE = os.getenv("COMMUNITY_ENGINE", DEFAULT_ENGINE)
+# Rendered visualizations and their layouts, keyed by data version and parameters
+RENDER_DIR = os.path.join(BASE_DIR, "data/renders")
+# Background threads rendering visualizations
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "1"))
+# Memory budget for cached (compressed) API responses
+RESPONSE_CACHE_MB = int(os.getenv("RESPONSE_CACHE_MB", "64"))
+# Threads fetching API data for chat messages
+CHAT_WORKERS = int(os.getenv("CHAT_WORKERS", "8"))
 app = Flask(__name__)
 CORS(app)
 
 
-def generate_random_coordinates():
-    """
-    Generate random coordinates for latitude and longitude.
-    """
-    latitude = random.uniform(-90, 90)
-    longitude = random.uniform(-180, 180)
-    return {"latitude": latitude, "longitude": longitude}
+def centrality_options():
+    """
+    Read centrality mode options (?mode=approx&k=256&epsilon=0.05&seed=42) from the query string.
+    """
+    options = {"mode": request.args.get("mode", "exact"), "workers": CENTRALITY_WORKERS}
+    if options["mode"] not in ("exact", "approx"):
+        raise ValueError("mode must be 'exact' or 'approx'.")
+    if "k" in request.args:
+        options["k"] = request.args.get("k", type=int)
+    if "epsilon" in request.args:
+        options["epsilon"] = request.args.get("epsilon", type=float)
+    if "seed" in request.args:
+        options["seed"] = request.args.get("seed", type=int)
+    if any(value is None for value in options.values()):
+        raise ValueError("k and seed must be integers, epsilon a number.")
+    if options.get("k") is not None and options["k"] < 1:
+        raise ValueError("k must be positive.")
+    if options.get("epsilon") is not None and not 0 < options["epsilon"] < 1:
+        raise ValueError("epsilon must be between 0 and 1.")
+    return options
+
+
+def page_options():
+    """
+    Read pagination options (?limit=20&offset=0) from the query string.
+
+    :return: (limit, offset).
+    """
+    options = {"limit": DEFAULT_LIMIT, "offset": 0}
+    for name in options:
+        if name in request.args:
+            options[name] = request.args.get(name, type=int)
+            if options[name] is None:
+                raise ValueError(f"{name} must be an integer.")
+    if not 0 < options["limit"] <= MAX_LIMIT or options["offset"] < 0:
+        raise ValueError(f"limit must be 1-{MAX_LIMIT} and offset non-negative.")
+    return options["limit"], options["offset"]
+
+
+def community_options():
+    """
+    Read community engine options (?engine=louvain&community_seed=42) from the query string.
+    """
+    options = {"engine": request.args.get("engine", COMMUNITY_ENGINE)}
+    if options["engine"] not in ENGINES:
+        raise ValueError(f"engine must be one of {', '.join(ENGINES)}.")
+    if "community_seed" in request.args:
+        options["seed"] = request.args.get("community_seed", type=int)
+        if options["seed"] is None:
+            raise ValueError("community_seed must be an integer.")
+    return options
+
+
+def render_options():
+    """
+    Read visualization options (?layout_seed=42&dpi=100) from the query string.
+    """
+    options = {
+        "layout_seed": request.args.get("layout_seed", DEFAULT_LAYOUT_SEED, type=int),
+        "dpi": request.args.get("dpi", DEFAULT_DPI, type=int),
+    }
+    if options["layout_seed"] is None:
+        raise ValueError("layout_seed must be an integer.")
+    if options["dpi"] is None or not 20 <= options["dpi"] <= 300:
+        raise ValueError("dpi must be an integer between 20 and 300.")
+    return options
+
+
+def geo_options():
+    """
+    Read spatial query options (?bbox=min_lon,min_lat,max_lon,max_lat or ?near=lat,lon&k=5).
+    """
+    options = {}
+    for name, size in (("bbox", 4), ("near", 2)):
+        if name in request.args:
+            try:
+                values = [float(v) for v in request.args[name].split(",")]
+            except ValueError:
+                values = []
+            if len(values) != size:
+                raise ValueError(f"{name} must be {size} comma-separated numbers.")
+            options[name] = values
+    if len(options) > 1:
+        raise ValueError("Use either bbox or near, not both.")
+    if "bbox" in options:
+        min_lon, min_lat, max_lon, max_lat = options["bbox"]
+        if not (
+            -180 <= min_lon <= 180
+            and -180 <= max_lon <= 180
+            and -90 <= min_lat <= max_lat <= 90
+        ):
+            raise ValueError("bbox must be min_lon,min_lat,max_lon,max_lat in degrees.")
+    if "near" in options:
+        latitude, longitude = options["near"]
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValueError("near must be lat,lon in degrees.")
+        options["k"] = request.args.get("k", 5, type=int)
+        if options["k"] is None or options["k"] < 1:
+            raise ValueError("k must be a positive integer.")
+    return options
 
 
 @app.route("/")
@@ -34,65 +169,98 @@ def index():
     return "Social Media Analytics Backend is running!"
 
 
-def load_data_from_file(file_path):
+def build_graph_from_files(
+    users_file=USERS_FILE,
+    interactions_file=INTERACTIONS_FILE,
+    interactions_log_file=INTERACTIONS_LOG_FILE,
+):
     """
-    Load data from a JSON file.
+    Build a NetworkX graph from the compiled snapshot, or by streaming the JSON files.
+
+    Interactions received through the API are then replayed from the log.
+    Without any, the snapshot's memory-mapped compact graph is returned
+    alongside, as a derived value, so it is not rebuilt from the graph.
     """
     try:
-        print(f"Loading data from file: {file_path}")  # Debugging print statement
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
-        with open(file_path, "r") as file:
-            data = json.load(file)
-        return data
-    except FileNotFoundError as e:
-        raise Exception(f"File not found: {file_path}")
-    except json.JSONDecodeError as e:
-        raise Exception(f"Error decoding JSON: {e}")
+        derived = {}
+        dataset = open_fresh_dataset(SNAPSHOT_DIR, users_file, interactions_file)
+        if dataset is not None:
+            print(f"Loading graph from snapshot: {SNAPSHOT_DIR}")
+            graph = build_graph_from_dataset(dataset)
+            derived["compact_graph"] = dataset.compact_graph()
+        else:
+            graph = build_graph_streaming(users_file, interactions_file)
+
+        if os.path.exists(interactions_log_file):
+            aggregate_edges(graph, iter_records(interactions_log_file))
+            derived.clear()
 
+        # Print the number of nodes and edges
+        print(
+            f"Graph has {graph.number_of_nodes()} nodes and {graph.number_of_edges()} edges."
+        )
 
-def build_graph_from_files(users_file=USERS_FILE, interactions_file=INTERACTIONS_FILE):
-    """
-    Build a NetworkX graph using data from JSON files.
+        return graph, derived
+    except Exception as e:
+        raise Exception(f"Error building graph: {e}")
+
+
+# Shared graph snapshot, rebuilt only when the data files change
+graph_store = GraphStore(
+    build_graph_from_files, (USERS_FILE, INTERACTIONS_FILE, INTERACTIONS_LOG_FILE)
+)
+interaction_log = InteractionLog(INTERACTIONS_LOG_FILE)
+geocode_cache = GeocodeCache(GEOCODE_CACHE_FILE)
+response_cache = ResponseCache(RESPONSE_CACHE_MB * 2**20)
+
+
+def data_tag():
     """
-    try:
-        # Load users data from file
-        users_data = load_data_from_file(users_file)
-        users = users_data.get("users", [])
-        print("Loaded users snippets:")
-        print("Users:", users[:2])  # Print first 2 users
+    Return (tag, last_modified) of the current data for HTTP validators.
 
-        # Load interactions data from file
-        interactions_data = load_data_from_file(interactions_file)
-        interactions = interactions_data.get("interactions", [])
-        print("Loaded interactions snippets:")
-        print("Interactions:", interactions[:2])  # Print first 2 interactions
+    The default community engine changes responses too, so it is part of the tag.
+    """
+    snapshot = graph_store.snapshot()
+    return f"{snapshot.tag}-{COMMUNITY_ENGINE}", snapshot.last_modified
 
-        graph = nx.Graph()
 
-        # Add nodes (users)
-        for user in users:
-            user_id = user.get("user_id")
-            if not user_id:
-                continue  # Skip if no user_id is present
+cached = versioned(response_cache, data_tag)
+render_cache = RenderCache(RENDER_DIR, workers=RENDER_WORKERS)
+# The chatbot calls the API in-process rather than over HTTP
+chat_data = ChatDataClient(app, workers=CHAT_WORKERS, data_tag=lambda: data_tag()[0])
 
-            graph.add_node(user_id, **user)
 
-        # Add edges (interactions)
-        for interaction in interactions:
-            source_user = interaction.get("source_user")
-            target_user = interaction.get("target_user")
-            if source_user and target_user:
-                graph.add_edge(source_user, target_user, **interaction)
+def graph_positions(snapshot, layout_seed):
+    """
+    Return the full-graph layout {node: (x, y)} of a snapshot, warm-started from the previous one.
+    """
 
-        # Print the number of nodes and edges
-        print(
-            f"Graph has {graph.number_of_nodes()} nodes and {graph.number_of_edges()} edges."
+    def compute():
+        return render_cache.layout(
+            cache_key(snapshot.tag, "graph", layout_seed),
+            lambda initial: graph_layout(
+                snapshot.graph, seed=layout_seed, initial=initial
+            ),
+            family=("graph", layout_seed),
         )
 
-        return graph
-    except Exception as e:
-        raise Exception(f"Error building graph: {e}")
+    return snapshot.derived(("graph_layout", layout_seed), compute)
+
+
+def render_response(job):
+    """
+    Serve a finished render, or 202 with the job to poll while it is in progress.
+    """
+    if job.status == "done":
+        return send_file(job.path, mimetype="image/png", max_age=0)
+    if job.status == "failed":
+        return jsonify({"error": job.error, **job.to_dict()}), 500
+    status_url = url_for("render_job", job_id=job.job_id)
+    return (
+        jsonify({**job.to_dict(), "status_url": status_url}),
+        202,
+        {"Location": status_url},
+    )
 
 
 @app.route("/api/load-data", methods=["GET"])
@@ -101,22 +269,24 @@ def load_data():
     Fetch social media data from JSON files, but only return a success message.
     """
     try:
-        # Load the users data but don't return the interactions
-        load_data_from_file(USERS_FILE).get("users", [])
-        load_data_from_file(INTERACTIONS_FILE).get("interactions", [])
+        # Refresh the shared snapshot but don't return the data
+        snapshot = graph_store.snapshot()
 
-        return jsonify({"message": "Data loaded successfully."})
+        return jsonify(
+            {"message": "Data loaded successfully.", "version": snapshot.version}
+        )
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @app.route("/api/graph-metrics", methods=["GET"])
+@cached
 def get_graph_metrics():
     """
     Endpoint to fetch graph metrics.
     """
     try:
-        graph = build_graph_from_files()
+        graph = graph_store.graph()
         metrics = calculate_graph_metrics(graph)
         return jsonify(metrics)
     except Exception as e:
@@ -124,20 +294,31 @@ def get_graph_metrics():
 
 
 @app.route("/api/community-insights", methods=["GET"])
+@cached
 def get_community_insights():
     """
     Endpoint to fetch detected communities.
     """
     try:
-        graph = build_graph_from_files()
-        communities = detect_communities(graph)
+        options = centrality_options()
+        community = community_options()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        snapshot = graph_store.snapshot()
+        partition = get_partition(snapshot, **community)
+        centrality = get_centrality(snapshot, **options)
 
         insights = {
-            "number_of_communities": len(communities),
-            "modularity": nx.algorithms.community.modularity(graph, communities),
-            "communities": [list(community) for community in communities],
-            "centrality": analyze_centrality(graph),
+            "engine": community["engine"],
+            "number_of_communities": len(partition),
+            "modularity": partition.modularity,
+            "communities": [list(community) for community in partition],
+            "centrality": centrality.as_dict(),
         }
+        if centrality.info:
+            insights["approximation"] = centrality.info
 
         return jsonify(insights)
     except Exception as e:
@@ -145,45 +326,66 @@ def get_community_insights():
 
 
 @app.route("/api/users", methods=["GET"])
+@cached
 def get_users():
     """
-    Endpoint to fetch the list of all users.
+    Endpoint to fetch the list of all users, optionally filtered by ?interest= (repeatable, &match=any).
     """
+    interests = request.args.getlist("interest")
+    match = request.args.get("match", "all")
+    if match not in ("all", "any"):
+        return jsonify({"error": "match must be 'all' or 'any'."}), 400
+
     try:
-        users = load_data_from_file(USERS_FILE).get("users", [])
+        snapshot = graph_store.snapshot()
+        graph = snapshot.graph
+        if interests:
+            nodes = get_interest_index(snapshot).users_with(interests, match=match)
+        else:
+            nodes = graph.nodes
+        users = [graph.nodes[n] for n in nodes if "user_id" in graph.nodes[n]]
         return jsonify({"users": users})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @app.route("/api/user-community/<user_id>", methods=["GET"])
+@cached
 def get_user_community(user_id):
     """
     Endpoint to fetch the community of a specific user.
     """
     try:
-        graph = build_graph_from_files()
-        communities = detect_communities(graph)
+        community = community_options()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-        for idx, community in enumerate(communities):
-            if user_id in community:
-                return jsonify(
-                    {
-                        "user_id": user_id,
-                        "community_id": idx + 1,
-                        "members": list(community),
-                    }
-                )
+    try:
+        partition = get_partition(graph_store.snapshot(), **community)
 
-        return jsonify({"error": f"User {user_id} not found in any community."}), 404
+        community_id = partition.community_of(user_id)
+        if community_id is None:
+            return (
+                jsonify({"error": f"User {user_id} not found in any community."}),
+                404,
+            )
+
+        return jsonify(
+            {
+                "user_id": user_id,
+                "community_id": community_id,
+                "members": list(partition.members(community_id)),
+            }
+        )
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @app.route("/api/user-search/<user_id>", methods=["GET"])
+@cached
 def search_user(user_id):
     try:
-        graph = build_graph_from_files()
+        graph = graph_store.graph()
         if user_id in graph.nodes:
             return jsonify(graph.nodes[user_id])
         return jsonify({"error": f"User {user_id} not found."}), 404
@@ -192,9 +394,10 @@ def search_user(user_id):
 
 
 @app.route("/api/user-interactions/<user_id>", methods=["GET"])
+@cached
 def user_interactions(user_id):
     try:
-        graph = build_graph_from_files()
+        graph = graph_store.graph()
         if user_id not in graph.nodes:
             return jsonify({"error": f"User {user_id} not found."}), 404
 
@@ -208,124 +411,152 @@ def user_interactions(user_id):
 
 
 @app.route("/api/user-influence/<user_id>", methods=["GET"])
+@cached
 def user_influence(user_id):
     """
     Analyze a user's influence in the network.
     """
     try:
-        graph = build_graph_from_files()
-        if user_id not in graph:
-            return jsonify({"error": f"User {user_id} not found."}), 404
+        options = centrality_options()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-        centrality_metrics = {
-            "degree_centrality": nx.degree_centrality(graph),
-            "betweenness_centrality": nx.betweenness_centrality(graph),
-            "closeness_centrality": nx.closeness_centrality(graph),
-        }
+    try:
+        snapshot = graph_store.snapshot()
+        # Look the user up first: centrality is costly on a cold cache
+        if user_id not in snapshot.graph:
+            return jsonify({"error": f"User {user_id} not found."}), 404
+        centrality = get_centrality(snapshot, **options)
 
-        influence = {
-            metric: centrality.get(user_id, 0)
-            for metric, centrality in centrality_metrics.items()
+        compact = get_compact_graph(snapshot)
+        result = {
+            "user_id": user_id,
+            "influence": centrality.lookup(user_id),
+            "interactions": compact.interaction_totals(compact.index[user_id]),
         }
-        return jsonify({"user_id": user_id, "influence": influence})
+        if centrality.info:
+            result["approximation"] = centrality.info
+        return jsonify(result)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @app.route("/api/influence-analysis", methods=["GET"])
+@cached
 def influence_analysis():
     try:
-        graph = build_graph_from_files()
-        degree_centrality = nx.degree_centrality(graph)
-        betweenness_centrality = nx.betweenness_centrality(graph)
-        closeness_centrality = nx.closeness_centrality(graph)
-        influence_scores = {}
-        for user_id in graph.nodes:
-            avg_score = (
-                degree_centrality.get(user_id, 0)
-                + betweenness_centrality.get(user_id, 0)
-                + closeness_centrality.get(user_id, 0)
-            ) / 3
-
-            influence_scores[user_id] = avg_score
-
-        sorted_influencers = sorted(
-            influence_scores.items(), key=lambda x: x[1], reverse=True
-        )
+        options = centrality_options()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-        return jsonify({"top_influencers": sorted_influencers})
+    try:
+        centrality = get_centrality(graph_store.snapshot(), **options)
+        sorted_influencers = centrality.top_influencers()
+
+        result = {"top_influencers": sorted_influencers}
+        if centrality.info:
+            result["approximation"] = centrality.info
+        return jsonify(result)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @app.route("/api/trending-interests", methods=["GET"])
+@cached
 def trending_topics():
     """
     Identify trending topics across the network.
     """
     try:
-        users_data = load_data_from_file(USERS_FILE).get("users", [])
-        topic_counts = {}
-
-        for user in users_data:
-            for topic in user.get("interests", []):
-                topic_counts[topic] = topic_counts.get(topic, 0) + 1
+        snapshot = graph_store.snapshot()
+        trending = get_interest_index(snapshot).counts()
+        interaction_counts = get_interest_counts(snapshot)
 
-        trending = sorted(topic_counts.items(), key=lambda x: x[1], reverse=True)
         return jsonify(
-            {"trending_interests": [{"interest": k, "count": v} for k, v in trending]}
+            {
+                "trending_interests": [
+                    {
+                        "interest": k,
+                        "count": v,
+                        "interaction_count": interaction_counts.get(k, 0),
+                    }
+                    for k, v in trending
+                ]
+            }
         )
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+def load_all_interactions():
+    """
+    Stream the interactions file followed by the live interaction log.
+    """
+    yield from iter_records(INTERACTIONS_FILE, "interactions")
+    if os.path.exists(INTERACTIONS_LOG_FILE):
+        yield from iter_records(INTERACTIONS_LOG_FILE)
+
+
 @app.route("/api/interaction-trends", methods=["GET"])
+@cached
 def interaction_trends():
     """
-    Analyze interaction trends in the network.
-    """
+    Analyze interaction trends in the network (?granularity=day&from=&to=).
+    """
+    granularity = request.args.get("granularity", DEFAULT_GRANULARITY)
+    bounds = {}
+    for name in ("from", "to"):
+        if name in request.args:
+            bounds[name] = parse_timestamp(request.args[name])
+            if bounds[name] == MISSING_TIMESTAMP:
+                return (
+                    jsonify({"error": f"{name} must be an ISO date or timestamp."}),
+                    400,
+                )
+
     try:
-        interactions_data = load_data_from_file(INTERACTIONS_FILE).get(
-            "interactions", []
+        rollup = get_interaction_rollup(graph_store.snapshot(), load_all_interactions)
+        result = rollup.query(granularity, bounds.get("from"), bounds.get("to"))
+        return jsonify(
+            {
+                "granularity": granularity,
+                "total_interactions": result["total"],
+                "by_type": result["by_type"],
+                "missing_timestamps": rollup.missing,
+                "interaction_trends": result["buckets"],
+            }
         )
-        interaction_counts = {}
-
-        for interaction in interactions_data:
-            timestamp = interaction.get("timestamp", "unknown")
-            interaction_counts[timestamp] = interaction_counts.get(timestamp, 0) + 1
-
-        trends = [
-            {"date": date, "interaction_count": count}
-            for date, count in sorted(interaction_counts.items())
-        ]
-        return jsonify({"interaction_trends": trends})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @app.route("/api/active-communities", methods=["GET"])
+@cached
 def active_communities():
     """
     Identify the most active communities based on interaction frequency.
     """
     try:
-        graph = build_graph_from_files()
-        communities = detect_communities(graph)
+        community = community_options()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-        activity_scores = []
-        for idx, community in enumerate(communities):
-            subgraph = graph.subgraph(community)
-            activity = sum(
-                data.get("weight", 1) for _, _, data in subgraph.edges(data=True)
-            )
-            activity_scores.append(
-                {
-                    "community_id": idx + 1,
-                    "activity_score": activity,
-                    "size": len(community),
-                }
-            )
+    try:
+        snapshot = graph_store.snapshot()
+        partition = get_partition(snapshot, **community)
+        activity = get_community_activity(snapshot, **community)
+
+        activity_scores = [
+            {
+                "community_id": community_id,
+                "activity_score": activity[community_id],
+                "size": len(community),
+            }
+            for community_id, community in partition.items()
+        ]
 
         active_communities = sorted(
             activity_scores, key=lambda x: x["activity_score"], reverse=True
@@ -335,88 +566,200 @@ def active_communities():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/interactions", methods=["POST"])
+def post_interactions():
+    """
+    Record one interaction or a batch ({"interactions": [...]} or a list) and apply it live.
+    """
+    data = request.get_json(silent=True)
+    if isinstance(data, dict) and "interactions" in data:
+        data = data["interactions"]
+    records = data if isinstance(data, list) else [data]
+    if not records:
+        return jsonify({"error": "At least one interaction is required."}), 400
+    try:
+        interactions = [validate_interaction(record) for record in records]
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        snapshot = ingest_interactions(graph_store, interaction_log, interactions)
+        return (
+            jsonify(
+                {
+                    "accepted": len(interactions),
+                    "version": snapshot.version,
+                    "interactions": interactions,
+                }
+            ),
+            201,
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route("/api/recommended-connections/<user_id>", methods=["GET"])
+@cached
 def recommended_connections(user_id):
+    """
+    Recommend friends-of-friends (?scorer=&limit=&offset=) for a user to connect with.
+    """
+    scorer = request.args.get("scorer", "jaccard")
     try:
-        graph = build_graph_from_files()
-        if user_id not in graph.nodes:
+        limit, offset = page_options()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        compact = get_compact_graph(graph_store.snapshot())
+        if user_id not in compact.index:
             return jsonify({"error": f"User {user_id} not found."}), 404
 
-        recommendations = nx.jaccard_coefficient(
-            graph, [(user_id, n) for n in graph.nodes if n != user_id]
-        )
-        sorted_recommendations = sorted(
-            recommendations, key=lambda x: x[2], reverse=True
+        recommendations, total = recommend_connections(
+            compact, user_id, scorer=scorer, limit=limit, offset=offset
         )
         return jsonify(
-            {"user_id": user_id, "recommended_connections": sorted_recommendations}
+            {
+                "user_id": user_id,
+                "scorer": scorer,
+                "total_candidates": total,
+                "limit": limit,
+                "offset": offset,
+                "recommended_connections": recommendations,
+            }
         )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @app.route("/api/recommended-communities/<user_id>", methods=["GET"])
+@cached
 def recommended_communities(user_id):
     """
-    Recommend communities for a user to join.
+    Recommend communities for a user to join (?limit=&offset=), ranked by interest similarity.
     """
     try:
-        graph = build_graph_from_files()
+        limit, offset = page_options()
+        community = community_options()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        snapshot = graph_store.snapshot()
+        graph = snapshot.graph
         if user_id not in graph:
             return jsonify({"error": f"User {user_id} not found."}), 404
 
-        communities = detect_communities(graph)
-        user_interests = set(graph.nodes[user_id].get("interests", []))
-        recommendations = []
+        profiles = get_community_profiles(snapshot, **community)
+        recommendations, total = profiles.recommend(
+            get_interest_index(snapshot), user_id, limit=limit, offset=offset
+        )
+        return jsonify(
+            {
+                "user_id": user_id,
+                "total_candidates": total,
+                "limit": limit,
+                "offset": offset,
+                "recommended_communities": recommendations,
+            }
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        for idx, community in enumerate(communities):
-            community_interests = set()
-            for member in community:
-                community_interests.update(graph.nodes[member].get("interests", []))
 
-            shared_interests = len(user_interests & community_interests)
-            if shared_interests > 0:
-                recommendations.append(
-                    {"community_id": idx + 1, "shared_interests": shared_interests}
-                )
+@app.route("/api/community-profiles", methods=["GET"])
+@cached
+def community_profiles():
+    """
+    Return per-community profiles (?limit=&offset=): interests, size, activity, top locations and members.
+    """
+    try:
+        limit, offset = page_options()
+        community = community_options()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-        recommendations = sorted(
-            recommendations, key=lambda x: x["shared_interests"], reverse=True
+    try:
+        profiles = get_community_profiles(graph_store.snapshot(), **community)
+        return jsonify(
+            {
+                "number_of_communities": len(profiles),
+                "limit": limit,
+                "offset": offset,
+                "profiles": profiles.profiles(limit=limit, offset=offset),
+            }
         )
-        return jsonify({"user_id": user_id, "recommended_communities": recommendations})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @app.route("/api/geographic-insights", methods=["GET"])
+@cached
 def geographic_insights():
+    """
+    Group users by location with cached coordinates (?bbox= to filter, ?near=&k= for nearest).
+    """
     try:
-        graph = build_graph_from_files()
-        location_groups = {}
-        for node, data in graph.nodes(data=True):
-            location = data.get("location")
-            if location:
-                if location not in location_groups:
-                    location_groups[location] = {
-                        "users": [],
-                        "coordinates": generate_random_coordinates(),
-                    }
-                location_groups[location]["users"].append(node)
+        options = geo_options()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        index = get_location_index(graph_store.snapshot(), geocode_cache)
+        if "near" in options:
+            positions, distances = index.nearest(*options["near"], k=options["k"])
+            return jsonify(
+                {
+                    "nearest": [
+                        index.entry(i, distance_km=d)
+                        for i, d in zip(positions.tolist(), distances.tolist())
+                    ]
+                }
+            )
 
+        if "bbox" in options:
+            positions = index.in_bbox(*options["bbox"]).tolist()
+        else:
+            positions = range(len(index))
+        location_groups = {}
+        for i in positions:
+            entry = index.entry(i)
+            location_groups[entry.pop("location")] = entry
         return jsonify(location_groups)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @app.route("/api/full-graph", methods=["GET"])
+@cached
 def get_full_graph():
     """
-    Endpoint to fetch the full graph as JSON.
+    Stream the full graph as node-link JSON (?fields=id,community,weight&limit=&cursor=).
     """
     try:
-        graph = build_graph_from_files()
-        graph_data = json_graph.node_link_data(graph)
-        return jsonify(graph_data)
+        snapshot = graph_store.snapshot()
+        fields = parse_fields(request.args.get("fields"))
+        limit = None
+        if "limit" in request.args:
+            limit = request.args.get("limit", type=int)
+            if limit is None or limit < 1:
+                raise ValueError("limit must be a positive integer.")
+        start = 0
+        if "cursor" in request.args:
+            start = parse_cursor(request.args["cursor"], snapshot.version)
+        labels = None
+        if fields is not None and COMMUNITY_FIELD in fields:
+            labels = get_community_labels(snapshot, **community_options())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        chunks = stream_node_link(
+            snapshot, fields=fields, labels=labels, start=start, limit=limit
+        )
+        return Response(chunks, mimetype="application/json")
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -424,45 +767,55 @@ def get_full_graph():
 @app.route("/api/visualize-graph", methods=["GET"])
 def visualize_graph():
     """
-    Generate and serve an image of the full graph.
+    Serve an image of the full graph, or 202 with a job ID while it renders.
     """
     try:
-        graph = build_graph_from_files()
-        output_path = os.path.join(BASE_DIR, "data/full_graph_visualization.png")
+        options = render_options()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-        plt.figure(figsize=(12, 12))
-        pos = nx.spring_layout(graph, seed=42)
-        nx.draw(
-            graph,
-            pos,
-            with_labels=False,
-            node_size=50,
-            node_color="blue",
-            edge_color="gray",
-            alpha=0.7,
+    try:
+        snapshot = graph_store.snapshot()
+        image_key = cache_key(
+            snapshot.tag, "graph", options["layout_seed"], options["dpi"]
         )
-        plt.title("Full Graph Visualization", fontsize=16)
-        plt.savefig(output_path)
-        plt.close()
 
-        return send_file(output_path, mimetype="image/png")
+        def render(f):
+            pos = graph_positions(snapshot, options["layout_seed"])
+            draw_png(
+                f,
+                [(snapshot.graph, pos, "blue")],
+                "Full Graph Visualization",
+                options["dpi"],
+            )
+
+        job = render_cache.request(image_key, render)
+        return render_response(job)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @app.route("/api/community-graph", methods=["GET"])
+@cached
 def get_community_graph():
     """
     Return raw community data for visualization.
     """
     try:
-        graph = build_graph_from_files()
-        communities = detect_communities(graph)
+        community = community_options()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        snapshot = graph_store.snapshot()
+        graph = snapshot.graph
+        partition = get_partition(snapshot, **community)
 
         community_graphs = []
-        for community in communities:
+        for community_id, community in partition.items():
             subgraph = graph.subgraph(community)
             graph_data = json_graph.node_link_data(subgraph)
+            graph_data["community_id"] = community_id
             community_graphs.append(graph_data)
 
         return jsonify({"communities": community_graphs})
@@ -470,40 +823,160 @@ def get_community_graph():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/community-quotient-graph", methods=["GET"])
+@cached
+def get_community_quotient_graph():
+    """
+    Return the level-0 community view: one node per community, edges weighted by
+    the interactions between communities (?min_weight= drops lighter edges).
+    """
+    try:
+        community = community_options()
+        min_weight = request.args.get("min_weight", type=float)
+        if min_weight is None and "min_weight" in request.args:
+            raise ValueError("min_weight must be a number.")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        snapshot = graph_store.snapshot()
+        quotient = get_community_quotient(snapshot, **community)
+        return jsonify(
+            {
+                "version": snapshot.version,
+                **quotient.to_dict(min_weight=min_weight or 0),
+            }
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/community-graph/<int:community_id>", methods=["GET"])
+@cached
+def get_community_subgraph(community_id):
+    """
+    Return one community's subgraph with force-directed positions in [-1, 1], for
+    drilling into a node of the quotient graph (?layout_seed=42).
+    """
+    try:
+        community = community_options()
+        layout_seed = render_options()["layout_seed"]
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        snapshot = graph_store.snapshot()
+        partition = get_partition(snapshot, **community)
+        if not 1 <= community_id <= len(partition.communities):
+            members = None
+        else:
+            members = partition.members(community_id)
+        if not members:
+            return jsonify({"error": f"Community {community_id} not found."}), 404
+
+        subgraph = snapshot.graph.subgraph(members)
+        graph_data = json_graph.node_link_data(subgraph)
+        graph_data["community_id"] = community_id
+        graph_data["positions"] = {
+            node: [round(float(x), 5), round(float(y), 5)]
+            for node, (x, y) in graph_layout(subgraph, seed=layout_seed).items()
+        }
+        return jsonify(graph_data)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route("/api/visualize-community", methods=["GET"])
 def visualize_community():
     """
-    Generate and serve an image of the communities as subgraphs.
+    Serve an image of the communities as subgraphs, or 202 with a job ID while it renders.
     """
     try:
-        graph = build_graph_from_files()
-        communities = detect_communities(graph)
+        community = community_options()
+        options = render_options()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-        output_path = os.path.join(BASE_DIR, "data/community_visualization.png")
-        plt.figure(figsize=(12, 12))
+    try:
+        snapshot = graph_store.snapshot()
+        layout_key = cache_key(
+            snapshot.tag,
+            "community",
+            community["engine"],
+            community.get("seed"),
+            options["layout_seed"],
+        )
 
-        for idx, community in enumerate(communities):
-            subgraph = graph.subgraph(community)
-            pos = nx.spring_layout(subgraph, seed=42)
-            nx.draw(
-                subgraph,
-                pos,
-                with_labels=False,
-                node_size=50,
-                node_color=f"C{idx}",  # Assign a unique color per community
-                edge_color="gray",
-                alpha=0.7,
+        def layout(subgraphs, initial):
+            pos = {}
+            for subgraph in subgraphs:
+                pos.update(
+                    graph_layout(subgraph, seed=options["layout_seed"], initial=initial)
+                )
+            return pos
+
+        def render(f):
+            graph = snapshot.graph
+            partition = get_partition(snapshot, **community)
+            subgraphs = [graph.subgraph(community) for community in partition]
+            pos = render_cache.layout(
+                layout_key,
+                lambda initial: layout(subgraphs, initial),
+                family=("community", community["engine"], options["layout_seed"]),
             )
+            parts = [
+                # Assign a unique color per community
+                (subgraph, pos, f"C{idx}")
+                for idx, subgraph in enumerate(subgraphs)
+            ]
+            draw_png(f, parts, "Community Visualization", options["dpi"])
+
+        job = render_cache.request(cache_key(layout_key, options["dpi"]), render)
+        return render_response(job)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        plt.title("Community Visualization", fontsize=16)
-        plt.savefig(output_path)
-        plt.close()
 
-        return send_file(output_path, mimetype="image/png")
+@app.route("/api/graph-layout", methods=["GET"])
+@cached
+def get_graph_layout():
+    """
+    Return force-directed positions in [-1, 1] for every node (?layout_seed=42).
+    """
+    try:
+        layout_seed = render_options()["layout_seed"]
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        snapshot = graph_store.snapshot()
+        pos = graph_positions(snapshot, layout_seed)
+        positions = {
+            node: [round(float(x), 5), round(float(y), 5)]
+            for node, (x, y) in pos.items()
+        }
+        return jsonify(
+            {
+                "version": snapshot.version,
+                "layout_seed": layout_seed,
+                "positions": positions,
+            }
+        )
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/render-jobs/<job_id>", methods=["GET"])
+def render_job(job_id):
+    """
+    Report the status of a visualization render job.
+    """
+    job = render_cache.job(job_id)
+    if job is None:
+        return jsonify({"error": f"Render job {job_id} not found."}), 404
+    return jsonify(job.to_dict())
+
+
 @app.route("/api/chat", methods=["POST"])
 def chatbot_endpoint():
     try:
@@ -514,12 +987,27 @@ def chatbot_endpoint():
         user_input = data.get("message", "")
         if not user_input:
             return jsonify({"error": "Message is required."}), 400
+        try:
+            conversation_id = validate_conversation_id(
+                data.get("conversation_id") or new_conversation_id()
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-        response = get_chatbot_response(user_input)
-        return jsonify({"response": response})
+        session = chat_sessions.get(conversation_id)
+        response = get_chatbot_response(user_input, chat_data, session)
+        return jsonify({"response": response, **session.to_dict()})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/chat/stats", methods=["GET"])
+def chat_stats():
+    """
+    Return hit/miss counters of the chatbot caches and the number of open sessions.
+    """
+    return jsonify({"cache": chat_cache.stats(), "sessions": len(chat_sessions)})
+
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,54 @@
+import argparse
+import os
+import sys
+import time
+
+import networkx as nx  # type: ignore
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from centrality import exact_centrality  # noqa: E402
+from community_detection import analyze_centrality  # noqa: E402
+
+
+def time_call(func, *args, **kwargs):
+    """
+    Return the wall-clock seconds taken by one call.
+    """
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def run(sizes, worker_counts, edges_per_node=4, seed=42):
+    """
+    Print serial NetworkX timings next to the process-pool backend for each graph size.
+
+    :param sizes: Node counts of the generated graphs.
+    :param worker_counts: Worker counts to time the parallel backend with.
+    :param edges_per_node: Barabasi-Albert attachment parameter.
+    :param seed: Graph generator seed.
+    """
+    header = ["nodes", "edges", "serial"] + [f"workers={w}" for w in worker_counts]
+    print("  ".join(f"{h:>12}" for h in header))
+    for n in sizes:
+        graph = nx.barabasi_albert_graph(n, edges_per_node, seed=seed)
+        serial = time_call(analyze_centrality, graph)
+        row = [n, graph.number_of_edges(), f"{serial:.2f}s"]
+        for workers in worker_counts:
+            elapsed = time_call(exact_centrality, graph, workers=workers)
+            row.append(f"{elapsed:.2f}s ({serial / elapsed:.1f}x)")
+        print("  ".join(f"{str(v):>12}" for v in row))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Centrality scaling benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000])
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+    )
+    args = parser.parse_args()
+    run(args.sizes, args.workers)
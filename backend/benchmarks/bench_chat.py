@@ -0,0 +1,178 @@
+import argparse
+import contextlib
+import io
+import os
+import sys
+import math
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The dashboard queries below never reach a real model
+with contextlib.redirect_stdout(io.StringIO()):
+    import app  # noqa: E402
+    import chatbot  # noqa: E402
+    from chat_cache import ChatCache  # noqa: E402
+    from chat_data import API_ENDPOINTS  # noqa: E402
+    from chat_sessions import (  # noqa: E402
+        DEFAULT_TOKEN_BUDGET,
+        ChatSession,
+        estimate_tokens,
+    )
+    from chatbot import get_chatbot_response  # noqa: E402
+
+QUERIES = [
+    "Who are the top influencers?",
+    "What are the trending interests right now?",
+    "Which communities are the most active?",
+    "Show me the interaction trends over time",
+    "How influential is U12?",
+    "Recommend connections for user 7",
+    "Which communities should U3 join?",
+    "Tell me about U5 and U9",
+    "What's going on in the network lately?",
+    "hello!",
+]
+# Words in each simulated answer
+ANSWER_WORDS = 100
+# Size of the API data sent with each simulated answer
+PAYLOAD_CHARS = 6000
+
+
+class SimulatedLLM:
+    """
+    Local stand-in for the model: waits ``delay`` seconds plus ``per_token``
+    seconds per prompt token, and returns a canned reply shaped like the real
+    one for each prompt type. Use it as ChatSession's ``complete``.
+    """
+
+    def __init__(self, delay, per_token=0.0):
+        self.delay = delay
+        self.per_token = per_token
+
+    def __call__(self, contents):
+        prompt = contents[-1]["parts"][0]
+        tokens = sum(estimate_tokens(c["parts"][0]) for c in contents)
+        time.sleep(self.delay + self.per_token * tokens)
+        if "query planner" in prompt:
+            return '{"apis": ["interaction_trends"], "user_ids": []}', None, None
+        if "API classifier" in prompt:
+            return "interaction_trends", None, None
+        if "Extract the user ID" in prompt:
+            return "None", None, None
+        return "Simulated answer. " * ANSWER_WORDS, None, None
+
+
+def sequential_response(query, session, data_client):
+    """
+    The previous pipeline: LLM classification, LLM user-ID extraction,
+    one API call after another, then the answer. It always fetches one
+    API, so it does no more data work than the planned pipeline.
+    """
+    session.ask(f"You are an API classifier. User Query: {query}")
+    session.ask(f"Extract the user ID(s) from the input query: {query}")
+    data_client.fetch(API_ENDPOINTS["interaction_trends"], limit=20)
+    return session.reply(query, f"Answer: {query}")
+
+
+def timed(respond, query, llm):
+    session = ChatSession("bench", llm)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        respond(query, session)
+    return time.perf_counter() - start, session.usage["calls"]
+
+
+def planned_response(query, session, cache):
+    chatbot.chat_cache = cache
+    return get_chatbot_response(query, app.chat_data, session)
+
+
+def run(delay, repeats):
+    """
+    Print end-to-end chat latency per query for the sequential pipeline, the
+    planned one with empty chat caches, and the planned one repeating a question.
+
+    :param delay: Simulated model latency per call, in seconds.
+    :param repeats: Runs per query; the median is reported.
+    """
+    warm_cache = ChatCache()
+    pipelines = {
+        "sequential": lambda q, session: sequential_response(q, session, app.chat_data),
+        "planned": lambda q, session: planned_response(q, session, ChatCache()),
+        "repeated": lambda q, session: planned_response(q, session, warm_cache),
+    }
+    # Warm the graph, the API response cache and the chat cache used for
+    # repeated questions, so only the pipelines differ
+    for query in QUERIES:
+        for respond in pipelines.values():
+            timed(respond, query, SimulatedLLM(0))
+
+    header = ["query"]
+    for name in pipelines:
+        header += [name, "calls"]
+    print(f"{header[0]:<45}" + "".join(f"{h:>12}" for h in header[1:]))
+    totals = dict.fromkeys(pipelines, 0.0)
+    for query in QUERIES:
+        row = []
+        for name, respond in pipelines.items():
+            runs = sorted(
+                timed(respond, query, SimulatedLLM(delay)) for _ in range(repeats)
+            )
+            elapsed, calls = runs[len(runs) // 2]
+            totals[name] += elapsed
+            row += [f"{elapsed * 1000:.0f}ms", calls]
+        print(f"{query:<45}" + "".join(f"{str(v):>12}" for v in row))
+    means = []
+    for name in pipelines:
+        means += [f"{totals[name] / len(QUERIES) * 1000:.0f}ms", ""]
+    print(f"{'mean':<45}" + "".join(f"{v:>12}" for v in means))
+
+
+def run_conversation(turns, delay, per_token, block=10):
+    """
+    Print mean prompt tokens and latency per block of turns along one long
+    conversation, with the session's token-budgeted history and with an
+    unbounded one. Summary calls are included in the windowed figures.
+
+    :param turns: Messages in the conversation.
+    :param delay: Simulated model latency per call, in seconds.
+    :param per_token: Simulated extra latency per prompt token, in seconds.
+    :param block: Turns averaged per printed row.
+    """
+    payload = "x" * PAYLOAD_CHARS
+    print(f"\n{'history':<12}{'turns':>10}{'prompt tokens':>15}{'latency':>10}")
+    for name, budget in (("unbounded", math.inf), ("windowed", DEFAULT_TOKEN_BUDGET)):
+        session = ChatSession("bench", SimulatedLLM(delay, per_token), budget)
+        for first in range(1, turns + 1, block):
+            last = min(first + block - 1, turns)
+            before = session.usage["prompt_tokens"]
+            start = time.perf_counter()
+            for turn in range(first, last + 1):
+                session.reply(QUERIES[turn % len(QUERIES)], f"Answer using {payload}")
+            count = last - first + 1
+            tokens = (session.usage["prompt_tokens"] - before) // count
+            elapsed = (time.perf_counter() - start) / count
+            turns_label = f"{first}-{last}"
+            print(f"{name:<12}{turns_label:>10}{tokens:>15}{elapsed * 1000:>8.0f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chat latency: planner vs LLM calls")
+    parser.add_argument(
+        "--delay",
+        type=float,
+        default=0.5,
+        help="Simulated model latency per call in seconds",
+    )
+    parser.add_argument(
+        "--per-token",
+        type=float,
+        default=0.0001,
+        help="Simulated model latency per prompt token in seconds",
+    )
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--turns", type=int, default=50)
+    args = parser.parse_args()
+    run(args.delay, args.repeats)
+    run_conversation(args.turns, args.delay, args.per_token)
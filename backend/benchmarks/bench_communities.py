@@ -0,0 +1,110 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+import networkx as nx  # type: ignore
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from community_detection import detect_communities  # noqa: E402
+from community_engines import ENGINES  # noqa: E402
+
+
+def generate_graph(n, community_size=50, degree=8, mixing=0.1, seed=42):
+    """
+    Generate a planted-partition graph with roughly ``degree`` edges per node.
+
+    :param n: Number of nodes.
+    :param community_size: Nodes per planted community.
+    :param degree: Expected node degree.
+    :param mixing: Expected fraction of each node's edges leaving its community.
+    :param seed: Graph generator seed.
+    """
+    sizes = [community_size] * max(1, n // community_size)
+    p_in = min(1.0, degree * (1 - mixing) / (community_size - 1))
+    p_out = degree * mixing / max(1, n - community_size)
+    return nx.random_partition_graph(sizes, p_in, p_out, seed=seed)
+
+
+def add_random_edges(graph, fraction, seed=42):
+    """
+    Return a copy of a graph with ``fraction`` * m random edges added.
+    """
+    updated = graph.copy()
+    rng = random.Random(seed)
+    nodes = list(graph)
+    for _ in range(int(graph.number_of_edges() * fraction)):
+        updated.add_edge(rng.choice(nodes), rng.choice(nodes))
+    return updated
+
+
+def timed(engine, graph, initial=None):
+    """
+    Return (seconds, modularity, community count) for one detection run.
+    """
+    start = time.perf_counter()
+    communities = detect_communities(graph, engine=engine, initial=initial)
+    elapsed = time.perf_counter() - start
+    modularity = nx.algorithms.community.modularity(graph, communities)
+    return elapsed, modularity, len(communities)
+
+
+def run(sizes, engines, greedy_limit, added_fraction):
+    """
+    Print runtime and modularity per engine, plus a warm-started rerun after adding edges.
+
+    :param sizes: Node counts of the generated graphs.
+    :param engines: Engine names to compare.
+    :param greedy_limit: Largest graph to run the greedy engine on.
+    :param added_fraction: Fraction of extra edges added before the warm start.
+    """
+    header = ["nodes", "edges", "engine", "time", "modularity", "communities"]
+    header += ["cold rerun", "warm rerun", "warm modularity"]
+    print("  ".join(f"{h:>15}" for h in header))
+    for n in sizes:
+        graph = generate_graph(n)
+        updated = add_random_edges(graph, added_fraction)
+        for engine in engines:
+            if engine == "greedy" and n > greedy_limit:
+                continue
+            elapsed, modularity, count = timed(engine, graph)
+            row = [n, graph.number_of_edges(), engine, f"{elapsed:.2f}s"]
+            row += [f"{modularity:.4f}", count]
+            if engine == "greedy":
+                row += ["-", "-", "-"]
+            else:
+                initial = {
+                    node: idx
+                    for idx, community in enumerate(
+                        detect_communities(graph, engine=engine)
+                    )
+                    for node in community
+                }
+                cold, _, _ = timed(engine, updated)
+                warm, warm_modularity, _ = timed(engine, updated, initial=initial)
+                row += [f"{cold:.2f}s", f"{warm:.2f}s", f"{warm_modularity:.4f}"]
+            print("  ".join(f"{str(v):>15}" for v in row))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Community engine benchmark")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 5000, 20000, 100000]
+    )
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES))
+    parser.add_argument(
+        "--greedy-limit",
+        type=int,
+        default=20000,
+        help="Skip the (quadratic) greedy engine above this many nodes",
+    )
+    parser.add_argument(
+        "--added-fraction",
+        type=float,
+        default=0.01,
+        help="Fraction of edges added before the warm-started rerun",
+    )
+    args = parser.parse_args()
+    run(args.sizes, args.engines, args.greedy_limit, args.added_fraction)
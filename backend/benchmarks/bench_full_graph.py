@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from bench_startup import peak_rss_mb, write_dataset  # noqa: E402
+
+MODES = ("node_link_data", "stream", "stream_projected")
+
+
+def measure(mode, directory):
+    """
+    Serialise the graph one way in this process and print TTFB, time, size and peak RSS as JSON.
+    """
+    from graph_export import stream_node_link
+    from graph_store import GraphSnapshot
+    from ingest import build_graph_streaming
+    from networkx.readwrite import json_graph  # type: ignore
+
+    graph = build_graph_streaming(
+        os.path.join(directory, "users.json"),
+        os.path.join(directory, "interactions.json"),
+        progress_interval=None,
+    )
+    snapshot = GraphSnapshot(1, graph, ())
+    baseline = peak_rss_mb()
+
+    start = time.perf_counter()
+    if mode == "node_link_data":
+        # What /api/full-graph used to do: build the whole document, then send it
+        chunks = iter([json.dumps(json_graph.node_link_data(graph))])
+    elif mode == "stream":
+        chunks = stream_node_link(snapshot)
+    elif mode == "stream_projected":
+        chunks = stream_node_link(snapshot, fields={"weight"})
+    size = len(next(chunks))
+    first_byte = time.perf_counter() - start
+    for chunk in chunks:
+        size += len(chunk)
+    elapsed = time.perf_counter() - start
+
+    print(
+        json.dumps(
+            {
+                "ttfb": first_byte,
+                "seconds": elapsed,
+                "mb": size / 2**20,
+                "rss_mb": peak_rss_mb() - baseline,
+            }
+        )
+    )
+
+
+def run(sizes):
+    """
+    Print time-to-first-byte, total time, response size and RSS growth per mode.
+
+    :param sizes: User counts of the generated datasets.
+    """
+    header = (
+        f"{'users':>8} {'mode':>18} {'ttfb':>9} {'seconds':>9} {'size':>9} {'rss':>9}"
+    )
+    print(header)
+    for num_users in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            write_dataset(directory, num_users)
+            for mode in MODES:
+                # A fresh interpreter per mode keeps RSS numbers independent.
+                output = subprocess.run(
+                    [sys.executable, __file__, "--measure", mode, directory],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(
+                    f"{num_users:>8} {mode:>18} {result['ttfb']:>8.3f}s "
+                    f"{result['seconds']:>8.3f}s {result['mb']:>7.1f}MB "
+                    f"{result['rss_mb']:>7.1f}MB"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="/api/full-graph serialisation")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--measure", nargs=2, metavar=("MODE", "DIR"))
+    args = parser.parse_args()
+    if args.measure:
+        measure(*args.measure)
+    else:
+        run(args.sizes)
@@ -0,0 +1,129 @@
+import argparse
+import os
+import sys
+import time
+
+import networkx as nx  # type: ignore
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from layout_engine import force_layout  # noqa: E402
+
+
+def planted_partition(n, community_size=50, degree=8, mixing=0.1, seed=42):
+    """
+    Generate planted-partition edges directly as arrays (fast at 100k+ nodes).
+
+    :return: (sources, targets) int arrays with about n * degree / 2 edges.
+    """
+    rng = np.random.default_rng(seed)
+    m = n * degree // 2
+    sources = rng.integers(0, n, m)
+    block = sources // community_size * community_size
+    inside = block + rng.integers(0, community_size, m)
+    targets = np.where(rng.random(m) < mixing, rng.integers(0, n, m), inside)
+    return sources, np.minimum(targets, n - 1)
+
+
+def edge_ratio(pos, sources, targets, seed=0):
+    """
+    Mean edge length over mean distance between random node pairs (lower is better).
+    """
+    rng = np.random.default_rng(seed)
+    pairs = rng.integers(0, len(pos), (20000, 2))
+    edges = np.linalg.norm(pos[sources] - pos[targets], axis=1).mean()
+    random = np.linalg.norm(pos[pairs[:, 0]] - pos[pairs[:, 1]], axis=1).mean()
+    return edges / random
+
+
+def grow(n, sources, targets, fraction, seed=42):
+    """
+    Add ``fraction`` * n new nodes, each with a few edges, as after live updates.
+    """
+    rng = np.random.default_rng(seed)
+    added = int(n * fraction)
+    new_nodes = np.repeat(np.arange(n, n + added), 3)
+    old_nodes = rng.integers(0, n, len(new_nodes))
+    return (
+        n + added,
+        np.concatenate([sources, new_nodes]),
+        np.concatenate([targets, old_nodes]),
+    )
+
+
+def spring_layout_seconds(n, sources, targets):
+    """
+    Time nx.spring_layout on the same graph, or None if it cannot run (it needs SciPy above 500 nodes).
+    """
+    graph = nx.Graph()
+    graph.add_nodes_from(range(n))
+    graph.add_edges_from(zip(sources.tolist(), targets.tolist()))
+    start = time.perf_counter()
+    try:
+        pos = nx.spring_layout(graph, seed=42)
+    except ImportError:
+        return None, None
+    elapsed = time.perf_counter() - start
+    pos = np.array([pos[node] for node in range(n)])
+    return elapsed, edge_ratio(pos, sources, targets)
+
+
+def run(sizes, spring_limit, added_fraction):
+    """
+    Print cold and warm-started layout time and quality per graph size.
+
+    :param sizes: Node counts of the generated graphs.
+    :param spring_limit: Largest graph to also run nx.spring_layout on.
+    :param added_fraction: Fraction of nodes added before the warm-started rerun.
+    """
+    header = ["nodes", "edges", "layout", "edge ratio", "warm rerun", "warm ratio"]
+    header += ["spring_layout", "spring ratio"]
+    print("  ".join(f"{h:>13}" for h in header))
+    for n in sizes:
+        sources, targets = planted_partition(n)
+        start = time.perf_counter()
+        pos = force_layout(n, sources, targets)
+        elapsed = time.perf_counter() - start
+        row = [n, len(sources), f"{elapsed:.2f}s"]
+        row.append(f"{edge_ratio(pos, sources, targets):.3f}")
+
+        grown_n, grown_sources, grown_targets = grow(
+            n, sources, targets, added_fraction
+        )
+        initial = np.full((grown_n, 2), np.nan)
+        initial[:n] = pos
+        start = time.perf_counter()
+        warm = force_layout(grown_n, grown_sources, grown_targets, initial=initial)
+        elapsed = time.perf_counter() - start
+        row += [
+            f"{elapsed:.2f}s",
+            f"{edge_ratio(warm, grown_sources, grown_targets):.3f}",
+        ]
+
+        spring, spring_ratio = (None, None)
+        if n <= spring_limit:
+            spring, spring_ratio = spring_layout_seconds(n, sources, targets)
+        row += (
+            ["-", "-"] if spring is None else [f"{spring:.2f}s", f"{spring_ratio:.3f}"]
+        )
+        print("  ".join(f"{str(v):>13}" for v in row))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Force-directed layout benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument(
+        "--spring-limit",
+        type=int,
+        default=10000,
+        help="Skip nx.spring_layout above this many nodes",
+    )
+    parser.add_argument(
+        "--added-fraction",
+        type=float,
+        default=0.01,
+        help="Fraction of nodes added before the warm-started rerun",
+    )
+    args = parser.parse_args()
+    run(args.sizes, args.spring_limit, args.added_fraction)
@@ -0,0 +1,93 @@
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+
+import networkx as nx  # type: ignore
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compact_graph import CompactGraph  # noqa: E402
+from data_generation import INTERACTION_TYPES, INTERESTS  # noqa: E402
+
+# Same interaction density as the bundled sample (about 3.8 edges per user)
+EDGES_PER_USER = 3.8
+
+
+def generate_interactions(num_users, num_interactions, seed=42):
+    """
+    Yield interaction records shaped like data/interactions.json.
+    """
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    for i in range(num_interactions):
+        source, target = rng.sample(range(1, num_users + 1), 2)
+        yield {
+            "interaction_id": f"I{i + 1}",
+            "interaction_type": rng.choice(INTERACTION_TYPES),
+            "source_user": f"U{source}",
+            "target_user": f"U{target}",
+            "shared_interests": rng.sample(INTERESTS, rng.randint(0, 3)),
+            "timestamp": (start + timedelta(seconds=rng.randrange(10**8))).isoformat(),
+            "weight": rng.randint(1, 5),
+            "geographic_proximity": rng.random() < 0.2,
+        }
+
+
+def build_networkx(num_users, num_interactions):
+    """
+    Build the graph the way app.build_graph_from_files() does.
+    """
+    graph = nx.Graph()
+    graph.add_nodes_from(f"U{i}" for i in range(1, num_users + 1))
+    for interaction in generate_interactions(num_users, num_interactions):
+        graph.add_edge(
+            interaction["source_user"], interaction["target_user"], **interaction
+        )
+    return graph
+
+
+def traced_size(func, *args):
+    """
+    Return (result, bytes still allocated by the call).
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = func(*args)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def run(sizes):
+    """
+    Print NetworkX vs CompactGraph memory for each user count.
+
+    :param sizes: User counts to generate graphs for.
+    """
+    print(f"{'users':>10} {'edges':>10} {'networkx':>12} {'compact':>12} {'ratio':>8}")
+    for num_users in sizes:
+        graph, nx_bytes = traced_size(
+            build_networkx, num_users, int(num_users * EDGES_PER_USER)
+        )
+        compact = CompactGraph.from_networkx(graph)
+        edges = graph.number_of_edges()
+        del graph
+        compact_bytes = compact.nbytes()
+        print(
+            f"{num_users:>10} {edges:>10} {nx_bytes / 2**20:>10.1f}MB "
+            f"{compact_bytes / 2**20:>10.1f}MB {nx_bytes / compact_bytes:>7.1f}x"
+        )
+        del compact
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Graph memory report")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000]
+    )
+    args = parser.parse_args()
+    run(args.sizes)
@@ -0,0 +1,146 @@
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from bench_memory import EDGES_PER_USER, generate_interactions  # noqa: E402
+from data_generation import INTERESTS  # noqa: E402
+
+MODES = (
+    "json_load",
+    "json_stream_graph",
+    "snapshot_open",
+    "snapshot_graph",
+    "snapshot_compact",
+)
+
+
+def write_dataset(directory, num_users, seed=42):
+    """
+    Write users.json and interactions.json shaped like the bundled data.
+    """
+    rng = random.Random(seed)
+    users = [
+        {
+            "user_id": f"U{i}",
+            "name": f"User {i}",
+            "location": f"City {rng.randrange(num_users // 10 + 1)}",
+            "interests": rng.sample(INTERESTS, rng.randint(3, 7)),
+            "follower_count": rng.randint(10, 10000),
+            "activity_level": rng.choice(["low", "medium", "high"]),
+        }
+        for i in range(1, num_users + 1)
+    ]
+    with open(os.path.join(directory, "users.json"), "w") as f:
+        json.dump({"users": users}, f, indent=2)
+    interactions = list(
+        generate_interactions(num_users, int(num_users * EDGES_PER_USER), seed)
+    )
+    with open(os.path.join(directory, "interactions.json"), "w") as f:
+        json.dump({"interactions": interactions}, f, indent=2)
+
+
+def peak_rss_mb():
+    """
+    Return this process's peak RSS in MB.
+
+    /proc is preferred because ru_maxrss survives exec and would report the
+    parent's peak in a fresh subprocess.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(mode, directory):
+    """
+    Run one start-up path in this process and print its time and peak RSS as JSON.
+    """
+    users = os.path.join(directory, "users.json")
+    interactions = os.path.join(directory, "interactions.json")
+    snapshot = os.path.join(directory, "snapshot")
+    baseline = peak_rss_mb()
+
+    start = time.perf_counter()
+    if mode == "json_load":
+        with open(users) as f:
+            json.load(f)
+        with open(interactions) as f:
+            json.load(f)
+    elif mode == "json_stream_graph":
+        from ingest import build_graph_streaming
+
+        build_graph_streaming(users, interactions, progress_interval=None)
+    elif mode == "snapshot_open":
+        from columnar import ColumnarDataset
+
+        ColumnarDataset(snapshot)
+    elif mode == "snapshot_graph":
+        from columnar import ColumnarDataset, build_graph_from_dataset
+
+        build_graph_from_dataset(ColumnarDataset(snapshot))
+    elif mode == "snapshot_compact":
+        from columnar import ColumnarDataset
+
+        ColumnarDataset(snapshot).compact_graph()
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({"seconds": elapsed, "rss_mb": peak_rss_mb() - baseline}))
+
+
+def run(sizes):
+    """
+    Print start-up time and RSS growth of each mode for each dataset size.
+
+    :param sizes: User counts of the generated datasets.
+    """
+    from columnar import compile_dataset
+
+    print(f"{'users':>8} {'mode':>18} {'seconds':>9} {'rss':>9}")
+    for num_users in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            write_dataset(directory, num_users)
+            compile_dataset(
+                os.path.join(directory, "users.json"),
+                os.path.join(directory, "interactions.json"),
+                os.path.join(directory, "snapshot"),
+                progress_interval=None,
+            )
+            for mode in MODES:
+                # A fresh interpreter per mode keeps RSS numbers independent.
+                output = subprocess.run(
+                    [sys.executable, __file__, "--measure", mode, directory],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(
+                    f"{num_users:>8} {mode:>18} {result['seconds']:>8.3f}s "
+                    f"{result['rss_mb']:>7.1f}MB"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Start-up time: JSON vs snapshot")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--measure", nargs=2, metavar=("MODE", "DIR"))
+    args = parser.parse_args()
+    if args.measure:
+        measure(*args.measure)
+    else:
+        run(args.sizes)
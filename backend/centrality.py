@@ -0,0 +1,372 @@
+import math
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Defaults for the approximate centrality engine
+DEFAULT_SAMPLE_SIZE = 256
+DEFAULT_SEED = 42
+DEFAULT_CONFIDENCE = 0.95
+
+
+def index_adjacency(graph):
+    """
+    Map the graph to dense integer IDs and plain adjacency lists.
+
+    :param graph: NetworkX graph.
+    :return: (nodes, adjacency) where adjacency[i] lists the neighbour indices of nodes[i].
+    """
+    nodes = list(graph.nodes)
+    index = {node: idx for idx, node in enumerate(nodes)}
+    adjacency = [
+        [index[neighbor] for neighbor in graph.adj[node] if neighbor != node]
+        for node in nodes
+    ]
+    return nodes, adjacency
+
+
+def single_source_dependencies(adjacency, source):
+    """
+    Run one Brandes pass (BFS + dependency accumulation) from a source node.
+
+    :param adjacency: Adjacency lists from index_adjacency().
+    :param source: Source node index.
+    :return: (distances, dependencies); unreachable nodes have distance -1.
+    """
+    n = len(adjacency)
+    distance = [-1] * n
+    sigma = [0] * n
+    predecessors = [[] for _ in range(n)]
+    order = []
+
+    distance[source] = 0
+    sigma[source] = 1
+    queue = deque([source])
+    while queue:
+        v = queue.popleft()
+        order.append(v)
+        next_distance = distance[v] + 1
+        for w in adjacency[v]:
+            if distance[w] < 0:
+                distance[w] = next_distance
+                queue.append(w)
+            if distance[w] == next_distance:
+                sigma[w] += sigma[v]
+                predecessors[w].append(v)
+
+    delta = [0.0] * n
+    for w in reversed(order):
+        coefficient = (1.0 + delta[w]) / sigma[w]
+        for v in predecessors[w]:
+            delta[v] += sigma[v] * coefficient
+    delta[source] = 0.0
+    return distance, delta
+
+
+def _source_sums(adjacency, sources, bc_scale):
+    """
+    Accumulate betweenness dependencies and BFS distances from a set of sources.
+
+    :return: (bc_sum, bc_sumsq, dist_sum, dist_sumsq, dist_count) arrays, where the
+        betweenness terms are scaled by bc_scale and the distance terms count,
+        for every node, the sources that reach it.
+    """
+    n = len(adjacency)
+    bc_sum = np.zeros(n)
+    bc_sumsq = np.zeros(n)
+    dist_sum = np.zeros(n)
+    dist_sumsq = np.zeros(n)
+    dist_count = np.zeros(n)
+    for source in sources:
+        distance, delta = single_source_dependencies(adjacency, source)
+        contribution = np.asarray(delta) * bc_scale
+        bc_sum += contribution
+        bc_sumsq += contribution**2
+
+        distance = np.asarray(distance, dtype=np.float64)
+        reached = distance > 0
+        dist_sum[reached] += distance[reached]
+        dist_sumsq[reached] += distance[reached] ** 2
+        dist_count[reached] += 1
+    return bc_sum, bc_sumsq, dist_sum, dist_sumsq, dist_count
+
+
+# Adjacency lists rebuilt once per worker process from shared memory
+_worker_adjacency = None
+
+
+def _init_worker(indptr_name, indices_name, n, m):
+    global _worker_adjacency
+    indptr_shm = shared_memory.SharedMemory(name=indptr_name)
+    indices_shm = shared_memory.SharedMemory(name=indices_name)
+    try:
+        indptr = np.ndarray((n + 1,), dtype=np.int64, buffer=indptr_shm.buf)
+        indices = np.ndarray((m,), dtype=np.int64, buffer=indices_shm.buf)
+        _worker_adjacency = [
+            indices[indptr[v] : indptr[v + 1]].tolist() for v in range(n)
+        ]
+        del indptr, indices
+    finally:
+        indptr_shm.close()
+        indices_shm.close()
+
+
+def _worker_source_sums(task):
+    sources, bc_scale = task
+    return _source_sums(_worker_adjacency, sources, bc_scale)
+
+
+def accumulate_sources(adjacency, sources, bc_scale, workers=1):
+    """
+    Run _source_sums() over the sources, optionally split across a process pool.
+
+    The adjacency is published once as CSR arrays in shared memory; each
+    worker rebuilds its local adjacency lists from it at start-up, so tasks
+    only carry a chunk of source indices and return partial sums.
+
+    :param adjacency: Adjacency lists from index_adjacency().
+    :param sources: Source node indices.
+    :param bc_scale: Scale applied to each source's betweenness dependencies.
+    :param workers: Number of worker processes; 1 runs in-process. None uses every CPU.
+    """
+    sources = list(sources)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(sources))
+    if workers <= 1:
+        return _source_sums(adjacency, sources, bc_scale)
+
+    n = len(adjacency)
+    degrees = np.fromiter((len(nbrs) for nbrs in adjacency), dtype=np.int64, count=n)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(degrees, out=indptr[1:])
+    m = int(indptr[-1])
+
+    indptr_shm = shared_memory.SharedMemory(create=True, size=max(indptr.nbytes, 1))
+    indices_shm = shared_memory.SharedMemory(create=True, size=max(m * 8, 1))
+    try:
+        np.ndarray(indptr.shape, dtype=np.int64, buffer=indptr_shm.buf)[:] = indptr
+        shared_indices = np.ndarray((m,), dtype=np.int64, buffer=indices_shm.buf)
+        for v, nbrs in enumerate(adjacency):
+            shared_indices[indptr[v] : indptr[v + 1]] = nbrs
+        del shared_indices
+
+        # A few chunks per worker keeps the pool busy when BFS costs vary.
+        chunks = [sources[i :: workers * 4] for i in range(workers * 4)]
+        totals = [np.zeros(n) for _ in range(5)]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(indptr_shm.name, indices_shm.name, n, m),
+        ) as pool:
+            tasks = [(chunk, bc_scale) for chunk in chunks if chunk]
+            for partial in pool.map(_worker_source_sums, tasks):
+                for total, part in zip(totals, partial):
+                    total += part
+        return tuple(totals)
+    finally:
+        indptr_shm.close()
+        indptr_shm.unlink()
+        indices_shm.close()
+        indices_shm.unlink()
+
+
+def exact_centrality(graph, workers=1):
+    """
+    Compute degree, betweenness and closeness centrality with a Brandes pass per node.
+
+    Gives the same values as analyze_centrality(), but the per-source work
+    can be spread over a process pool.
+
+    :param graph: NetworkX graph.
+    :param workers: Number of worker processes; None uses every CPU.
+    :return: Dictionary of centrality scores, as analyze_centrality().
+    """
+    nodes, adjacency = index_adjacency(graph)
+    n = len(nodes)
+    bc_scale = 1.0 / ((n - 1) * (n - 2)) if n > 2 else 0.0
+    bc_sum, _, dist_sum, _, dist_count = accumulate_sources(
+        adjacency, range(n), bc_scale, workers
+    )
+
+    closeness = np.zeros(n)
+    reached = dist_sum > 0
+    if n > 1:
+        # Wasserman-Faust scaling for disconnected graphs, as NetworkX does.
+        closeness[reached] = (dist_count[reached] / (n - 1)) * (
+            dist_count[reached] / dist_sum[reached]
+        )
+    degree_scale = 1.0 / (n - 1) if n > 1 else 1.0
+    degree = [len(neighbors) * degree_scale for neighbors in adjacency]
+
+    return {
+        "degree_centrality": dict(zip(nodes, degree)),
+        "betweenness_centrality": dict(zip(nodes, bc_sum.tolist())),
+        "closeness_centrality": dict(zip(nodes, closeness.tolist())),
+    }
+
+
+def sample_size_for_error(n, epsilon, confidence=DEFAULT_CONFIDENCE):
+    """
+    Return the number of pivots needed for an additive betweenness error of epsilon.
+
+    Uses a Hoeffding bound with a union bound over all nodes, so the error
+    holds for every node simultaneously with the given confidence.
+    """
+    if n < 1:
+        return 0
+    if epsilon <= 0:
+        return n
+    failure = 1.0 - confidence
+    # Scaled per-pivot contributions lie in [0, n / (n - 1)].
+    value_range = n / (n - 1) if n > 1 else 1.0
+    k = math.ceil(value_range**2 * math.log(2 * n / failure) / (2 * epsilon**2))
+    return min(max(k, 1), n)
+
+
+def _component_sizes(adjacency):
+    """
+    Return, for every node, the size of its connected component.
+    """
+    n = len(adjacency)
+    sizes = [0] * n
+    seen = [False] * n
+    for start in range(n):
+        if seen[start]:
+            continue
+        seen[start] = True
+        component = [start]
+        queue = deque([start])
+        while queue:
+            v = queue.popleft()
+            for w in adjacency[v]:
+                if not seen[w]:
+                    seen[w] = True
+                    component.append(w)
+                    queue.append(w)
+        for v in component:
+            sizes[v] = len(component)
+    return sizes
+
+
+def _bfs_distance_sum(adjacency, source):
+    distance = {source: 0}
+    queue = deque([source])
+    while queue:
+        v = queue.popleft()
+        for w in adjacency[v]:
+            if w not in distance:
+                distance[w] = distance[v] + 1
+                queue.append(w)
+    return sum(distance.values())
+
+
+def approximate_centrality(
+    graph,
+    k=None,
+    epsilon=None,
+    seed=DEFAULT_SEED,
+    confidence=DEFAULT_CONFIDENCE,
+    workers=1,
+):
+    """
+    Estimate betweenness and closeness centrality from a sample of pivot nodes.
+
+    Betweenness uses Brandes pivot sampling: dependencies are accumulated
+    from ``k`` uniformly sampled sources and scaled by n/k. Closeness uses
+    the same BFS trees (Eppstein-Wang sampling): each node's average
+    distance is estimated from the sampled pivots in its component. Degree
+    centrality is always exact. Results only depend on the graph and the
+    seed, so repeated calls are reproducible.
+
+    :param graph: NetworkX graph.
+    :param k: Number of pivots. Overrides epsilon when both are given.
+    :param epsilon: Target additive betweenness error, used to pick k.
+    :param seed: Seed for pivot selection.
+    :param confidence: Confidence level of the reported error bound.
+    :param workers: Number of worker processes for the pivot passes.
+    :return: (scores, info) where scores matches analyze_centrality() and info
+        describes the sample size and error estimates.
+    """
+    nodes, adjacency = index_adjacency(graph)
+    n = len(nodes)
+    if k is None:
+        k = (
+            sample_size_for_error(n, epsilon, confidence)
+            if epsilon is not None
+            else DEFAULT_SAMPLE_SIZE
+        )
+    k = min(max(int(k), 1), n) if n else 0
+
+    pivots = random.Random(seed).sample(range(n), k)
+    component_size = _component_sizes(adjacency)
+
+    # Per-pivot betweenness contributions are scaled so their mean is the estimate.
+    bc_scale = n / ((n - 1) * (n - 2)) if n > 2 else 0.0
+    bc_sum, bc_sumsq, dist_sum, dist_sumsq, dist_count = accumulate_sources(
+        adjacency, pivots, bc_scale, workers
+    )
+
+    # Finite population correction: pivots are drawn without replacement.
+    fpc = math.sqrt((n - k) / (n - 1)) if n > 1 else 0.0
+    betweenness = bc_sum / k if k else np.zeros(n)
+    bc_var = np.maximum(bc_sumsq / k - betweenness**2, 0.0) if k else np.zeros(n)
+    bc_error = np.sqrt(bc_var / k) * fpc if k else np.zeros(n)
+
+    closeness = np.zeros(n)
+    cc_error = np.zeros(n)
+    for v in range(n):
+        reachable = component_size[v] - 1
+        if reachable <= 0 or n <= 1:
+            continue
+        count = dist_count[v]
+        if count == 0:
+            # No pivot landed in this component; a single BFS is exact and cheap.
+            closeness[v] = reachable**2 / ((n - 1) * _bfs_distance_sum(adjacency, v))
+            continue
+        mean = dist_sum[v] / count
+        closeness[v] = reachable / ((n - 1) * mean)
+        if count < reachable:
+            var = max(dist_sumsq[v] / count - mean**2, 0.0)
+            component_fpc = math.sqrt((reachable - count) / max(reachable - 1, 1))
+            cc_error[v] = closeness[v] * math.sqrt(var / count) * component_fpc / mean
+
+    degree_scale = 1.0 / (n - 1) if n > 1 else 1.0
+    degree = [len(neighbors) * degree_scale for neighbors in adjacency]
+
+    scores = {
+        "degree_centrality": dict(zip(nodes, degree)),
+        "betweenness_centrality": dict(zip(nodes, betweenness.tolist())),
+        "closeness_centrality": dict(zip(nodes, closeness.tolist())),
+    }
+    bound_range = n / (n - 1) if n > 1 else 0.0
+    info = {
+        "mode": "approx",
+        "sample_size": k,
+        "population": n,
+        "seed": seed,
+        "target_error": epsilon,
+        "confidence": confidence,
+        "error": {
+            "betweenness_centrality": {
+                "max_standard_error": float(bc_error.max()) if n else 0.0,
+                "mean_standard_error": float(bc_error.mean()) if n else 0.0,
+                # Hoeffding + union bound, zero once every node is a pivot
+                "bound": (
+                    bound_range
+                    * math.sqrt(math.log(2 * n / (1 - confidence)) / (2 * k))
+                    if 0 < k < n
+                    else 0.0
+                ),
+            },
+            "closeness_centrality": {
+                "max_standard_error": float(cc_error.max()) if n else 0.0,
+                "mean_standard_error": float(cc_error.mean()) if n else 0.0,
+            },
+        },
+    }
+    return scores, info
@@ -0,0 +1,147 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# (entries kept in memory, seconds an entry stays valid) per tier
+TIER_LIMITS = {
+    # Query plans do not depend on the data, so they may live long
+    "plans": (4096, 24 * 3600),
+    # Payloads and answers are keyed by data version as well
+    "payloads": (1024, 3600),
+    "answers": (1024, 3600),
+}
+# Expired rows are deleted from disk every this many writes
+_PURGE_EVERY = 100
+
+
+def normalize_query(query):
+    """
+    Normalise a chat message for use as a cache key: case, spacing and
+    trailing punctuation are ignored.
+    """
+    return re.sub(r"\s+", " ", query).strip().rstrip("?!. ").lower()
+
+
+class TTLCache:
+    """
+    LRU cache whose entries also expire after a fixed time, optionally backed by SQLite.
+
+    Keys and values must be JSON-serialisable. With a path, every entry is
+    also written to disk, and a memory miss falls back to the disk so that
+    entries survive restarts; expired rows are purged now and then.
+
+    :param name: Tier name, also the SQLite table name.
+    :param max_entries: Entries kept in memory.
+    :param ttl: Seconds an entry stays valid.
+    :param path: Optional SQLite database path; created on first use.
+    """
+
+    def __init__(self, name, max_entries, ttl, path=None):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._writes = 0
+        self._lock = threading.Lock()
+        if path is not None:
+            with self._connect() as db:
+                db.execute(
+                    f"CREATE TABLE IF NOT EXISTS {name} ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+                )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key):
+        """
+        Return the value cached under key, or None if it is missing or expired.
+        """
+        key = json.dumps(key)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is None and self.path is not None:
+                with self._connect() as db:
+                    row = db.execute(
+                        f"SELECT value, expires FROM {self.name} "
+                        "WHERE key = ? AND expires > ?",
+                        (key, now),
+                    ).fetchone()
+                if row is not None:
+                    entry = (json.loads(row[0]), row[1])
+                    self._store(key, entry)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """
+        Cache a value under key, evicting the least recently used entries.
+        """
+        key = json.dumps(key)
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._store(key, (value, expires))
+            if self.path is None:
+                return
+            self._writes += 1
+            with self._connect() as db:
+                db.execute(
+                    f"INSERT OR REPLACE INTO {self.name} VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires),
+                )
+                if self._writes % _PURGE_EVERY == 0:
+                    db.execute(
+                        f"DELETE FROM {self.name} WHERE expires <= ?", (time.time(),)
+                    )
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class ChatCache:
+    """
+    The chatbot's cache tiers: query plans by normalised query, formatted API
+    payloads by path and data version, and final answers by normalised
+    query, data version and conversation (None for answers given without
+    history, which any conversation may reuse).
+
+    :param path: Optional SQLite database path shared by the tiers.
+    :param limits: Dictionary of tier -> (max entries, TTL seconds).
+    """
+
+    def __init__(self, path=None, limits=TIER_LIMITS):
+        if path is not None:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.plans = TTLCache("plans", *limits["plans"], path=path)
+        self.payloads = TTLCache("payloads", *limits["payloads"], path=path)
+        self.answers = TTLCache("answers", *limits["answers"], path=path)
+
+    def stats(self):
+        """
+        Return hit/miss counters and sizes per tier.
+        """
+        return {
+            tier.name: tier.stats()
+            for tier in (self.plans, self.payloads, self.answers)
+        }
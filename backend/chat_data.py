@@ -0,0 +1,138 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+# Threads fetching API data for one chat message
+DEFAULT_WORKERS = 8
+# Seconds a chat message waits for its API data; slower calls report an error
+DEFAULT_TIMEOUT = float(os.getenv("CHAT_API_TIMEOUT", "10"))
+
+# API name -> URL path on this server
+API_ENDPOINTS = {
+    "trending_interests": "/api/trending-interests",
+    "active_communities": "/api/active-communities",
+    "influence_analysis": "/api/influence-analysis",
+    "interaction_trends": "/api/interaction-trends",
+    "user_search": "/api/user-search/{user_id}",
+    "user_influence": "/api/user-influence/{user_id}",
+    "user_interaction": "/api/user-interactions/{user_id}",
+    "recommended_connections": "/api/recommended-connections/{user_id}",
+    "recommended_communities": "/api/recommended-communities/{user_id}",
+}
+# APIs called once per user ID found in the query
+USER_APIS = {
+    "user_search",
+    "user_influence",
+    "user_interaction",
+    "recommended_connections",
+    "recommended_communities",
+}
+
+
+def limit_lists(data, limit):
+    """
+    Truncate the top-level lists of an API response to ``limit`` items.
+    """
+    if limit and isinstance(data, dict):
+        for key in data:
+            if isinstance(data[key], list):
+                data[key] = data[key][:limit]
+    return data
+
+
+class ChatDataClient:
+    """
+    In-process access to the API for the chatbot.
+
+    Requests are dispatched straight to the Flask app's WSGI handler, so
+    they need no socket, cannot deadlock a single-threaded server that is
+    busy serving the chat request itself, and share its response cache.
+    Independent calls run concurrently on a thread pool; a call that is
+    still running when the deadline passes is reported as an error so the
+    chat answer waits for the slowest call at most ``timeout`` seconds.
+
+    :param app: Flask app serving the API.
+    :param workers: Number of fetch threads.
+    :param timeout: Seconds to wait for one batch of calls.
+    :param data_tag: Optional callable returning a tag of the current data
+        version, used to key cached payloads and answers.
+    """
+
+    def __init__(
+        self, app, workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT, data_tag=None
+    ):
+        self.app = app
+        self.timeout = timeout
+        self.data_tag = data_tag or (lambda: None)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="chat-data"
+        )
+
+    def fetch(self, path, limit=None):
+        """
+        Call one API path and return its JSON body (or {"error": ...}).
+
+        :param path: URL path, e.g. "/api/trending-interests".
+        :param limit: Optional length limit for top-level lists.
+        """
+        # A client per call: test clients keep cookies and are not shared safely
+        response = self.app.test_client(use_cookies=False).get(path)
+        data = response.get_json(silent=True)
+        if response.status_code != 200 or data is None:
+            error = (data or {}).get("error") or f"HTTP {response.status_code}"
+            print(f"Error fetching data from {path}: {error}")
+            return {"error": f"Failed to fetch data from {path}. Error: {error}"}
+        return limit_lists(data, limit)
+
+    def fetch_many(self, calls, limit=None):
+        """
+        Call several API paths concurrently.
+
+        :param calls: Dictionary of result key -> URL path.
+        :param limit: Optional length limit for top-level lists.
+        :return: Dictionary of result key -> JSON body, in ``calls`` order.
+        """
+        deadline = time.monotonic() + self.timeout
+        futures = {
+            key: self._executor.submit(self.fetch, path, limit)
+            for key, path in calls.items()
+        }
+        results = {}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result(
+                    timeout=max(0, deadline - time.monotonic())
+                )
+            except TimeoutError:
+                future.cancel()
+                print(f"Timed out fetching data from {calls[key]}")
+                results[key] = {
+                    "error": f"Timed out after {self.timeout}s fetching {calls[key]}."
+                }
+            except Exception as e:
+                print(f"Error fetching data from {calls[key]}: {str(e)}")
+                results[key] = {
+                    "error": f"Failed to fetch data from {calls[key]}. Error: {str(e)}"
+                }
+        return results
+
+
+def plan_calls(api_triggers, user_ids):
+    """
+    Map the APIs chosen for a query to the calls to make.
+
+    :param api_triggers: API names, e.g. from the classifier.
+    :param user_ids: User IDs mentioned in the query.
+    :return: Dictionary of payload key -> (API name, URL path).
+    """
+    calls = {}
+    for trigger in api_triggers:
+        if trigger in USER_APIS:
+            if not user_ids:
+                print(f"Skipping {trigger}: No user IDs found.")
+            for user_id in user_ids:
+                path = API_ENDPOINTS[trigger].format(user_id=user_id)
+                calls[f"{trigger}_{user_id}"] = (trigger, path)
+        elif trigger in API_ENDPOINTS:
+            calls[trigger] = (trigger, API_ENDPOINTS[trigger])
+    return calls
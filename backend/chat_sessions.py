@@ -0,0 +1,240 @@
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+# History tokens sent with each answer; older turns are folded into a summary
+DEFAULT_TOKEN_BUDGET = 2000
+DEFAULT_MAX_SESSIONS = 1000
+# Seconds a conversation may sit idle before it is dropped
+DEFAULT_TTL = 30 * 60
+# Rough characters per token, for text the model has not counted
+CHARS_PER_TOKEN = 4
+MAX_CONVERSATION_ID_LENGTH = 64
+
+SUMMARY_PROMPT = """
+Summarize the conversation below between a social media platform manager and
+a data assistant in at most {words} words. Keep user IDs, figures and open
+questions; drop pleasantries.
+
+{summary}{turns}
+"""
+
+
+def estimate_tokens(text):
+    """
+    Estimate the number of model tokens in a text.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def new_conversation_id():
+    return uuid.uuid4().hex
+
+
+def validate_conversation_id(conversation_id):
+    """
+    :raises ValueError: If the conversation ID is not a short string.
+    """
+    if (
+        not isinstance(conversation_id, str)
+        or not 0 < len(conversation_id) <= MAX_CONVERSATION_ID_LENGTH
+    ):
+        raise ValueError(
+            f"conversation_id must be a string of 1 to {MAX_CONVERSATION_ID_LENGTH} characters."
+        )
+    return conversation_id
+
+
+class ChatSession:
+    """
+    One conversation: its recent turns, a summary of older ones and its token usage.
+
+    Only what the user wrote and the answers they saw are remembered;
+    internal prompts and the API data behind an answer are not, so the
+    history sent with each message stays small. Once the remembered turns
+    exceed ``token_budget`` the oldest are folded into the summary, down to
+    half the budget so that summarising happens only every few turns.
+
+    :param conversation_id: Conversation ID.
+    :param complete: Callable taking a list of {"role", "parts"} contents and
+        returning (reply text, prompt tokens, reply tokens); token counts may be None.
+    :param token_budget: History tokens sent with each answer.
+    """
+
+    def __init__(self, conversation_id, complete, token_budget=DEFAULT_TOKEN_BUDGET):
+        self.conversation_id = conversation_id
+        self.token_budget = token_budget
+        self.summary = ""
+        self.turns = []
+        self.last_used = time.monotonic()
+        self.usage = {"calls": 0, "prompt_tokens": 0, "reply_tokens": 0}
+        self._complete = complete
+        self._lock = threading.Lock()
+
+    def history(self):
+        """
+        Return the remembered conversation as model contents.
+        """
+        contents = []
+        if self.summary:
+            contents.append(
+                {"role": "user", "parts": [f"Conversation so far: {self.summary}"]}
+            )
+            contents.append({"role": "model", "parts": ["Noted."]})
+        for question, answer, _ in self.turns:
+            contents.append({"role": "user", "parts": [question]})
+            contents.append({"role": "model", "parts": [answer]})
+        return contents
+
+    def has_history(self):
+        """
+        Return whether any turn is remembered, i.e. whether answers depend on this conversation.
+        """
+        with self._lock:
+            return bool(self.summary or self.turns)
+
+    def _call(self, contents):
+        text, prompt_tokens, reply_tokens = self._complete(contents)
+        if prompt_tokens is None:
+            prompt_tokens = sum(
+                estimate_tokens(part)
+                for content in contents
+                for part in content["parts"]
+            )
+        if reply_tokens is None:
+            reply_tokens = estimate_tokens(text)
+        with self._lock:
+            self.usage["calls"] += 1
+            self.usage["prompt_tokens"] += prompt_tokens
+            self.usage["reply_tokens"] += reply_tokens
+        return text
+
+    def ask(self, prompt):
+        """
+        Send a one-off prompt without the history and without remembering it.
+        """
+        return self._call([{"role": "user", "parts": [prompt]}])
+
+    def reply(self, question, prompt):
+        """
+        Answer a user message in the context of the conversation.
+
+        :param question: The message as the user wrote it; this is what is remembered.
+        :param prompt: The full prompt for this answer (instructions and data).
+        :return: The answer text.
+        """
+        with self._lock:
+            history = self.history()
+        answer = self._call(history + [{"role": "user", "parts": [prompt]}])
+        self.remember(question, answer)
+        return answer
+
+    def remember(self, question, answer):
+        """
+        Add a turn to the history, e.g. one answered from a cache.
+        """
+        with self._lock:
+            tokens = estimate_tokens(question) + estimate_tokens(answer)
+            self.turns.append((question, answer, tokens))
+            over_budget = self._window_tokens() > self.token_budget
+        if over_budget:
+            self._summarize()
+
+    def _window_tokens(self):
+        return estimate_tokens(self.summary) + sum(t for _, _, t in self.turns)
+
+    def _summarize(self):
+        """
+        Fold the oldest turns into the summary until the history is within half the budget.
+        """
+        with self._lock:
+            old = []
+            while (
+                len(self.turns) > 1 and self._window_tokens() > self.token_budget // 2
+            ):
+                old.append(self.turns.pop(0))
+            previous = self.summary
+        if not old:
+            return
+        turns = "\n".join(f"User: {q}\nAssistant: {a}" for q, a, _ in old)
+        prompt = SUMMARY_PROMPT.format(
+            words=self.token_budget // 4,
+            summary=f"Earlier summary: {previous}\n\n" if previous else "",
+            turns=turns,
+        )
+        try:
+            summary = self.ask(prompt).strip()
+        except Exception as e:
+            print(f"Error summarizing conversation {self.conversation_id}: {str(e)}")
+            # Keep the most recent part of the dropped text rather than nothing
+            summary = (previous + "\n" + turns)[
+                -self.token_budget * CHARS_PER_TOKEN // 4 :
+            ]
+        with self._lock:
+            self.summary = summary
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "conversation_id": self.conversation_id,
+                "turns": len(self.turns),
+                "history_tokens": self._window_tokens(),
+                "usage": dict(self.usage),
+            }
+
+
+class SessionManager:
+    """
+    Chat sessions by conversation ID, evicted when idle too long or least recently used.
+
+    :param complete: Model call shared by all sessions (see ChatSession).
+    :param max_sessions: Sessions kept in memory.
+    :param ttl: Seconds of inactivity after which a session is dropped.
+    :param token_budget: History token budget of each session.
+    """
+
+    def __init__(
+        self,
+        complete,
+        max_sessions=DEFAULT_MAX_SESSIONS,
+        ttl=DEFAULT_TTL,
+        token_budget=DEFAULT_TOKEN_BUDGET,
+    ):
+        self.complete = complete
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.token_budget = token_budget
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get(self, conversation_id):
+        """
+        Return the session of a conversation, starting a new one if it is unknown or expired.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            session = self._sessions.get(conversation_id)
+            if session is None:
+                session = ChatSession(
+                    conversation_id, self.complete, token_budget=self.token_budget
+                )
+                self._sessions[conversation_id] = session
+            self._sessions.move_to_end(conversation_id)
+            session.last_used = now
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return session
+
+    def _evict(self, now):
+        # Least recently used first, so expired sessions are at the front
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_used <= self.ttl:
+                break
+            self._sessions.popitem(last=False)
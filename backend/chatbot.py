@@ -1,13 +1,16 @@
 import os
 import json
-import requests
 import google.generativeai as genai
 from dotenv import load_dotenv
 
+from chat_cache import ChatCache, normalize_query
+from chat_data import plan_calls
+from chat_sessions import SessionManager
+from query_planner import QueryPlan, plan_query
+
 # Load environment variables
 load_dotenv()
 API_KEY = os.getenv("GOOGLE_API_KEY")
-BASE_API_URL = "http://127.0.0.1:5000/api"
 
 
 # Configure Gemini SDK
@@ -20,40 +23,30 @@ generation_config = {
 model = genai.GenerativeModel(
     model_name="gemini-1.5-flash", generation_config=generation_config
 )
-chat_session = model.start_chat(history=[])
-
-# API endpoints mapping
-API_ENDPOINTS = {
-    "trending_interests": f"{BASE_API_URL}/trending-interests",
-    "active_communities": f"{BASE_API_URL}/active-communities",
-    "influence_analysis": f"{BASE_API_URL}/influence-analysis",
-    "interaction_trends": f"{BASE_API_URL}/interaction-trends",
-    "user_search": f"{BASE_API_URL}/user-search/{{user_id}}",
-    "user_influence": f"{BASE_API_URL}/user-influence/{{user_id}}",
-    "user_interaction": f"{BASE_API_URL}/user-interactions/{{user_id}}",
-    "recommended_connections": f"{BASE_API_URL}/recommended-connections/{{user_id}}",
-    "recommended_communities": f"{BASE_API_URL}/recommended-communities/{{user_id}}",
-}
 
 
-# Fetch data from APIs
-def fetch_api_data(endpoint, params=None, limit=None):
-    try:
-        print(f"Fetching data from: {endpoint}")
-        response = requests.get(endpoint, params=params)
-        response.raise_for_status()
-        data = response.json()
-
-        # Limit results if applicable
-        if limit and isinstance(data, dict):
-            for key in data:
-                if isinstance(data[key], list):
-                    data[key] = data[key][:limit]
-        print(f"Data fetched successfully: {json.dumps(data, indent=2)}")
-        return data
-    except requests.RequestException as e:
-        print(f"Error fetching data from {endpoint}: {str(e)}")
-        return {"error": f"Failed to fetch data from {endpoint}. Error: {str(e)}"}
+def complete(contents):
+    """
+    Call the model with a list of {"role", "parts"} contents.
+
+    :return: (reply text, prompt tokens, reply tokens); counts are None if not reported.
+    """
+    response = model.generate_content(contents)
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return response.text, None, None
+    return response.text, usage.prompt_token_count, usage.candidates_token_count
+
+
+# One session per conversation, each with its own bounded history
+chat_sessions = SessionManager(
+    complete,
+    max_sessions=int(os.getenv("CHAT_MAX_SESSIONS", "1000")),
+    ttl=int(os.getenv("CHAT_SESSION_TTL", "1800")),
+    token_budget=int(os.getenv("CHAT_HISTORY_TOKENS", "2000")),
+)
+# Query plans, API payloads and answers; CHAT_CACHE_FILE also keeps them on disk
+chat_cache = ChatCache(path=os.getenv("CHAT_CACHE_FILE") or None)
 
 
 # Preprocess data for Gemini
@@ -123,97 +116,77 @@ def format_data_for_gemini(api_name, data):
         return {"error": f"Formatting failed for {api_name}. Error: {str(e)}"}
 
 
-# Extract User IDs using LLM
-def extract_user_ids(user_input):
-    user_id_prompt = f"""
-    Extract the user ID(s) from the input query. The user ID is a unique identifier for a user in the social media platform.
-    You can do this by looking for patterns like:
-    - user id (e.g., "user 12")
-    - User ID (e.g., "User 22")
-    - u<digits> (e.g., "u32")
-    - U<digits> (e.g., "U77"), etc.
-
-    Output all found user IDs in the format "U<number>". One per line, with a comma between multiple IDs.
-    If no user ID is found, return "None".
-
-    User Query: "{user_input}"
-    """
-    response = chat_session.send_message(user_id_prompt)
-    user_ids = [
-        uid.strip() for uid in response.text.strip().split(",") if uid.startswith("U")
-    ]
-    print(f"Extracted User IDs: {user_ids}")
-    return user_ids
-
-
-# Classify user query and trigger APIs
-def classify_and_trigger_apis(user_input):
-    classification_prompt = f"""
-    You are an API classifier. Based on the user query below, decide which APIs to call.
-    Select all relevant APIs from the following list:
-    - trending_interests
-    - active_communities
-    - influence_analysis
-    - interaction_trends
-    - user_search (requires user_id)
-    - user_influence (requires user_id)
-    - user_interaction (requires user_id)
-    - recommended_connections (requires user_id)
-    - recommended_communities (requires user_id)
-
-    Output only the names of the relevant APIs, one per line.
-
-    User Query: "{user_input}"
-    """
-    response = chat_session.send_message(classification_prompt)
-    api_predictions = [api.strip() for api in response.text.strip().split("\n") if api]
-    print(f"Predicted APIs: {api_predictions}")
-    return api_predictions
-
-
 # Handle irrelevant queries
-def handle_irrelevant_queries(user_input):
+def handle_irrelevant_queries(user_input, session):
     small_talk_prompt = f"""
     You are a concise assistant. Respond briefly to the user's query. Do not provide long explanations or insights.
 
     User Query: {user_input}
     """
-    response = chat_session.send_message(small_talk_prompt)
-    return response.text.strip()
+    return session.reply(user_input, small_talk_prompt).strip()
 
 
 # Process and respond to queries
-def get_chatbot_response(user_input):
+def get_chatbot_response(user_input, data_client, session):
+    """
+    Answer a chat message, fetching the API data it needs in-process.
+
+    The query planner picks the APIs locally where it can, so most
+    messages need a single model call: the answer itself. Query plans,
+    formatted API data and answers to data questions are cached, the
+    latter two per data version, so a repeated question is answered
+    without calling the model. Answers given with some history depend on
+    the conversation, so they are only reused within it; those given at
+    the start of a conversation are shared by all.
+
+    :param user_input: The user's message.
+    :param data_client: ChatDataClient used to call the API.
+    :param session: ChatSession of the conversation.
+    """
     try:
-        api_triggers = classify_and_trigger_apis(user_input)
-        user_ids = extract_user_ids(user_input)
-        data_payload = {}
+        query = normalize_query(user_input)
+        tag = data_client.data_tag()
+        scope = session.conversation_id if session.has_history() else None
+        answer = chat_cache.answers.get([query, tag, scope])
+        if answer is not None:
+            session.remember(user_input, answer)
+            return answer
+
+        cached_plan = chat_cache.plans.get(query)
+        if cached_plan is not None:
+            plan = QueryPlan(cached_plan["apis"], cached_plan["user_ids"], "cache")
+        else:
+            plan = plan_query(user_input, session.ask)
+            # An empty model plan may be a failed call, so it is not kept
+            if plan.apis or plan.source == "local":
+                chat_cache.plans.put(
+                    query, {"apis": plan.apis, "user_ids": plan.user_ids}
+                )
+        print(f"Query plan: {plan}")
 
-        # Handle user-specific APIs
-        for trigger in api_triggers:
-            if trigger in [
-                "user_search",
-                "user_influence",
-                "user_interaction",
-                "recommended_connections",
-                "recommended_communities",
-            ]:
-                if user_ids:
-                    for user_id in user_ids:
-                        endpoint = API_ENDPOINTS[trigger].format(user_id=user_id)
-                        api_data = fetch_api_data(endpoint, limit=20)
-                        formatted_data = format_data_for_gemini(trigger, api_data)
-                        data_payload[f"{trigger}_{user_id}"] = formatted_data
+        # Every API call is independent, so they all run at once
+        calls = plan_calls(plan.apis, plan.user_ids)
+        data_payload = {}
+        for key, (_, path) in calls.items():
+            payload = chat_cache.payloads.get([path, tag])
+            if payload is not None:
+                data_payload[key] = payload
+        results = data_client.fetch_many(
+            {key: path for key, (_, path) in calls.items() if key not in data_payload},
+            limit=20,
+        )
+        complete_data = True
+        for key, (trigger, path) in calls.items():
+            if key in results:
+                data_payload[key] = format_data_for_gemini(trigger, results[key])
+                if "error" in data_payload[key]:
+                    complete_data = False
                 else:
-                    print(f"Skipping {trigger}: No user IDs found.")
-            elif trigger in API_ENDPOINTS:
-                endpoint = API_ENDPOINTS[trigger]
-                api_data = fetch_api_data(endpoint, limit=20)
-                formatted_data = format_data_for_gemini(trigger, api_data)
-                data_payload[trigger] = formatted_data
+                    chat_cache.payloads.put([path, tag], data_payload[key])
+        data_payload = {key: data_payload[key] for key in calls}
 
         if not data_payload:
-            return handle_irrelevant_queries(user_input)
+            return handle_irrelevant_queries(user_input, session)
 
         master_prompt = f"""
         You are an advanced data assistant for a social media platform manager. Based on the user's query and preprocessed data, provide the following:
@@ -230,8 +203,11 @@ def get_chatbot_response(user_input):
 
         Focus on actionable insights and avoid technical jargon.
         """
-        response = chat_session.send_message(master_prompt)
-        return response.text.strip()
+        answer = session.reply(user_input, master_prompt).strip()
+        # Answers built on failed API calls are not reused
+        if complete_data:
+            chat_cache.answers.put([query, tag, scope], answer)
+        return answer
 
     except Exception as e:
         print(f"Error processing chatbot response: {str(e)}")
@@ -0,0 +1,648 @@
+import argparse
+import json
+import os
+import shutil
+
+import networkx as nx  # type: ignore
+import numpy as np
+
+from compact_graph import CompactGraph
+from graph_store import digest_file
+from ingest import Progress, batched, iter_records, merge_interaction
+
+SCHEMA_VERSION = 2
+MANIFEST = "manifest.json"
+DEFAULT_BATCH_SIZE = 10000
+# Strings with at most this many distinct values are dictionary-encoded.
+MAX_DICTIONARY_SIZE = 1 << 15
+# Placeholder for fields a record does not have (as opposed to null)
+_MISSING = object()
+# dtype of the ``values`` array per column kind
+_VALUE_DTYPES = {
+    "bool": np.bool_,
+    "int": np.int64,
+    "float": np.float64,
+    "category": np.int32,
+    "category_list": np.int32,
+    "category_counts": np.int32,
+}
+
+
+class StringTable:
+    """
+    Variable-length UTF-8 strings stored as one byte blob plus int64 offsets.
+
+    :param offsets: Array of n + 1 offsets into data.
+    :param data: uint8 array of concatenated UTF-8 bytes.
+    """
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx):
+        return bytes(self.data[self.offsets[idx] : self.offsets[idx + 1]]).decode()
+
+    def slice(self, start, stop):
+        """
+        Decode strings start..stop as a list.
+        """
+        offsets = self.offsets[start : stop + 1].tolist()
+        blob = bytes(self.data[offsets[0] : offsets[-1]]) if offsets else b""
+        base = offsets[0] if offsets else 0
+        return [
+            blob[a - base : b - base].decode() for a, b in zip(offsets, offsets[1:])
+        ]
+
+    @staticmethod
+    def encode(strings):
+        """
+        Return (offsets, data) arrays for a list of strings.
+        """
+        encoded = [s.encode() for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+class Column:
+    """
+    One decoded-on-demand field of a columnar table.
+
+    Kinds:
+    - ``int``/``float``/``bool``: ``values`` holds the scalars.
+    - ``category``: ``values`` holds codes into ``dictionary``.
+    - ``string``: ``strings`` is a StringTable.
+    - ``category_list``: lists of strings as CSR ``offsets`` + codes in ``values``.
+    - ``category_counts``: string -> int dicts as CSR ``offsets``, key codes in
+      ``values`` and the ints in ``counts``.
+    - ``json``: anything else, JSON-encoded in a StringTable.
+
+    ``mask`` (optional) marks rows where the field is present.
+    """
+
+    def __init__(
+        self,
+        kind,
+        values=None,
+        strings=None,
+        offsets=None,
+        dictionary=None,
+        counts=None,
+        mask=None,
+    ):
+        self.kind = kind
+        self.values = values
+        self.strings = strings
+        self.offsets = offsets
+        self.dictionary = dictionary
+        self.counts = counts
+        self.mask = mask
+
+    def slice(self, start, stop):
+        """
+        Decode rows start..stop as a list of Python values.
+        """
+        if self.kind in ("int", "float", "bool"):
+            return self.values[start:stop].tolist()
+        if self.kind == "category":
+            dictionary = self.dictionary
+            return [dictionary[code] for code in self.values[start:stop].tolist()]
+        if self.kind == "string":
+            return self.strings.slice(start, stop)
+        if self.kind == "json":
+            return [json.loads(s) for s in self.strings.slice(start, stop)]
+        # category_list and category_counts
+        dictionary = self.dictionary
+        bounds = self.offsets[start : stop + 1].tolist()
+        first, last = (bounds[0], bounds[-1]) if bounds else (0, 0)
+        names = [dictionary[c] for c in self.values[first:last].tolist()]
+        spans = [(a - first, b - first) for a, b in zip(bounds, bounds[1:])]
+        if self.kind == "category_list":
+            return [names[a:b] for a, b in spans]
+        counts = self.counts[first:last].tolist()
+        return [dict(zip(names[a:b], counts[a:b])) for a, b in spans]
+
+
+class _FieldStats:
+    """
+    Running summary of one field's values, enough to choose its column kind.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.has_null = False
+        self.bools = self.ints = self.floats = self.strings = True
+        self.string_lists = self.string_counts = True
+        # Bounded: one value past the limit already rules out a dictionary
+        self.distinct = set()
+
+    def add(self, value):
+        self.count += 1
+        self.has_null = self.has_null or value is None
+        self.bools = self.bools and isinstance(value, bool)
+        self.ints = self.ints and isinstance(value, int) and not isinstance(value, bool)
+        self.floats = self.floats and isinstance(value, float)
+        self.strings = self.strings and isinstance(value, str)
+        self.string_lists = (
+            self.string_lists
+            and isinstance(value, list)
+            and all(isinstance(x, str) for x in value)
+        )
+        self.string_counts = (
+            self.string_counts
+            and isinstance(value, dict)
+            and all(isinstance(k, str) and type(n) is int for k, n in value.items())
+        )
+        if self.strings and len(self.distinct) <= MAX_DICTIONARY_SIZE:
+            self.distinct.add(value)
+
+    @property
+    def kind(self):
+        if self.has_null:
+            # Explicit nulls only survive the JSON encoding.
+            return "json"
+        if self.bools:
+            return "bool"
+        if self.ints:
+            return "int"
+        if self.floats:
+            return "float"
+        if self.strings:
+            distinct = len(self.distinct)
+            if distinct <= MAX_DICTIONARY_SIZE and distinct * 2 <= self.count:
+                return "category"
+            return "string"
+        if self.string_lists:
+            return "category_list"
+        if self.string_counts:
+            return "category_counts"
+        # Mixed types (including int/float mixes) round-trip exactly as JSON.
+        return "json"
+
+
+class _ColumnWriter:
+    """
+    Encodes one field batch by batch into NumPy chunks and writes its arrays.
+
+    :param kind: Column kind chosen by _FieldStats.
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.dictionary = {}
+        self.masks = []
+        self.values = []
+        self.lengths = []
+        self.counts = []
+        self.data = []
+
+    def append(self, values):
+        """
+        Encode one batch of values, with _MISSING for absent fields.
+        """
+        present = np.array([v is not _MISSING for v in values], dtype=np.bool_)
+        self.masks.append(present)
+        if not present.all():
+            values = [None if v is _MISSING else v for v in values]
+
+        kind = self.kind
+        if kind in ("bool", "int", "float"):
+            encoded = [v or 0 for v in values]
+        elif kind == "category":
+            dictionary = self.dictionary
+            encoded = [dictionary.setdefault(v or "", len(dictionary)) for v in values]
+        elif kind == "category_list":
+            dictionary = self.dictionary
+            self.lengths.append(np.array([len(v or []) for v in values], np.int64))
+            encoded = [
+                dictionary.setdefault(x, len(dictionary))
+                for v in values
+                for x in v or []
+            ]
+        elif kind == "category_counts":
+            dictionary = self.dictionary
+            self.lengths.append(np.array([len(v or {}) for v in values], np.int64))
+            encoded = [
+                dictionary.setdefault(k, len(dictionary))
+                for v in values
+                for k in v or {}
+            ]
+            self.counts.append(
+                np.array([n for v in values for n in (v or {}).values()], np.int64)
+            )
+        else:
+            strings = (
+                [v or "" for v in values]
+                if kind == "string"
+                else [json.dumps(v) for v in values]
+            )
+            blobs = [s.encode() for s in strings]
+            self.lengths.append(np.array([len(b) for b in blobs], np.int64))
+            self.data.append(np.frombuffer(b"".join(blobs), dtype=np.uint8))
+            return
+        self.values.append(np.array(encoded, dtype=_VALUE_DTYPES[kind]))
+
+    def save(self, directory, prefix):
+        """
+        Write the column's arrays and return its manifest entry.
+        """
+
+        def save(suffix, chunks, dtype):
+            array = np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+            np.save(os.path.join(directory, f"{prefix}.{suffix}.npy"), array)
+
+        def save_offsets():
+            lengths = np.concatenate(self.lengths) if self.lengths else []
+            offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=offsets[1:])
+            np.save(os.path.join(directory, f"{prefix}.offsets.npy"), offsets)
+
+        entry = {"kind": self.kind}
+        if not all(mask.all() for mask in self.masks):
+            save("mask", self.masks, np.bool_)
+            entry["mask"] = True
+        if self.kind in ("string", "json"):
+            save_offsets()
+            save("data", self.data, np.uint8)
+            return entry
+        if self.kind in ("category_list", "category_counts"):
+            save_offsets()
+        if self.kind == "category_counts":
+            save("counts", self.counts, np.int64)
+        save("values", self.values, _VALUE_DTYPES[self.kind])
+        if self.kind in ("category", "category_list", "category_counts"):
+            entry["dictionary"] = list(self.dictionary)
+        return entry
+
+
+def _write_table(directory, table, records, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Write records column by column and return the table's manifest entry.
+
+    Records are streamed twice: once to choose every field's kind, once
+    to encode them in batches, so only the encoded arrays are held.
+
+    :param directory: Snapshot directory being written.
+    :param table: Table name, the prefix of its array files.
+    :param records: Zero-argument callable returning a fresh record iterator.
+    :param batch_size: Records encoded per batch.
+    """
+    stats = {}
+    for record in records():
+        for name, value in record.items():
+            if name not in stats:
+                stats[name] = _FieldStats()
+            stats[name].add(value)
+
+    writers = {name: _ColumnWriter(field.kind) for name, field in stats.items()}
+    length = 0
+    for batch in batched(records(), batch_size):
+        for name, writer in writers.items():
+            writer.append([record.get(name, _MISSING) for record in batch])
+        length += len(batch)
+    return {
+        "length": length,
+        "fields": {
+            name: writer.save(directory, f"{table}.{name}")
+            for name, writer in writers.items()
+        },
+    }
+
+
+def _load_column(directory, prefix, entry, mmap_mode):
+    def load(suffix):
+        return np.load(
+            os.path.join(directory, f"{prefix}.{suffix}.npy"), mmap_mode=mmap_mode
+        )
+
+    kind = entry["kind"]
+    mask = load("mask") if entry.get("mask") else None
+    if kind in ("string", "json"):
+        return Column(
+            kind, strings=StringTable(load("offsets"), load("data")), mask=mask
+        )
+    if kind in ("category_list", "category_counts"):
+        return Column(
+            kind,
+            values=load("values"),
+            offsets=load("offsets"),
+            dictionary=entry["dictionary"],
+            counts=load("counts") if kind == "category_counts" else None,
+            mask=mask,
+        )
+    return Column(
+        kind, values=load("values"), dictionary=entry.get("dictionary"), mask=mask
+    )
+
+
+class ColumnarTable:
+    """
+    A table of records stored column by column.
+
+    :param length: Number of rows.
+    :param columns: Ordered mapping of field name -> Column.
+    """
+
+    def __init__(self, length, columns):
+        self.length = length
+        self.columns = columns
+
+    def __len__(self):
+        return self.length
+
+    def iter_records(self, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Yield rows as dicts equal to the original JSON records.
+        """
+        fields = list(self.columns)
+        for start in range(0, self.length, batch_size):
+            stop = min(start + batch_size, self.length)
+            values = [self.columns[f].slice(start, stop) for f in fields]
+            masks = [
+                (
+                    self.columns[f].mask[start:stop].tolist()
+                    if self.columns[f].mask is not None
+                    else None
+                )
+                for f in fields
+            ]
+            if not any(masks):
+                for row in zip(*values):
+                    yield dict(zip(fields, row))
+                continue
+            for row in range(stop - start):
+                yield {
+                    field: column[row]
+                    for field, column, mask in zip(fields, values, masks)
+                    if mask is None or mask[row]
+                }
+
+
+def _source_fingerprint(path):
+    st = os.stat(path)
+    return {
+        "path": os.path.abspath(path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha1": digest_file(path),
+    }
+
+
+def _load_table(directory, table, spec, mmap_mode):
+    return ColumnarTable(
+        spec["length"],
+        {
+            name: _load_column(directory, f"{table}.{name}", entry, mmap_mode)
+            for name, entry in spec["fields"].items()
+        },
+    )
+
+
+def _save_compact(directory, compact):
+    """
+    Write a CompactGraph's arrays and return its manifest entry.
+    """
+    arrays = {
+        "indptr": compact.indptr,
+        "indices": compact.indices,
+        "edge_ids": compact.edge_ids,
+        **{f"columns.{name}": column for name, column in compact.columns.items()},
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(directory, f"compact.{name}.npy"), array)
+    return {
+        "columns": list(compact.columns),
+        "interaction_types": compact.interaction_types,
+    }
+
+
+def compile_dataset(users_path, interactions_path, out_dir, progress_interval=5.0):
+    """
+    Compile the users and interactions JSON files into a columnar snapshot directory.
+
+    The snapshot holds the graph already built, so opening it decodes no
+    interaction records:
+    - ``users.*``: one column per user field (strings as a byte blob plus
+      offsets, low-cardinality strings and interest lists dictionary-encoded).
+    - ``nodes.*``: node IDs in graph order, as a string table.
+    - ``edges.*``: one row per user pair, interactions aggregated as
+      aggregate_edges() does, with int32 endpoint node IDs in
+      ``edges.source``/``edges.target``, in the order the pairs first appear.
+    - ``compact.*``: the CompactGraph CSR arrays and edge columns.
+
+    Both files are streamed; only encoded arrays and one attribute dict per
+    user pair are held. The snapshot is written next to ``out_dir`` and
+    moved into place at the end.
+
+    :param users_path: Users JSON file.
+    :param interactions_path: Interactions JSON file.
+    :param out_dir: Snapshot directory to create or replace.
+    :param progress_interval: Seconds between progress reports; None for silence.
+    :return: Path of the snapshot directory.
+    """
+    tmp_dir = f"{out_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    manifest = {
+        "schema_version": SCHEMA_VERSION,
+        "sources": {
+            "users": _source_fingerprint(users_path),
+            "interactions": _source_fingerprint(interactions_path),
+        },
+        "tables": {},
+    }
+
+    def tracked(label, records):
+        progress = Progress(label, progress_interval)
+        for record in records:
+            progress.update(1)
+            yield record
+        if progress_interval is not None:
+            progress.report()
+
+    users_spec = _write_table(
+        tmp_dir, "users", lambda: tracked("users", iter_records(users_path, "users"))
+    )
+    manifest["tables"]["users"] = users_spec
+    users = _load_table(tmp_dir, "users", users_spec, "r")
+    index = {}
+    if "user_id" in users.columns:
+        column = users.columns["user_id"]
+        user_ids = column.slice(0, len(users))
+        present = column.mask.tolist() if column.mask is not None else None
+        for row, user_id in enumerate(user_ids):
+            if user_id and (present is None or present[row]) and user_id not in index:
+                index[user_id] = len(index)
+
+    # Aggregate interactions per pair; users only seen there are appended
+    # as nodes, in the order the graph would add them.
+    pairs = {}
+    for interaction in tracked(
+        "interactions", iter_records(interactions_path, "interactions")
+    ):
+        u, v = interaction.get("source_user"), interaction.get("target_user")
+        if not u or not v:
+            continue
+        key = (u, v) if u <= v else (v, u)
+        data = pairs.get(key)
+        if data is None:
+            index.setdefault(u, len(index))
+            index.setdefault(v, len(index))
+        pairs[key] = merge_interaction(data, interaction)
+
+    manifest["tables"]["edges"] = _write_table(
+        tmp_dir, "edges", lambda: iter(pairs.values())
+    )
+    sources = np.fromiter((index[u] for u, _ in pairs), np.int32, len(pairs))
+    targets = np.fromiter((index[v] for _, v in pairs), np.int32, len(pairs))
+    np.save(os.path.join(tmp_dir, "edges.source.npy"), sources)
+    np.save(os.path.join(tmp_dir, "edges.target.npy"), targets)
+    nodes = list(index)
+    node_offsets, node_data = StringTable.encode(nodes)
+    np.save(os.path.join(tmp_dir, "nodes.offsets.npy"), node_offsets)
+    np.save(os.path.join(tmp_dir, "nodes.data.npy"), node_data)
+    compact = CompactGraph.from_edges(
+        nodes, zip(sources.tolist(), targets.tolist(), pairs.values()), len(pairs)
+    )
+    manifest["compact"] = _save_compact(tmp_dir, compact)
+
+    with open(os.path.join(tmp_dir, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    old_dir = f"{out_dir}.old-{os.getpid()}"
+    if os.path.exists(out_dir):
+        os.rename(out_dir, old_dir)
+    os.rename(tmp_dir, out_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return out_dir
+
+
+class ColumnarDataset:
+    """
+    A compiled snapshot opened with memory-mapped arrays.
+
+    Arrays are mapped read-only, so opening is nearly free and forked
+    workers share the same page cache.
+
+    :param path: Snapshot directory written by compile_dataset().
+    :param mmap: Memory-map arrays instead of reading them.
+    """
+
+    def __init__(self, path, mmap=True):
+        self.path = path
+        with open(os.path.join(path, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("schema_version") != SCHEMA_VERSION:
+            raise ValueError(f"Unsupported snapshot schema in {path}")
+        self._mmap_mode = "r" if mmap else None
+
+        self.tables = {
+            table: _load_table(path, table, spec, self._mmap_mode)
+            for table, spec in self.manifest["tables"].items()
+        }
+        self.nodes = StringTable(self._load("nodes.offsets"), self._load("nodes.data"))
+        self.edge_source = self._load("edges.source")
+        self.edge_target = self._load("edges.target")
+
+    def _load(self, name):
+        return np.load(
+            os.path.join(self.path, f"{name}.npy"), mmap_mode=self._mmap_mode
+        )
+
+    @property
+    def users(self):
+        return self.tables["users"]
+
+    @property
+    def edges(self):
+        return self.tables["edges"]
+
+    def compact_graph(self):
+        """
+        Return the snapshot's CompactGraph, backed by its (memory-mapped) arrays.
+        """
+        spec = self.manifest["compact"]
+        return CompactGraph(
+            self.nodes.slice(0, len(self.nodes)),
+            self._load("compact.indptr"),
+            self._load("compact.indices"),
+            self._load("compact.edge_ids"),
+            {name: self._load(f"compact.columns.{name}") for name in spec["columns"]},
+            spec["interaction_types"],
+        )
+
+    def is_fresh(self, users_path, interactions_path):
+        """
+        Return whether the snapshot was compiled from the current data files.
+        """
+        for name, path in (("users", users_path), ("interactions", interactions_path)):
+            source = self.manifest["sources"][name]
+            st = os.stat(path)
+            if st.st_size != source["size"]:
+                return False
+            if st.st_mtime_ns != source["mtime_ns"] and (
+                digest_file(path) != source["sha1"]
+            ):
+                return False
+        return True
+
+
+def open_fresh_dataset(path, users_path, interactions_path):
+    """
+    Open the snapshot at path if it exists and matches the data files, else return None.
+    """
+    if not os.path.exists(os.path.join(path, MANIFEST)):
+        return None
+    try:
+        dataset = ColumnarDataset(path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Ignoring unreadable snapshot at {path}: {e}")
+        return None
+    return dataset if dataset.is_fresh(users_path, interactions_path) else None
+
+
+def build_graph_from_dataset(dataset, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Build the interaction graph from a compiled snapshot, skipping JSON parsing.
+
+    Edges come from the pre-aggregated edge table and endpoint arrays, so
+    no interaction is decoded or merged.
+
+    :param dataset: ColumnarDataset.
+    :return: NetworkX graph equal to the one built from the JSON files.
+    """
+    graph = nx.Graph()
+    graph.add_nodes_from(
+        (user["user_id"], user)
+        for user in dataset.users.iter_records(batch_size)
+        if user.get("user_id")
+    )
+    nodes = dataset.nodes.slice(0, len(dataset.nodes))
+    # Users only seen in interactions come in the order they first appeared,
+    # matching the compact graph; edge endpoints are stored sorted.
+    graph.add_nodes_from(nodes)
+    graph.add_edges_from(
+        zip(
+            map(nodes.__getitem__, dataset.edge_source.tolist()),
+            map(nodes.__getitem__, dataset.edge_target.tolist()),
+            dataset.edges.iter_records(batch_size),
+        )
+    )
+    return graph
+
+
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Compile a columnar data snapshot")
+    parser.add_argument("--users", default=os.path.join(base_dir, "data/users.json"))
+    parser.add_argument(
+        "--interactions", default=os.path.join(base_dir, "data/interactions.json")
+    )
+    parser.add_argument("--out", default=os.path.join(base_dir, "data/snapshot"))
+    args = parser.parse_args()
+    compile_dataset(args.users, args.interactions, args.out)
+    print(f"Snapshot written to {args.out}")
@@ -1,8 +1,19 @@
-import os
-import json
 import networkx as nx # type: ignore
-from networkx.algorithms.community import greedy_modularity_communities # type: ignore
+import numpy as np
 import matplotlib.pyplot as plt
+from ingest import iter_records
+from community_engines import (
+    DEFAULT_ENGINE,
+    ENGINES,
+    WARM_START_ENGINES,
+    local_moves,
+)
+from centrality import (
+    DEFAULT_SEED,
+    approximate_centrality,
+    exact_centrality,
+    sample_size_for_error,
+)
 
 # Paths to data files
 USERS_FILE = "backend/data/users.json"
@@ -12,52 +23,30 @@ COMMUNITY_VISUALIZATION_PATH = "backend/data/community_visualization.png"
 
 def load_users_data(users_path=USERS_FILE):
     """
-    Load the users data from the JSON file.
+    Stream the users data from the JSON file.
 
     :param users_path: Path to the users data file.
-    :return: List of users.
+    :return: Iterator of users.
     """
-    if not os.path.exists(users_path):
-        raise FileNotFoundError(f"Data file not found at {users_path}")
-
-    with open(users_path, "r") as f:
-        data = json.load(f)
-
-    # Print snippets of the loaded data for verification
-    print("Loaded users snippets:")
-    print("Users:", data.get("users", [])[:2])  # Print first 2 users
-
-    return data["users"]
+    return iter_records(users_path, "users")
 
 
 def load_interactions_data(interactions_path=INTERACTIONS_FILE):
     """
-    Load the interactions data from the JSON file.
+    Stream the interactions data from the JSON file.
 
     :param interactions_path: Path to the interactions data file.
-    :return: List of interactions.
+    :return: Iterator of interactions.
     """
-    if not os.path.exists(interactions_path):
-        raise FileNotFoundError(f"Data file not found at {interactions_path}")
-
-    with open(interactions_path, "r") as f:
-        data = json.load(f)
-
-    # Print snippets of the loaded data for verification
-    print("Loaded interactions snippets:")
-    print(
-        "Interactions:", data.get("interactions", [])[:2]
-    )  # Print first 2 interactions
-
-    return data["interactions"]
+    return iter_records(interactions_path, "interactions")
 
 
 def build_graph(users, interactions):
     """
     Build a NetworkX graph from the social media data.
 
-    :param users: List of users.
-    :param interactions: List of interactions.
+    :param users: Iterable of users.
+    :param interactions: Iterable of interactions.
     :return: NetworkX graph.
     """
     G = nx.Graph()  # Undirected graph to represent interactions
@@ -89,24 +78,286 @@ def build_graph(users, interactions):
     return G
 
 
-def detect_communities(graph):
+def detect_communities(graph, engine=DEFAULT_ENGINE, seed=DEFAULT_SEED, initial=None):
     """
     Detect communities in the graph using a modularity-based algorithm.
 
     :param graph: NetworkX graph.
+    :param engine: Name of a community engine in community_engines.ENGINES.
+    :param seed: Seed for randomised engines.
+    :param initial: Optional node -> community mapping to warm-start from.
     :return: List of communities.
     """
-    communities = list(greedy_modularity_communities(graph))
+    if engine not in ENGINES:
+        raise ValueError(
+            f"Unknown community engine: {engine}. Choose one of {', '.join(ENGINES)}."
+        )
+    communities = list(ENGINES[engine](graph, seed=seed, initial=initial))
     return communities
 
 
-def analyze_centrality(graph):
+class CommunityPartition:
+    """
+    A community assignment with stable IDs and a node -> community index.
+
+    Communities are ordered by size (largest first), ties broken by their
+    smallest member, and numbered from 1 in that order, so a community ID
+    refers to the same set of users in every endpoint. Live updates keep
+    the IDs; a community emptied by them keeps its slot but is skipped.
+
+    :param communities: Iterable of node sets.
+    :param modularity: Modularity score of the partition, if known.
+    :param total_weight: Total edge weight of the graph the partition was built for.
+    """
+
+    def __init__(self, communities, modularity=None, total_weight=None):
+        self.communities = sorted(
+            (frozenset(c) for c in communities if c),
+            key=lambda c: (-len(c), min(c)),
+        )
+        self.membership = {
+            node: idx + 1
+            for idx, community in enumerate(self.communities)
+            for node in community
+        }
+        self.modularity = modularity
+        self.total_weight = total_weight
+
+    def __len__(self):
+        return sum(1 for community in self.communities if community)
+
+    def __iter__(self):
+        return (community for community in self.communities if community)
+
+    def items(self):
+        """
+        Yield (community_id, members) pairs in ID order.
+        """
+        for idx, community in enumerate(self.communities):
+            if community:
+                yield idx + 1, community
+
+    def community_of(self, node):
+        """
+        Return the community ID of a node, or None if it is not assigned.
+        """
+        return self.membership.get(node)
+
+    def members(self, community_id):
+        """
+        Return the members of a community by ID.
+        """
+        return self.communities[community_id - 1]
+
+    def with_members(self, assignments, total_weight=None):
+        """
+        Return a copy with nodes assigned or moved, keeping every existing ID.
+
+        :param assignments: Mapping of node -> community ID; IDs past the last
+            community create new communities.
+        :param total_weight: New total edge weight, if it changed.
+        :return: CommunityPartition.
+        """
+        communities = list(self.communities)
+        membership = dict(self.membership)
+        for node, community_id in assignments.items():
+            previous = membership.get(node)
+            if previous is not None:
+                communities[previous - 1] = communities[previous - 1] - {node}
+            while len(communities) < community_id:
+                communities.append(frozenset())
+            communities[community_id - 1] = communities[community_id - 1] | {node}
+            membership[node] = community_id
+
+        partition = CommunityPartition.__new__(CommunityPartition)
+        partition.communities = communities
+        partition.membership = membership
+        partition.modularity = self.modularity
+        partition.total_weight = (
+            self.total_weight if total_weight is None else total_weight
+        )
+        return partition
+
+
+def build_partition(graph, engine=DEFAULT_ENGINE, seed=DEFAULT_SEED, initial=None):
+    """
+    Detect communities and wrap them in a CommunityPartition.
+
+    :param graph: NetworkX graph.
+    :param engine: Name of a community engine in community_engines.ENGINES.
+    :param seed: Seed for randomised engines.
+    :param initial: Optional node -> community mapping to warm-start from.
+    :return: CommunityPartition.
+    """
+    communities = detect_communities(graph, engine=engine, seed=seed, initial=initial)
+    modularity = nx.algorithms.community.modularity(graph, communities)
+    return CommunityPartition(
+        communities,
+        modularity=modularity,
+        total_weight=graph.size(weight="weight"),
+    )
+
+
+def partition_key(engine, seed):
+    # Greedy modularity is deterministic, so every seed shares one partition
+    return ("communities", engine, None if engine == "greedy" else seed)
+
+
+def get_partition(snapshot, engine=DEFAULT_ENGINE, seed=DEFAULT_SEED):
+    """
+    Return the community partition for a graph snapshot, detecting it once per data version.
+
+    :param snapshot: GraphSnapshot.
+    :param engine: Name of a community engine in community_engines.ENGINES.
+    :param seed: Seed for randomised engines.
+    :return: CommunityPartition.
+    """
+    if engine not in ENGINES:
+        raise ValueError(
+            f"Unknown community engine: {engine}. Choose one of {', '.join(ENGINES)}."
+        )
+    return snapshot.derived(
+        partition_key(engine, seed),
+        lambda: build_partition(snapshot.graph, engine=engine, seed=seed),
+    )
+
+
+def get_community_labels(snapshot, engine=DEFAULT_ENGINE, seed=DEFAULT_SEED):
+    """
+    Return the community ID of every node in graph node order (0 if unassigned).
+
+    :param snapshot: GraphSnapshot.
+    :param engine: Community engine of the partition.
+    :param seed: Seed of the partition.
+    :return: int64 numpy array.
+    """
+    partition = get_partition(snapshot, engine=engine, seed=seed)
+    return snapshot.derived(
+        ("community_labels",) + partition_key(engine, seed)[1:],
+        lambda: np.array(
+            [partition.community_of(node) or 0 for node in snapshot.graph],
+            dtype=np.int64,
+        ),
+    )
+
+
+def update_partition(partition, graph, changes, derived, key):
+    """
+    Extend a partition with the nodes added by a live update.
+
+    New nodes join the community of their first already-assigned neighbour,
+    or a new community when they have none. For the Louvain and Leiden
+    engines the endpoints of the new edges are then warm-started with a
+    local moving pass (community_engines.local_moves); nodes it moves are
+    recorded in ``changes.moved[key]``. Greedy partitions are only extended
+    until the next full detection.
+    """
+    assignments = {}
+    next_id = len(partition.communities) + 1
+    for node in changes.new_nodes:
+        community_id = None
+        for neighbor in graph.neighbors(node):
+            community_id = partition.community_of(neighbor) or assignments.get(neighbor)
+            if community_id is not None:
+                break
+        if community_id is None:
+            community_id = next_id
+            next_id += 1
+        assignments[node] = community_id
+
+    total_weight = partition.total_weight
+    if total_weight is not None:
+        total_weight += sum(
+            new.get("weight", 1) - (old.get("weight", 1) if old is not None else 0)
+            for _, _, old, new in changes.edges
+        )
+    partition = partition.with_members(assignments, total_weight=total_weight)
+
+    if key[1] in WARM_START_ENGINES and total_weight is not None:
+        touched = [node for u, v, _, _ in changes.edges for node in (u, v)]
+        moves = local_moves(graph, partition, touched, total_weight)
+        moved = changes.moved.setdefault(key, {})
+        for node in moves:
+            moved.setdefault(node, partition.community_of(node))
+        partition = partition.with_members(moves)
+    return partition
+
+
+def community_activity(graph, partition):
+    """
+    Sum the interaction weight of the edges inside each community.
+
+    :param graph: NetworkX graph.
+    :param partition: CommunityPartition.
+    :return: Dictionary of community ID -> activity score.
+    """
+    activity = {community_id: 0 for community_id, _ in partition.items()}
+    for u, v, data in graph.edges(data=True):
+        community_id = partition.community_of(u)
+        if community_id is not None and community_id == partition.community_of(v):
+            activity[community_id] += data.get("weight", 1)
+    return activity
+
+
+def get_community_activity(snapshot, engine=DEFAULT_ENGINE, seed=DEFAULT_SEED):
+    """
+    Return per-community activity scores for a graph snapshot.
+
+    :param snapshot: GraphSnapshot.
+    :param engine: Community engine of the partition to score.
+    :param seed: Seed of the partition to score.
+    :return: Dictionary of community ID -> activity score.
+    """
+    partition = get_partition(snapshot, engine=engine, seed=seed)
+    return snapshot.derived(
+        ("community_activity",) + partition_key(engine, seed)[1:],
+        lambda: community_activity(snapshot.graph, partition),
+    )
+
+
+def update_community_activity(activity, graph, changes, derived, key):
+    """
+    Apply the weight changes of a live update to the community activity scores.
+
+    Communities that gained or lost members are rescored from their edges.
+    """
+    partition_key = ("communities",) + key[1:]
+    partition = derived[partition_key]
+    rescored = set()
+    for node, previous in changes.moved.get(partition_key, {}).items():
+        rescored.update((previous, partition.community_of(node)))
+
+    activity = {
+        community_id: activity.get(community_id, 0)
+        for community_id, _ in partition.items()
+    }
+    for community_id in rescored & set(activity):
+        members = partition.members(community_id)
+        activity[community_id] = sum(
+            data.get("weight", 1)
+            for u, v, data in graph.subgraph(members).edges(data=True)
+        )
+    for u, v, old, new in changes.edges:
+        community_id = partition.community_of(u)
+        if community_id in rescored:
+            continue
+        if community_id is not None and community_id == partition.community_of(v):
+            old_weight = old.get("weight", 1) if old is not None else 0
+            activity[community_id] += new.get("weight", 1) - old_weight
+    return activity
+
+
+def analyze_centrality(graph, workers=1):
     """
     Analyze centrality measures in the graph.
 
     :param graph: NetworkX graph.
+    :param workers: Worker processes for betweenness/closeness; 1 uses NetworkX serially.
     :return: Dictionary of centrality scores.
     """
+    if workers != 1:
+        return exact_centrality(graph, workers=workers)
+
     centrality_scores = {
         "degree_centrality": nx.degree_centrality(graph),
         "betweenness_centrality": nx.betweenness_centrality(graph),
@@ -115,6 +366,164 @@ def analyze_centrality(graph):
     return centrality_scores
 
 
+class CentralityTable:
+    """
+    Degree, betweenness and closeness centrality held as arrays indexed by node.
+
+    :param nodes: Node IDs in array order.
+    :param degree: Degree centrality per node.
+    :param betweenness: Betweenness centrality per node.
+    :param closeness: Closeness centrality per node.
+    :param info: Sample size and error estimates for approximate tables.
+    """
+
+    METRICS = ("degree_centrality", "betweenness_centrality", "closeness_centrality")
+
+    def __init__(self, nodes, degree, betweenness, closeness, info=None):
+        self.info = info
+        self.nodes = list(nodes)
+        self.index = {node: idx for idx, node in enumerate(self.nodes)}
+        self.columns = {
+            "degree_centrality": np.asarray(degree, dtype=np.float64),
+            "betweenness_centrality": np.asarray(betweenness, dtype=np.float64),
+            "closeness_centrality": np.asarray(closeness, dtype=np.float64),
+        }
+        # Influence is the mean of the three metrics; rank it once up front.
+        self.influence = (
+            self.columns["degree_centrality"]
+            + self.columns["betweenness_centrality"]
+            + self.columns["closeness_centrality"]
+        ) / 3
+        self.ranking = np.argsort(-self.influence, kind="stable")
+
+    @classmethod
+    def from_scores(cls, graph, scores, info=None):
+        """
+        Build a table from the dictionaries returned by analyze_centrality().
+        """
+        nodes = list(graph.nodes)
+        return cls(
+            nodes,
+            [scores["degree_centrality"].get(n, 0) for n in nodes],
+            [scores["betweenness_centrality"].get(n, 0) for n in nodes],
+            [scores["closeness_centrality"].get(n, 0) for n in nodes],
+            info=info,
+        )
+
+    def __contains__(self, node):
+        return node in self.index
+
+    def lookup(self, node):
+        """
+        Return the three centrality scores of a single node.
+        """
+        idx = self.index[node]
+        return {metric: float(self.columns[metric][idx]) for metric in self.METRICS}
+
+    def top_influencers(self, limit=None):
+        """
+        Return (node, influence score) pairs, most influential first.
+        """
+        order = self.ranking if limit is None else self.ranking[:limit]
+        return [(self.nodes[idx], float(self.influence[idx])) for idx in order]
+
+    def as_dict(self):
+        """
+        Return the scores in the shape produced by analyze_centrality().
+        """
+        return {
+            metric: dict(zip(self.nodes, self.columns[metric].tolist()))
+            for metric in self.METRICS
+        }
+
+    def with_degrees(self, graph, nodes):
+        """
+        Return a copy with degree centrality recomputed for the given nodes.
+
+        Nodes missing from the table are appended with zero betweenness and
+        closeness. Adding nodes changes the n - 1 normaliser, so every degree
+        score is rescaled; that is a single vector operation.
+
+        :param graph: NetworkX graph the degrees are read from.
+        :param nodes: Nodes whose degree changed.
+        :return: CentralityTable.
+        """
+        added = [node for node in dict.fromkeys(nodes) if node not in self.index]
+        n = len(self.nodes) + len(added)
+        degree = np.concatenate(
+            [self.columns["degree_centrality"], np.zeros(len(added))]
+        )
+        if added and len(self.nodes) > 1:
+            degree *= (len(self.nodes) - 1) / (n - 1)
+        index = dict(self.index)
+        index.update((node, len(self.nodes) + i) for i, node in enumerate(added))
+        scale = 1 / (n - 1) if n > 1 else 1
+        for node in dict.fromkeys(nodes):
+            degree[index[node]] = graph.degree(node) * scale
+
+        zeros = np.zeros(len(added))
+        return CentralityTable(
+            self.nodes + added,
+            degree,
+            np.concatenate([self.columns["betweenness_centrality"], zeros]),
+            np.concatenate([self.columns["closeness_centrality"], zeros]),
+            info=self.info,
+        )
+
+
+def update_centrality(table, graph, changes, derived, key):
+    """
+    Update degree centrality after a live update.
+
+    Betweenness and closeness are path-based and cannot be patched locally;
+    they keep their last full values until the data files are reloaded.
+    """
+    nodes = [node for u, v, old, new in changes.edges if old is None for node in (u, v)]
+    return table.with_degrees(graph, nodes + list(changes.new_nodes))
+
+
+def get_centrality(
+    snapshot, mode="exact", k=None, epsilon=None, seed=DEFAULT_SEED, workers=1
+):
+    """
+    Return the centrality table for a graph snapshot, computing it once per data version.
+
+    In ``approx`` mode betweenness and closeness are estimated from sampled
+    pivots (see centrality.approximate_centrality); the table's ``info``
+    then carries the sample size and error estimates. Approximate tables are
+    cached per (sample size, seed).
+
+    :param snapshot: GraphSnapshot.
+    :param mode: "exact" or "approx".
+    :param k: Number of pivots for approx mode.
+    :param epsilon: Target betweenness error for approx mode, used when k is not given.
+    :param seed: Pivot sampling seed for approx mode.
+    :param workers: Worker processes used to compute the table.
+    :return: CentralityTable.
+    """
+    graph = snapshot.graph
+    if mode == "exact":
+        return snapshot.derived(
+            "centrality",
+            lambda: CentralityTable.from_scores(
+                graph, analyze_centrality(graph, workers=workers)
+            ),
+        )
+    if mode != "approx":
+        raise ValueError(f"Unknown centrality mode: {mode}")
+
+    if k is None and epsilon is not None:
+        k = sample_size_for_error(graph.number_of_nodes(), epsilon)
+
+    def compute():
+        scores, info = approximate_centrality(
+            graph, k=k, epsilon=epsilon, seed=seed, workers=workers
+        )
+        return CentralityTable.from_scores(graph, scores, info=info)
+
+    return snapshot.derived(("centrality", "approx", k, seed), compute)
+
+
 def visualize_communities(graph, communities, output_path):
     """
     Visualize the graph with community coloring.
@@ -0,0 +1,346 @@
+import random
+from collections import deque
+
+from networkx.algorithms.community import greedy_modularity_communities  # type: ignore
+
+DEFAULT_ENGINE = "greedy"
+DEFAULT_RESOLUTION = 1.0
+# Upper bound on aggregation levels; real graphs converge in a handful.
+MAX_LEVELS = 32
+
+
+def _index_graph(graph, weight):
+    """
+    Convert a NetworkX graph to weighted adjacency dicts over dense node IDs.
+
+    :return: (nodes, adjacency, self-loop weights, node strengths).
+    """
+    nodes = list(graph)
+    index = {node: idx for idx, node in enumerate(nodes)}
+    adjacency = [{} for _ in nodes]
+    loops = [0.0] * len(nodes)
+    for u, v, data in graph.edges(data=True):
+        w = data.get(weight, 1)
+        i, j = index[u], index[v]
+        if i == j:
+            loops[i] += w
+        else:
+            adjacency[i][j] = adjacency[i].get(j, 0) + w
+            adjacency[j][i] = adjacency[j].get(i, 0) + w
+    strength = [sum(adjacency[i].values()) + 2 * loops[i] for i in range(len(nodes))]
+    return nodes, adjacency, loops, strength
+
+
+def _relabel(membership):
+    """
+    Renumber community labels to 0..k-1 in first-seen order.
+    """
+    labels = {}
+    return [labels.setdefault(c, len(labels)) for c in membership], len(labels)
+
+
+def _community_links(adjacency, membership, i):
+    links = {}
+    for j, w in adjacency[i].items():
+        c = membership[j]
+        links[c] = links.get(c, 0) + w
+    return links
+
+
+def _move_nodes(adjacency, strength, m2, membership, resolution, rng):
+    """
+    Louvain local moving: sweep the nodes until no move improves modularity.
+    """
+    total = [0.0] * len(adjacency)
+    for i, c in enumerate(membership):
+        total[c] += strength[i]
+    order = list(range(len(adjacency)))
+    rng.shuffle(order)
+    while True:
+        moves = 0
+        for i in order:
+            current, k = membership[i], strength[i]
+            links = _community_links(adjacency, membership, i)
+            total[current] -= k
+            best = current
+            best_gain = links.get(current, 0) - resolution * total[current] * k / m2
+            for c, w in links.items():
+                gain = w - resolution * total[c] * k / m2
+                if gain > best_gain:
+                    best, best_gain = c, gain
+            total[best] += k
+            if best != current:
+                membership[i] = best
+                moves += 1
+        if not moves:
+            return
+
+
+def _move_nodes_fast(adjacency, strength, m2, membership, resolution, rng):
+    """
+    Leiden fast local moving: only revisit neighbours of nodes that moved.
+
+    Unlike Louvain a node may also move to an empty community.
+    """
+    n = len(adjacency)
+    total = [0.0] * n
+    for i, c in enumerate(membership):
+        total[c] += strength[i]
+    used = set(membership)
+    empty = [c for c in range(n) if c not in used]
+    order = list(range(n))
+    rng.shuffle(order)
+    queue = deque(order)
+    queued = [True] * n
+    while queue:
+        i = queue.popleft()
+        queued[i] = False
+        current, k = membership[i], strength[i]
+        links = _community_links(adjacency, membership, i)
+        total[current] -= k
+        best = current
+        best_gain = links.get(current, 0) - resolution * total[current] * k / m2
+        for c, w in links.items():
+            gain = w - resolution * total[c] * k / m2
+            if gain > best_gain:
+                best, best_gain = c, gain
+        if best_gain < 0 and total[current] > 0:
+            # Being alone (gain 0) beats every community on offer
+            best = empty.pop()
+        total[best] += k
+        if best != current:
+            membership[i] = best
+            if total[current] == 0:
+                empty.append(current)
+            for j in adjacency[i]:
+                if not queued[j] and membership[j] != best:
+                    queue.append(j)
+                    queued[j] = True
+
+
+def _refine(adjacency, strength, m2, membership, resolution, rng):
+    """
+    Leiden refinement: merge nodes into well-connected sub-communities.
+
+    Each community is split into singletons, then nodes that are still
+    alone and well connected to their community greedily join a
+    well-connected sub-community of it. Sub-communities are therefore
+    always connected, which plain Louvain does not guarantee.
+    """
+    n = len(adjacency)
+    community_total = {}
+    for i, c in enumerate(membership):
+        community_total[c] = community_total.get(c, 0) + strength[i]
+    refined = list(range(n))
+    total = list(strength)
+    size = [1] * n
+    # Weight from each sub-community to the rest of its community
+    external = [
+        sum(w for j, w in adjacency[i].items() if membership[j] == membership[i])
+        for i in range(n)
+    ]
+    order = list(range(n))
+    rng.shuffle(order)
+    for i in order:
+        own = refined[i]
+        if size[own] > 1:
+            continue
+        c, k = membership[i], strength[i]
+        if external[own] < resolution * k * (community_total[c] - k) / m2:
+            continue
+        links = {}
+        for j, w in adjacency[i].items():
+            if membership[j] == c:
+                links[refined[j]] = links.get(refined[j], 0) + w
+        best, best_gain = own, 0
+        for r, w in links.items():
+            if (
+                r == own
+                or external[r]
+                < resolution * total[r] * (community_total[c] - total[r]) / m2
+            ):
+                continue
+            gain = w - resolution * total[r] * k / m2
+            if gain > best_gain:
+                best, best_gain = r, gain
+        if best != own:
+            refined[i] = best
+            total[best] += k
+            total[own] = 0
+            size[best] += 1
+            size[own] = 0
+            external[best] += external[own] - 2 * links[best]
+    return refined
+
+
+def _aggregate(adjacency, loops, strength, labels, k):
+    """
+    Collapse every community of ``labels`` into a single node.
+    """
+    new_adjacency = [{} for _ in range(k)]
+    new_loops = [0.0] * k
+    new_strength = [0.0] * k
+    for i, ci in enumerate(labels):
+        new_loops[ci] += loops[i]
+        new_strength[ci] += strength[i]
+        for j, w in adjacency[i].items():
+            cj = labels[j]
+            if ci == cj:
+                # Each internal edge is seen from both ends
+                new_loops[ci] += w / 2
+            else:
+                new_adjacency[ci][cj] = new_adjacency[ci].get(cj, 0) + w
+    return new_adjacency, new_loops, new_strength
+
+
+def _optimise(graph, seed, initial, resolution, weight, leiden):
+    nodes, adjacency, loops, strength = _index_graph(graph, weight)
+    m2 = sum(strength)
+    if m2 == 0:
+        return [{node} for node in nodes]
+
+    rng = random.Random(seed)
+    if initial:
+        # Warm start: begin local moving from the previous assignment
+        fresh = iter(range(-1, -len(nodes) - 1, -1))
+        membership, _ = _relabel(
+            [initial[node] if node in initial else next(fresh) for node in nodes]
+        )
+    else:
+        membership = list(range(len(nodes)))
+    node_level = list(range(len(nodes)))
+
+    for _ in range(MAX_LEVELS):
+        move = _move_nodes_fast if leiden else _move_nodes
+        move(adjacency, strength, m2, membership, resolution, rng)
+        membership, k = _relabel(membership)
+        if k == len(adjacency):
+            break
+        if leiden:
+            labels, refined_k = _relabel(
+                _refine(adjacency, strength, m2, membership, resolution, rng)
+            )
+            if refined_k == len(adjacency):
+                labels, refined_k = membership, k
+            # Aggregate the refined partition, starting from the unrefined one
+            next_membership = [0] * refined_k
+            for i, r in enumerate(labels):
+                next_membership[r] = membership[i]
+        else:
+            labels, refined_k = membership, k
+            next_membership = list(range(k))
+        adjacency, loops, strength = _aggregate(
+            adjacency, loops, strength, labels, refined_k
+        )
+        node_level = [labels[i] for i in node_level]
+        membership = next_membership
+
+    communities = {}
+    for node, i in zip(nodes, node_level):
+        communities.setdefault(membership[i], set()).add(node)
+    return list(communities.values())
+
+
+def louvain(graph, seed=None, initial=None, resolution=DEFAULT_RESOLUTION):
+    """
+    Detect communities with the Louvain method.
+
+    :param graph: NetworkX graph; edge "weight" attributes are used.
+    :param seed: Seed for the node visiting order.
+    :param initial: Optional node -> community label mapping to warm-start from.
+    :param resolution: Modularity resolution; higher values give smaller communities.
+    :return: List of node sets.
+    """
+    return _optimise(graph, seed, initial, resolution, "weight", leiden=False)
+
+
+def leiden(graph, seed=None, initial=None, resolution=DEFAULT_RESOLUTION):
+    """
+    Detect communities with the Leiden method (Louvain plus a refinement phase).
+
+    :param graph: NetworkX graph; edge "weight" attributes are used.
+    :param seed: Seed for the node visiting order.
+    :param initial: Optional node -> community label mapping to warm-start from.
+    :param resolution: Modularity resolution; higher values give smaller communities.
+    :return: List of node sets.
+    """
+    return _optimise(graph, seed, initial, resolution, "weight", leiden=True)
+
+
+def greedy(graph, seed=None, initial=None, resolution=DEFAULT_RESOLUTION):
+    """
+    Detect communities with NetworkX's greedy modularity maximisation.
+
+    Deterministic and always starts from singletons, so ``seed`` and
+    ``initial`` are ignored.
+    """
+    return list(greedy_modularity_communities(graph, resolution=resolution))
+
+
+ENGINES = {"greedy": greedy, "louvain": louvain, "leiden": leiden}
+# Engines whose partitions can be refined locally after live updates
+WARM_START_ENGINES = ("louvain", "leiden")
+
+
+def local_moves(graph, partition, nodes, total_weight, resolution=DEFAULT_RESOLUTION):
+    """
+    Improve a partition around a few nodes with queue-based local moving.
+
+    Only ``nodes`` and the neighbours of nodes that move are visited, so
+    the cost follows the size of the change rather than the graph.
+    Community totals are summed lazily for the communities involved.
+
+    :param graph: NetworkX graph the partition now applies to.
+    :param partition: CommunityPartition covering every node of ``graph``.
+    :param nodes: Nodes to start from, e.g. the endpoints of new edges.
+    :param total_weight: Total edge weight of ``graph``.
+    :param resolution: Modularity resolution.
+    :return: Dictionary of moved node -> new community ID.
+    """
+    m2 = 2 * total_weight
+    if m2 == 0:
+        return {}
+    membership = {}
+    totals = {}
+
+    def community(node):
+        return membership.get(node) or partition.community_of(node)
+
+    def total(c):
+        if c not in totals:
+            totals[c] = sum(
+                graph.degree(member, weight="weight") for member in partition.members(c)
+            )
+        return totals[c]
+
+    queue = deque(dict.fromkeys(nodes))
+    queued = set(queue)
+    while queue:
+        node = queue.popleft()
+        queued.discard(node)
+        current = community(node)
+        k = graph.degree(node, weight="weight")
+        links = {}
+        for neighbor, data in graph[node].items():
+            if neighbor != node:
+                c = community(neighbor)
+                links[c] = links.get(c, 0) + data.get("weight", 1)
+        for c in links:
+            total(c)
+        totals[current] = total(current) - k
+        best = current
+        best_gain = links.get(current, 0) - resolution * totals[current] * k / m2
+        for c, w in links.items():
+            gain = w - resolution * totals[c] * k / m2
+            if gain > best_gain:
+                best, best_gain = c, gain
+        totals[best] += k
+        if best != current:
+            membership[node] = best
+            for neighbor in graph[node]:
+                if neighbor not in queued and community(neighbor) != best:
+                    queue.append(neighbor)
+                    queued.add(neighbor)
+    return {
+        node: c for node, c in membership.items() if c != partition.community_of(node)
+    }
@@ -0,0 +1,205 @@
+import numpy as np
+
+from community_detection import (
+    get_community_activity,
+    get_community_labels,
+    get_partition,
+    partition_key,
+)
+from community_engines import DEFAULT_ENGINE
+from centrality import DEFAULT_SEED
+from compact_graph import get_compact_graph
+from interest_index import get_interest_index, pack_bits
+
+TOP_K = 5
+
+
+def _top_per_group(groups, scores, n_groups, k):
+    """
+    Return, per group, the indices of its k best-scoring items (ties by index).
+    """
+    order = np.lexsort((np.arange(len(groups)), -scores, groups))
+    sorted_groups = groups[order]
+    starts = np.searchsorted(sorted_groups, np.arange(n_groups))
+    rank = np.arange(len(order)) - starts[sorted_groups]
+    keep = rank < k
+    top = [[] for _ in range(n_groups)]
+    for group, item in zip(sorted_groups[keep].tolist(), order[keep].tolist()):
+        top[group].append(item)
+    return top
+
+
+class CommunityProfiles:
+    """
+    Per-community summaries stored as arrays indexed by community ID.
+
+    Row ``c`` of ``histogram`` counts the members of community ``c`` listing
+    each interest in ``interests``; row 0 collects unassigned nodes and is
+    never recommended. ``interest_bits`` packs the interests present in
+    each community as bitsets (see interest_index.pack_bits).
+
+    :param interests: Interest names in histogram column order.
+    :param histogram: int array (communities + 1, interests).
+    :param sizes: Members per community.
+    :param activity: Total interaction weight inside each community.
+    :param top_locations: Per community, (location, members) pairs, most common first.
+    :param top_members: Per community, (node, degree centrality) pairs, highest first.
+    """
+
+    def __init__(
+        self, interests, histogram, sizes, activity, top_locations, top_members
+    ):
+        self.interests = list(interests)
+        self.histogram = histogram
+        self.sizes = sizes
+        self.activity = activity
+        self.top_locations = top_locations
+        self.top_members = top_members
+        self.interest_bits = pack_bits(histogram > 0)
+        norms = np.linalg.norm(histogram, axis=1)
+        self._norms = np.where(norms > 0, norms, 1.0)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.sizes[1:]))
+
+    def profile(self, community_id):
+        """
+        Return the profile of one community as a dictionary.
+        """
+        row = self.histogram[community_id]
+        order = np.argsort(-row, kind="stable")
+        return {
+            "community_id": community_id,
+            "size": int(self.sizes[community_id]),
+            "activity_score": self.activity[community_id],
+            "interests": {
+                self.interests[i]: int(row[i]) for i in order.tolist() if row[i]
+            },
+            "top_locations": self.top_locations[community_id],
+            "top_members": self.top_members[community_id],
+        }
+
+    def profiles(self, limit=None, offset=0):
+        """
+        Return the profiles of the non-empty communities in ID order.
+        """
+        ids = np.flatnonzero(self.sizes[1:]) + 1
+        end = None if limit is None else offset + limit
+        return [self.profile(int(c)) for c in ids[offset:end]]
+
+    def recommend(self, index, node, limit, offset=0):
+        """
+        Rank communities by cosine similarity to a user's interest vector.
+
+        All communities are scored with one matrix-vector product, and the
+        interests they share with the user are counted with a bitwise AND
+        of their bitsets; only those sharing at least one are returned.
+
+        :param index: InterestIndex with the same ``interests`` order.
+        :param node: Node ID of the user.
+        :param limit: Maximum number of recommendations to return.
+        :param offset: Number of top recommendations to skip.
+        :return: (recommendations, total) where total counts every candidate.
+        """
+        user = index.interest_vector(node).astype(np.float64)
+        user_norm = np.linalg.norm(user) or 1.0
+        similarity = self.histogram @ user / (self._norms * user_norm)
+        shared = index.shared_interests(node, self.interest_bits)
+        shared[0] = 0
+
+        candidates = np.flatnonzero(shared)
+        order = candidates[
+            np.lexsort((candidates, -shared[candidates], -similarity[candidates]))
+        ]
+        recommendations = [
+            {
+                "community_id": c,
+                "similarity": float(similarity[c]),
+                "shared_interests": int(shared[c]),
+                "size": int(self.sizes[c]),
+            }
+            for c in order[offset : offset + limit].tolist()
+        ]
+        return recommendations, len(candidates)
+
+
+def build_profiles(graph, labels, n_communities, index, activity, degree, k=TOP_K):
+    """
+    Build the profiles of every community in a few vectorised passes.
+
+    :param graph: NetworkX graph; nodes may carry a "location" attribute.
+    :param labels: Community ID per node in graph node order (0 if unassigned).
+    :param n_communities: Number of community ID slots.
+    :param index: InterestIndex over the same node order.
+    :param activity: Dictionary of community ID -> activity score.
+    :param degree: Degree centrality per node in graph node order.
+    :param k: Number of top locations and members kept per community.
+    :return: CommunityProfiles.
+    """
+    slots = n_communities + 1
+    histogram = np.zeros((slots, len(index.interests)), dtype=np.int64)
+    for row in range(len(index.interests)):
+        members = index.members(index.bits[row])
+        histogram[:, row] = np.bincount(labels[members], minlength=slots)
+    sizes = np.bincount(labels, minlength=slots)
+
+    location_codes = {}
+    codes = np.array(
+        [
+            location_codes.setdefault(data.get("location"), len(location_codes))
+            for _, data in graph.nodes(data=True)
+        ],
+        dtype=np.int64,
+    )
+    locations = list(location_codes)
+    pair_counts = np.bincount(
+        labels * len(locations) + codes, minlength=slots * len(locations)
+    ).reshape(slots, len(locations))
+    top_locations = []
+    for row in pair_counts:
+        best = np.argsort(-row, kind="stable")[:k]
+        top_locations.append(
+            [
+                (locations[i], int(row[i]))
+                for i in best.tolist()
+                if row[i] and locations[i] is not None
+            ]
+        )
+
+    nodes = list(graph)
+    top_members = [
+        [(nodes[i], float(degree[i])) for i in members]
+        for members in _top_per_group(labels, degree, slots, k)
+    ]
+    activity_scores = [activity.get(c, 0) for c in range(slots)]
+    return CommunityProfiles(
+        index.interests, histogram, sizes, activity_scores, top_locations, top_members
+    )
+
+
+def get_community_profiles(snapshot, engine=DEFAULT_ENGINE, seed=DEFAULT_SEED):
+    """
+    Return the community profiles for a graph snapshot, building them once per partition.
+
+    :param snapshot: GraphSnapshot.
+    :param engine: Community engine of the partition.
+    :param seed: Seed of the partition.
+    :return: CommunityProfiles.
+    """
+    partition = get_partition(snapshot, engine=engine, seed=seed)
+
+    def compute():
+        compact = get_compact_graph(snapshot)
+        n = compact.number_of_nodes
+        degree = compact.degree() / (n - 1) if n > 1 else np.zeros(n)
+        return build_profiles(
+            snapshot.graph,
+            get_community_labels(snapshot, engine=engine, seed=seed),
+            len(partition.communities),
+            get_interest_index(snapshot),
+            get_community_activity(snapshot, engine=engine, seed=seed),
+            degree,
+        )
+
+    key = ("community_profiles",) + partition_key(engine, seed)[1:]
+    return snapshot.derived(key, compute)
@@ -0,0 +1,158 @@
+import numpy as np
+
+from centrality import DEFAULT_SEED
+from community_detection import (
+    get_community_activity,
+    get_community_labels,
+    get_partition,
+    partition_key,
+)
+from community_engines import DEFAULT_ENGINE
+from compact_graph import get_compact_graph
+from layout_engine import force_layout
+
+
+class CommunityQuotient:
+    """
+    The community quotient graph: one node per community, one edge per connected pair.
+
+    Communities are indexed by ID as in CommunityProfiles (slot 0 collects
+    unassigned nodes and is left out). Edge ``i`` joins ``sources[i]`` and
+    ``targets[i]`` and carries the summed weight and interaction count of
+    every member-level edge between the two communities.
+
+    :param sizes: Members per community.
+    :param activity: Interaction weight inside each community.
+    :param internal_edges: Member-level edges inside each community.
+    :param sources: Community ID of each quotient edge's lower endpoint.
+    :param targets: Community ID of each quotient edge's higher endpoint.
+    :param weights: Total interaction weight per quotient edge.
+    :param interaction_counts: Total interactions per quotient edge.
+    :param positions: (communities + 1, 2) force-directed positions in [-1, 1].
+    """
+
+    def __init__(
+        self,
+        sizes,
+        activity,
+        internal_edges,
+        sources,
+        targets,
+        weights,
+        interaction_counts,
+        positions,
+    ):
+        self.sizes = sizes
+        self.activity = activity
+        self.internal_edges = internal_edges
+        self.sources = sources
+        self.targets = targets
+        self.weights = weights
+        self.interaction_counts = interaction_counts
+        self.positions = positions
+
+    def __len__(self):
+        return int(np.count_nonzero(self.sizes[1:]))
+
+    def to_dict(self, min_weight=0):
+        """
+        Return the quotient graph as {"nodes": [...], "edges": [...]}.
+
+        :param min_weight: Drop edges lighter than this.
+        """
+        nodes = [
+            {
+                "id": c,
+                "size": int(self.sizes[c]),
+                "activity_score": self.activity[c],
+                "internal_edges": int(self.internal_edges[c]),
+                "position": [round(float(v), 5) for v in self.positions[c]],
+            }
+            for c in (np.flatnonzero(self.sizes[1:]) + 1).tolist()
+        ]
+        keep = np.flatnonzero(self.weights >= min_weight)
+        edges = [
+            {
+                "source": int(self.sources[i]),
+                "target": int(self.targets[i]),
+                "weight": float(self.weights[i]),
+                "interaction_count": int(self.interaction_counts[i]),
+            }
+            for i in keep.tolist()
+        ]
+        return {"nodes": nodes, "edges": edges}
+
+
+def build_quotient(compact, labels, n_communities, activity, seed=DEFAULT_SEED):
+    """
+    Collapse every community of a compact graph into one node, in a few vectorised passes.
+
+    :param compact: CompactGraph.
+    :param labels: Community ID per node in compact node order (0 if unassigned).
+    :param n_communities: Number of community ID slots.
+    :param activity: Dictionary of community ID -> activity score.
+    :param seed: Seed of the quotient layout.
+    :return: CommunityQuotient.
+    """
+    slots = n_communities + 1
+    rows = np.repeat(np.arange(compact.number_of_nodes), compact.degree())
+    # Each undirected edge once, from its lower endpoint
+    once = rows <= compact.indices
+    u = labels[rows[once]]
+    v = labels[compact.indices[once]]
+    eids = compact.edge_ids[once]
+    weight = compact.columns["weight"][eids].astype(np.float64)
+    count = compact.columns["interaction_count"][eids].astype(np.int64)
+
+    inside = u == v
+    internal_edges = np.bincount(u[inside], minlength=slots)
+    between = ~inside & (u > 0) & (v > 0)
+    lo = np.minimum(u[between], v[between])
+    hi = np.maximum(u[between], v[between])
+    keys, inverse = np.unique(lo * slots + hi, return_inverse=True)
+    weights = np.bincount(inverse, weights=weight[between], minlength=len(keys))
+    counts = np.bincount(inverse, weights=count[between], minlength=len(keys))
+    sources, targets = keys // slots, keys % slots
+
+    sizes = np.bincount(labels, minlength=slots)
+    # Dense IDs for the layout: slot 0 and empty communities sit at the origin
+    present = np.flatnonzero(sizes[1:]) + 1
+    dense = np.zeros(slots, dtype=np.int64)
+    dense[present] = np.arange(len(present))
+    positions = np.zeros((slots, 2))
+    positions[present] = force_layout(
+        len(present), dense[sources], dense[targets], weights, seed=seed
+    )
+    return CommunityQuotient(
+        sizes,
+        [activity.get(c, 0) for c in range(slots)],
+        internal_edges,
+        sources,
+        targets,
+        weights,
+        counts.astype(np.int64),
+        positions,
+    )
+
+
+def get_community_quotient(snapshot, engine=DEFAULT_ENGINE, seed=DEFAULT_SEED):
+    """
+    Return the community quotient graph of a snapshot, building it once per partition.
+
+    :param snapshot: GraphSnapshot.
+    :param engine: Community engine of the partition.
+    :param seed: Seed of the partition.
+    :return: CommunityQuotient.
+    """
+    partition = get_partition(snapshot, engine=engine, seed=seed)
+
+    def compute():
+        return build_quotient(
+            get_compact_graph(snapshot),
+            get_community_labels(snapshot, engine=engine, seed=seed),
+            len(partition.communities),
+            get_community_activity(snapshot, engine=engine, seed=seed),
+        )
+
+    key = ("community_quotient",) + partition_key(engine, seed)[1:]
+    return snapshot.derived(key, compute)
@@ -0,0 +1,322 @@
+import sys
+from datetime import datetime, timezone
+
+import networkx as nx  # type: ignore
+import numpy as np
+
+# Sentinel for interactions without a parseable timestamp
+MISSING_TIMESTAMP = np.iinfo(np.int64).min
+
+
+def parse_timestamp(value):
+    """
+    Convert an ISO timestamp string to epoch seconds, or MISSING_TIMESTAMP.
+
+    Naive timestamps are read as UTC so conversions do not depend on the
+    server's time zone.
+    """
+    if not value:
+        return MISSING_TIMESTAMP
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return MISSING_TIMESTAMP
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def format_timestamp(value):
+    """
+    Convert epoch seconds back to a naive UTC ISO timestamp string (None if missing).
+    """
+    if value == MISSING_TIMESTAMP:
+        return None
+    return (
+        datetime.fromtimestamp(int(value), tz=timezone.utc)
+        .replace(tzinfo=None)
+        .isoformat()
+    )
+
+
+class CompactGraph:
+    """
+    Undirected graph stored as CSR arrays over dense int32 node IDs.
+
+    Node ``i`` has neighbours ``indices[indptr[i]:indptr[i + 1]]``; the
+    matching slots of ``edge_ids`` point into the per-edge columns
+    (``weight``, ``interaction_type``, ``timestamp``,
+    ``geographic_proximity`` and the pair aggregates ``interaction_count``,
+    ``first_timestamp``, ``last_timestamp`` and ``type_counts``, an
+    m x types count matrix), so every undirected edge stores its
+    attributes once. Interaction types are dictionary-encoded in
+    ``interaction_types``.
+
+    :param nodes: Node IDs in dense-ID order.
+    :param indptr: int64 row pointers, length n + 1.
+    :param indices: int32 neighbour IDs, length 2m.
+    :param edge_ids: int32 edge ID of every adjacency slot, length 2m.
+    :param columns: Dictionary of per-edge numpy columns, each of length m.
+    :param interaction_types: Interaction type names indexed by type code.
+    """
+
+    def __init__(self, nodes, indptr, indices, edge_ids, columns, interaction_types):
+        self.nodes = list(nodes)
+        self.index = {node: idx for idx, node in enumerate(self.nodes)}
+        self.indptr = indptr
+        self.indices = indices
+        self.edge_ids = edge_ids
+        self.columns = columns
+        self.interaction_types = list(interaction_types)
+
+    @classmethod
+    def from_networkx(cls, graph):
+        """
+        Build a compact graph from an undirected NetworkX graph.
+
+        :param graph: NetworkX graph whose edges carry interaction attributes.
+        :return: CompactGraph.
+        """
+        nodes = list(graph.nodes)
+        index = {node: idx for idx, node in enumerate(nodes)}
+        edges = ((index[u], index[v], data) for u, v, data in graph.edges(data=True))
+        return cls.from_edges(nodes, edges, graph.number_of_edges())
+
+    @classmethod
+    def from_edges(cls, nodes, edges, num_edges):
+        """
+        Build a compact graph from a node list and an edge list.
+
+        :param nodes: Node IDs in dense-ID order.
+        :param edges: Iterable of (source ID, target ID, attribute dict) with dense IDs.
+        :param num_edges: Number of edges.
+        :return: CompactGraph.
+        """
+        n = len(nodes)
+        m = num_edges
+
+        sources = np.empty(m, dtype=np.int32)
+        targets = np.empty(m, dtype=np.int32)
+        weight = np.empty(m, dtype=np.float32)
+        type_code = np.empty(m, dtype=np.int16)
+        timestamp = np.empty(m, dtype=np.int64)
+        proximity = np.empty(m, dtype=np.bool_)
+        count = np.empty(m, dtype=np.int32)
+        first = np.empty(m, dtype=np.int64)
+        last = np.empty(m, dtype=np.int64)
+        type_index = {}
+        type_entries = []
+        for eid, (u, v, data) in enumerate(edges):
+            sources[eid] = u
+            targets[eid] = v
+            weight[eid] = data.get("weight", 1)
+            type_code[eid] = type_index.setdefault(
+                data.get("interaction_type"), len(type_index)
+            )
+            timestamp[eid] = parse_timestamp(data.get("timestamp"))
+            proximity[eid] = bool(data.get("geographic_proximity", False))
+            count[eid] = data.get("interaction_count", 1)
+            first[eid] = parse_timestamp(data.get("first_timestamp"))
+            last[eid] = parse_timestamp(data.get("last_timestamp"))
+            type_counts = data.get("type_counts") or {data.get("interaction_type"): 1}
+            for name, n_type in type_counts.items():
+                type_entries.append(
+                    (eid, type_index.setdefault(name, len(type_index)), n_type)
+                )
+        type_counts = np.zeros((m, len(type_index)), dtype=np.int32)
+        if type_entries:
+            rows, codes, counts = zip(*type_entries)
+            type_counts[list(rows), list(codes)] = counts
+
+        # Each undirected edge appears in both endpoints' rows; self-loops once.
+        loops = sources == targets
+        rows = np.concatenate([sources, targets[~loops]])
+        cols = np.concatenate([targets, sources[~loops]])
+        slot_edges = np.concatenate(
+            [np.arange(m, dtype=np.int32), np.flatnonzero(~loops).astype(np.int32)]
+        )
+        order = np.lexsort((cols, rows))
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+
+        columns = {
+            "weight": weight,
+            "interaction_type": type_code,
+            "timestamp": timestamp,
+            "geographic_proximity": proximity,
+            "interaction_count": count,
+            "first_timestamp": first,
+            "last_timestamp": last,
+            "type_counts": type_counts,
+        }
+        return cls(
+            nodes,
+            indptr,
+            cols[order].astype(np.int32),
+            slot_edges[order],
+            columns,
+            list(type_index),
+        )
+
+    def to_networkx(self, node_data=None):
+        """
+        Convert back to a NetworkX graph.
+
+        :param node_data: Optional mapping of node ID -> attribute dict.
+        :return: nx.Graph with the columnar edge attributes.
+        """
+        graph = nx.Graph()
+        for node in self.nodes:
+            graph.add_node(node, **((node_data or {}).get(node) or {}))
+        for u in range(len(self.nodes)):
+            start, end = self.indptr[u], self.indptr[u + 1]
+            for v, eid in zip(self.indices[start:end], self.edge_ids[start:end]):
+                if v < u:
+                    continue
+                graph.add_edge(self.nodes[u], self.nodes[v], **self.edge_data(eid))
+        return graph
+
+    @property
+    def number_of_nodes(self):
+        return len(self.nodes)
+
+    @property
+    def number_of_edges(self):
+        return len(self.columns["weight"])
+
+    def edge_data(self, eid):
+        """
+        Return the attribute dict of one edge.
+        """
+        return {
+            "weight": self.columns["weight"][eid].item(),
+            "interaction_type": self.interaction_types[
+                self.columns["interaction_type"][eid]
+            ],
+            "timestamp": format_timestamp(self.columns["timestamp"][eid]),
+            "geographic_proximity": bool(self.columns["geographic_proximity"][eid]),
+            "interaction_count": int(self.columns["interaction_count"][eid]),
+            "type_counts": {
+                self.interaction_types[code]: int(n)
+                for code, n in enumerate(self.columns["type_counts"][eid])
+                if n
+            },
+            "first_timestamp": format_timestamp(self.columns["first_timestamp"][eid]),
+            "last_timestamp": format_timestamp(self.columns["last_timestamp"][eid]),
+        }
+
+    def interaction_totals(self, idx):
+        """
+        Sum the pair aggregates over all edges of a node.
+
+        :param idx: Dense node ID.
+        :return: Dictionary with total_weight, interaction_count and type_counts.
+        """
+        eids = self.edge_ids[self.indptr[idx] : self.indptr[idx + 1]]
+        type_counts = self.columns["type_counts"][eids].sum(axis=0)
+        return {
+            "total_weight": float(self.columns["weight"][eids].sum(dtype=np.float64)),
+            "interaction_count": int(self.columns["interaction_count"][eids].sum()),
+            "type_counts": {
+                self.interaction_types[code]: int(n)
+                for code, n in enumerate(type_counts)
+                if n
+            },
+        }
+
+    def degree(self, nodes=None):
+        """
+        Return the degree of every node, or of the given dense node IDs, as an array.
+        """
+        if nodes is None:
+            return np.diff(self.indptr)
+        nodes = np.asarray(nodes, dtype=np.int64)
+        return self.indptr[nodes + 1] - self.indptr[nodes]
+
+    def neighbors(self, idx):
+        """
+        Return the neighbour IDs of a node (by dense ID).
+        """
+        return self.indices[self.indptr[idx] : self.indptr[idx + 1]]
+
+    def neighbor_slots(self, frontier):
+        """
+        Return the adjacency slots of every node in a frontier, concatenated.
+
+        :param frontier: Array of dense node IDs.
+        :return: Array of positions into indices/edge_ids.
+        """
+        starts = self.indptr[frontier]
+        lengths = self.indptr[np.asarray(frontier) + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64)
+        offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        return np.arange(total, dtype=np.int64) + offsets
+
+    def bfs(self, source):
+        """
+        Return hop distances from a source node (-1 where unreachable).
+
+        :param source: Dense node ID.
+        """
+        distance = np.full(len(self.nodes), -1, dtype=np.int32)
+        distance[source] = 0
+        frontier = np.array([source], dtype=np.int64)
+        level = 0
+        while frontier.size:
+            level += 1
+            candidates = np.unique(self.indices[self.neighbor_slots(frontier)])
+            frontier = candidates[distance[candidates] < 0]
+            distance[frontier] = level
+        return distance
+
+    def common_neighbor_counts(self, u, candidates):
+        """
+        Return how many neighbours a node shares with each candidate.
+
+        :param u: Dense node ID.
+        :param candidates: Array of dense node IDs.
+        """
+        candidates = np.asarray(candidates, dtype=np.int64)
+        two_hop = self.indices[self.neighbor_slots(self.neighbors(u))]
+        if not two_hop.size:
+            return np.zeros(len(candidates), dtype=np.int64)
+        reached, counts = np.unique(two_hop, return_counts=True)
+        pos = np.minimum(np.searchsorted(reached, candidates), len(reached) - 1)
+        return np.where(reached[pos] == candidates, counts[pos], 0)
+
+    def jaccard(self, u, candidates):
+        """
+        Return the Jaccard coefficient between a node and each candidate.
+
+        :param u: Dense node ID.
+        :param candidates: Array of dense node IDs.
+        """
+        candidates = np.asarray(candidates, dtype=np.int64)
+        common = self.common_neighbor_counts(u, candidates).astype(np.float64)
+        union = self.degree([u])[0] + self.degree(candidates) - common
+        return np.divide(common, union, out=np.zeros_like(common), where=union > 0)
+
+    def nbytes(self):
+        """
+        Return the approximate memory footprint in bytes (arrays + node ID table).
+        """
+        arrays = [self.indptr, self.indices, self.edge_ids, *self.columns.values()]
+        node_table = sys.getsizeof(self.nodes) + sum(
+            sys.getsizeof(node) for node in self.nodes
+        )
+        index_table = sys.getsizeof(self.index)
+        return sum(a.nbytes for a in arrays) + node_table + index_table
+
+
+def get_compact_graph(snapshot):
+    """
+    Return the compact graph for a graph snapshot, building it once per data version.
+
+    :param snapshot: GraphSnapshot.
+    :return: CompactGraph.
+    """
+    return snapshot.derived(
+        "compact_graph", lambda: CompactGraph.from_networkx(snapshot.graph)
+    )
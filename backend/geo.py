@@ -0,0 +1,308 @@
+import hashlib
+import math
+import sqlite3
+import threading
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+DEFAULT_CELL_DEGREES = 5.0
+# SQLite's default limit on host parameters per statement is 999
+_SQL_BATCH = 500
+
+
+def fallback_coordinates(location):
+    """
+    Derive stable pseudo-coordinates for a location name.
+
+    The same name always maps to the same point (independent of Python's
+    hash seed), spread uniformly over the sphere.
+
+    :return: (latitude, longitude) in degrees.
+    """
+    digest = hashlib.sha1(location.encode("utf-8")).digest()
+    u = int.from_bytes(digest[:8], "big") / 2**64
+    v = int.from_bytes(digest[8:16], "big") / 2**64
+    latitude = math.degrees(math.asin(2 * u - 1))
+    longitude = 360 * v - 180
+    return round(latitude, 6), round(longitude, 6)
+
+
+class GeocodeCache:
+    """
+    Persistent location -> coordinates table in a SQLite file.
+
+    Known coordinates can be stored with ``set()``; unknown locations get
+    fallback_coordinates() and are written back, so a location keeps its
+    point across requests and restarts.
+
+    :param path: SQLite database path; created on first use.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS locations ("
+                "name TEXT PRIMARY KEY, latitude REAL NOT NULL, "
+                "longitude REAL NOT NULL, source TEXT NOT NULL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def set(self, location, latitude, longitude, source="manual"):
+        """
+        Store known coordinates for a location, replacing any cached ones.
+        """
+        with self._lock, self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO locations VALUES (?, ?, ?, ?)",
+                (location, latitude, longitude, source),
+            )
+
+    def lookup_many(self, locations):
+        """
+        Return coordinates for many locations with batched queries.
+
+        :param locations: Iterable of location names.
+        :return: Dictionary of location -> (latitude, longitude).
+        """
+        names = list(dict.fromkeys(locations))
+        coordinates = {}
+        with self._lock, self._connect() as db:
+            for start in range(0, len(names), _SQL_BATCH):
+                batch = names[start : start + _SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = db.execute(
+                    "SELECT name, latitude, longitude FROM locations "
+                    f"WHERE name IN ({placeholders})",
+                    batch,
+                )
+                coordinates.update((name, (lat, lon)) for name, lat, lon in rows)
+
+            missing = [name for name in names if name not in coordinates]
+            for name in missing:
+                coordinates[name] = fallback_coordinates(name)
+            db.executemany(
+                "INSERT OR IGNORE INTO locations VALUES (?, ?, ?, 'fallback')",
+                [(name, *coordinates[name]) for name in missing],
+            )
+        return coordinates
+
+    def lookup(self, location):
+        """
+        Return (latitude, longitude) for one location.
+        """
+        return self.lookup_many([location])[location]
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance in kilometres; array arguments broadcast.
+    """
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class LocationIndex:
+    """
+    Locations with their coordinates and users, bucketed in a lat/lon grid.
+
+    Locations are sorted by grid cell and ``cell_start`` (CSR-style) gives
+    each cell's slice, so a bounding box only touches the cells it
+    overlaps and the locations inside them.
+
+    :param locations: Location names.
+    :param latitude: Latitude per location.
+    :param longitude: Longitude per location.
+    :param users: List of user IDs per location.
+    :param cell_degrees: Grid cell size in degrees.
+    """
+
+    def __init__(
+        self, locations, latitude, longitude, users, cell_degrees=DEFAULT_CELL_DEGREES
+    ):
+        self.cell_degrees = cell_degrees
+        self.rows = int(math.ceil(180 / cell_degrees))
+        self.cols = int(math.ceil(360 / cell_degrees))
+        latitude = np.asarray(latitude, dtype=np.float64)
+        longitude = np.asarray(longitude, dtype=np.float64)
+        cells = self._cell(latitude, longitude)
+        order = np.argsort(cells, kind="stable")
+
+        self.locations = [locations[i] for i in order]
+        self.position = {name: i for i, name in enumerate(self.locations)}
+        self.latitude = latitude[order]
+        self.longitude = longitude[order]
+        self.users = [users[i] for i in order]
+        self.cell_start = np.searchsorted(
+            cells[order], np.arange(self.rows * self.cols + 1)
+        )
+
+    @classmethod
+    def from_graph(cls, graph, geocoder, cell_degrees=DEFAULT_CELL_DEGREES):
+        """
+        Group the graph's users by their "location" attribute and geocode each location once.
+
+        :param graph: NetworkX graph.
+        :param geocoder: GeocodeCache.
+        """
+        users = {}
+        for node, data in graph.nodes(data=True):
+            location = data.get("location")
+            if location:
+                users.setdefault(location, []).append(node)
+        locations = list(users)
+        coordinates = geocoder.lookup_many(locations)
+        return cls(
+            locations,
+            [coordinates[name][0] for name in locations],
+            [coordinates[name][1] for name in locations],
+            [users[name] for name in locations],
+            cell_degrees,
+        )
+
+    def _row(self, latitude):
+        rows = np.floor((np.asarray(latitude) + 90) / self.cell_degrees)
+        return np.clip(rows, 0, self.rows - 1).astype(np.int64)
+
+    def _col(self, longitude):
+        cols = np.floor((np.asarray(longitude) + 180) / self.cell_degrees)
+        return np.clip(cols, 0, self.cols - 1).astype(np.int64)
+
+    def _cell(self, latitude, longitude):
+        return self._row(latitude) * self.cols + self._col(longitude)
+
+    def __len__(self):
+        return len(self.locations)
+
+    def entry(self, i, distance_km=None):
+        """
+        Return one location as a dictionary.
+        """
+        entry = {
+            "location": self.locations[i],
+            "coordinates": {
+                "latitude": float(self.latitude[i]),
+                "longitude": float(self.longitude[i]),
+            },
+            "users": self.users[i],
+        }
+        if distance_km is not None:
+            entry["distance_km"] = round(float(distance_km), 3)
+        return entry
+
+    def in_bbox(self, min_lon, min_lat, max_lon, max_lat):
+        """
+        Return the positions of the locations inside a bounding box.
+
+        A box with ``min_lon > max_lon`` crosses the antimeridian.
+        """
+        if min_lon > max_lon:
+            return np.concatenate(
+                [
+                    self.in_bbox(min_lon, min_lat, 180, max_lat),
+                    self.in_bbox(-180, min_lat, max_lon, max_lat),
+                ]
+            )
+        rows = np.arange(self._row(min_lat), self._row(max_lat) + 1)
+        cols = np.arange(self._col(min_lon), self._col(max_lon) + 1)
+        # Cells of one grid row are contiguous, so each row is a single slice
+        starts = self.cell_start[rows * self.cols + cols[0]]
+        ends = self.cell_start[rows * self.cols + cols[-1] + 1]
+        if not len(starts):
+            return np.empty(0, dtype=np.int64)
+        candidates = np.concatenate(
+            [np.arange(s, e) for s, e in zip(starts.tolist(), ends.tolist())]
+        )
+        lat = self.latitude[candidates]
+        lon = self.longitude[candidates]
+        inside = (
+            (lat >= min_lat) & (lat <= max_lat) & (lon >= min_lon) & (lon <= max_lon)
+        )
+        return candidates[inside]
+
+    def _radius_bbox(self, latitude, longitude, radius_km):
+        """
+        Bounding box containing every point within radius_km of a point.
+        """
+        arc = radius_km / EARTH_RADIUS_KM
+        min_lat = latitude - math.degrees(arc)
+        max_lat = latitude + math.degrees(arc)
+        if min_lat <= -90 or max_lat >= 90:
+            # The circle covers a pole, so every longitude is in range
+            return -180, max(min_lat, -90), 180, min(max_lat, 90)
+        delta = math.asin(min(1.0, math.sin(arc) / math.cos(math.radians(latitude))))
+        delta = math.degrees(delta)
+        if delta >= 180:
+            return -180, min_lat, 180, max_lat
+        min_lon = (longitude - delta + 180) % 360 - 180
+        max_lon = (longitude + delta + 180) % 360 - 180
+        return min_lon, min_lat, max_lon, max_lat
+
+    def nearest(self, latitude, longitude, k=5):
+        """
+        Return the positions and distances (km) of the k locations nearest a point.
+
+        Grid rings around the point are scanned until k candidates are
+        found; their k-th distance then bounds a box that is guaranteed to
+        hold the true k nearest.
+        """
+        if not self.locations:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        k = min(k, len(self.locations))
+        radius = None
+        for ring in range(max(self.rows, self.cols)):
+            span = (ring + 0.5) * self.cell_degrees
+            candidates = self.in_bbox(
+                (longitude - span + 180) % 360 - 180 if span < 180 else -180,
+                max(-90, latitude - span),
+                (longitude + span + 180) % 360 - 180 if span < 180 else 180,
+                min(90, latitude + span),
+            )
+            if len(candidates) >= k:
+                distances = haversine_km(
+                    latitude,
+                    longitude,
+                    self.latitude[candidates],
+                    self.longitude[candidates],
+                )
+                radius = np.partition(distances, k - 1)[k - 1]
+                break
+        if radius is None:
+            candidates = np.arange(len(self.locations))
+        else:
+            candidates = self.in_bbox(*self._radius_bbox(latitude, longitude, radius))
+        distances = haversine_km(
+            latitude, longitude, self.latitude[candidates], self.longitude[candidates]
+        )
+        order = np.lexsort((candidates, distances))[:k]
+        return candidates[order], distances[order]
+
+
+def get_location_index(snapshot, geocoder):
+    """
+    Return the location index for a graph snapshot, building it once per data version.
+
+    :param snapshot: GraphSnapshot.
+    :param geocoder: GeocodeCache.
+    :return: LocationIndex.
+    """
+    return snapshot.derived(
+        "location_index", lambda: LocationIndex.from_graph(snapshot.graph, geocoder)
+    )
+
+
+def update_location_index(index, graph, changes, derived, key):
+    """
+    Keep the location index across live updates.
+
+    Nodes created by live interactions carry no location attribute.
+    """
+    return index
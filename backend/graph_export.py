@@ -0,0 +1,147 @@
+import itertools
+import json
+
+import numpy as np
+
+# Nodes/edges serialised per yielded chunk of a streamed response
+CHUNK_SIZE = 1000
+# Computed node field: the node's community ID (0 if unassigned)
+COMMUNITY_FIELD = "community"
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (set, frozenset, np.ndarray)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value):
+    """
+    Serialise a value to compact JSON, accepting NumPy scalars and arrays.
+    """
+    return json.dumps(value, separators=(",", ":"), default=_json_default)
+
+
+def parse_fields(value):
+    """
+    Parse a comma-separated ?fields= value into a set (None keeps every attribute).
+    """
+    if value is None:
+        return None
+    fields = {field.strip() for field in value.split(",") if field.strip()}
+    if not fields:
+        raise ValueError("fields must list at least one attribute.")
+    return fields
+
+
+def make_cursor(version, position):
+    """
+    Return the opaque cursor for a position in a snapshot's node-then-edge sequence.
+    """
+    return f"{version}:{position}"
+
+
+def parse_cursor(cursor, version):
+    """
+    Return the position encoded in a cursor issued for the given data version.
+
+    :raises ValueError: If the cursor is malformed or belongs to another data version.
+    """
+    try:
+        cursor_version, position = (int(part) for part in cursor.split(":"))
+    except ValueError:
+        raise ValueError("cursor is malformed.")
+    if position < 0:
+        raise ValueError("cursor is malformed.")
+    if cursor_version != version:
+        raise ValueError(
+            "cursor belongs to another version of the data; restart without a cursor."
+        )
+    return position
+
+
+def _project(item, data, fields):
+    if fields is None:
+        item.update(data)
+    else:
+        item.update((field, data[field]) for field in fields if field in data)
+    return item
+
+
+def _nodes(graph, fields, labels, start):
+    nodes = itertools.islice(enumerate(graph.nodes(data=True)), start, None)
+    for idx, (node, data) in nodes:
+        item = _project({"id": node}, data, fields)
+        if labels is not None:
+            item[COMMUNITY_FIELD] = int(labels[idx])
+        yield item
+
+
+def _edges(graph, fields, start):
+    for u, v, data in itertools.islice(graph.edges(data=True), start, None):
+        yield _project({"source": u, "target": v}, data, fields)
+
+
+def _json_array(items, chunk_size):
+    """
+    Yield the JSON text of a list of items in chunks of chunk_size items.
+    """
+    yield "["
+    first = True
+    while True:
+        chunk = list(itertools.islice(items, chunk_size))
+        if not chunk:
+            break
+        body = ",".join(dumps(item) for item in chunk)
+        yield body if first else "," + body
+        first = False
+    yield "]"
+
+
+def stream_node_link(
+    snapshot, fields=None, labels=None, start=0, limit=None, chunk_size=CHUNK_SIZE
+):
+    """
+    Yield a snapshot's graph as node-link JSON text, a chunk at a time.
+
+    The document has the layout of ``json_graph.node_link_data`` but is
+    never built in memory: nodes and then edges are serialised
+    ``chunk_size`` at a time. Nodes and edges form one sequence (nodes
+    first), so a page is the ``limit`` items starting at ``start``; when
+    ``limit`` is given the document ends with a ``next_cursor`` (null on
+    the last page).
+
+    :param snapshot: GraphSnapshot.
+    :param fields: Set of attributes to keep on nodes and edges (None keeps all);
+        node "id" and edge "source"/"target" are always included.
+    :param labels: Community ID per node in graph node order, added as "community".
+    :param start: Position of the first item.
+    :param limit: Maximum number of items, or None for the rest of the graph.
+    :param chunk_size: Items serialised per yielded chunk.
+    """
+    graph = snapshot.graph
+    n_nodes = graph.number_of_nodes()
+    total = n_nodes + graph.number_of_edges()
+    end = total if limit is None else min(total, start + limit)
+
+    node_count = max(0, min(end, n_nodes) - start)
+    edge_start = max(0, start - n_nodes)
+    edge_count = max(0, end - n_nodes - edge_start)
+
+    yield (
+        f'{{"directed":{dumps(graph.is_directed())},'
+        f'"multigraph":{dumps(graph.is_multigraph())},'
+        f'"graph":{dumps(graph.graph)},"version":{dumps(snapshot.version)},'
+        '"nodes":'
+    )
+    nodes = itertools.islice(_nodes(graph, fields, labels, start), node_count)
+    yield from _json_array(nodes, chunk_size)
+    yield ',"edges":'
+    edges = itertools.islice(_edges(graph, fields, edge_start), edge_count)
+    yield from _json_array(edges, chunk_size)
+    if limit is not None:
+        next_cursor = make_cursor(snapshot.version, end) if end < total else None
+        yield f',"next_cursor":{dumps(next_cursor)}'
+    yield "}"
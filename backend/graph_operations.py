@@ -1,57 +1,34 @@
-import os
-import json
 import networkx as nx
 import matplotlib.pyplot as plt
+from ingest import iter_records
 
 
 def load_users_data(users_path="backend/data/users.json"):
     """
-    Load the users data from the JSON file.
+    Stream the users data from the JSON file.
 
     :param users_path: Path to the users data file.
-    :return: List of users.
+    :return: Iterator of users.
     """
-    if not os.path.exists(users_path):
-        raise FileNotFoundError(f"Data file not found at {users_path}")
-
-    with open(users_path, "r") as f:
-        data = json.load(f)
-
-    # Print snippets of the loaded data for verification
-    print("Loaded users snippets:")
-    print("Users:", data.get("users", [])[:2])  # Print first 2 users
-
-    return data["users"]
+    return iter_records(users_path, "users")
 
 
 def load_interactions_data(interactions_path="backend/data/interactions.json"):
     """
-    Load the interactions data from the JSON file.
+    Stream the interactions data from the JSON file.
 
     :param interactions_path: Path to the interactions data file.
-    :return: List of interactions.
+    :return: Iterator of interactions.
     """
-    if not os.path.exists(interactions_path):
-        raise FileNotFoundError(f"Data file not found at {interactions_path}")
-
-    with open(interactions_path, "r") as f:
-        data = json.load(f)
-
-    # Print snippets of the loaded data for verification
-    print("Loaded interactions snippets:")
-    print(
-        "Interactions:", data.get("interactions", [])[:2]
-    )  # Print first 2 interactions
-
-    return data["interactions"]
+    return iter_records(interactions_path, "interactions")
 
 
 def build_graph(users, interactions):
     """
     Build a NetworkX graph from the social media data.
 
-    :param users: List of users.
-    :param interactions: List of interactions.
+    :param users: Iterable of users.
+    :param interactions: Iterable of interactions.
     :return: NetworkX graph.
     """
     G = nx.DiGraph()  # Directed graph to represent interactions
@@ -129,6 +106,45 @@ def calculate_graph_metrics(G):
     return metrics
 
 
+def interest_counts(G):
+    """
+    Count how many interactions share each interest.
+
+    :param G: NetworkX graph with interaction edges.
+    :return: Dictionary of interest -> count.
+    """
+    counts = {}
+    for _, _, data in G.edges(data=True):
+        for interest in data.get("shared_interests", []):
+            counts[interest] = counts.get(interest, 0) + 1
+    return counts
+
+
+def get_interest_counts(snapshot):
+    """
+    Return the interaction interest counts for a graph snapshot, computing them once per data version.
+
+    :param snapshot: GraphSnapshot.
+    :return: Dictionary of interest -> count.
+    """
+    return snapshot.derived("interest_counts", lambda: interest_counts(snapshot.graph))
+
+
+def update_interest_counts(counts, G, changes, derived, key):
+    """
+    Apply the edges replaced or added by a live update to the interaction interest counts.
+    """
+    counts = dict(counts)
+    for _, _, old, new in changes.edges:
+        for interest in (old or {}).get("shared_interests", []):
+            counts[interest] -= 1
+            if not counts[interest]:
+                del counts[interest]
+        for interest in new.get("shared_interests", []):
+            counts[interest] = counts.get(interest, 0) + 1
+    return counts
+
+
 def visualize_graph(G, output_path="backend/data/graph_visualization.png"):
     """
     Visualize the graph and save it as an image.
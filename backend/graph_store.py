@@ -0,0 +1,239 @@
+import hashlib
+import os
+import threading
+import time
+
+import networkx as nx  # type: ignore
+
+
+class GraphSnapshot:
+    """
+    An immutable view of the graph built from one version of the data files.
+
+    :param version: Monotonically increasing data version, usable as a cache key.
+    :param graph: Frozen NetworkX graph.
+    :param fingerprint: Per-file (path, mtime_ns, size, digest) tuples the graph was built from.
+    :param derived: Derived values carried over from a previous snapshot.
+
+    ``last_modified`` is the whole second usable as an HTTP Last-Modified
+    date, or None when that date would not tell the snapshot apart from
+    the previous one; GraphStore sets it.
+    """
+
+    __slots__ = (
+        "version",
+        "graph",
+        "fingerprint",
+        "loaded_at",
+        "last_modified",
+        "_derived",
+        "_lock",
+    )
+
+    def __init__(self, version, graph, fingerprint, derived=None):
+        self.version = version
+        self.graph = graph
+        self.fingerprint = fingerprint
+        self.loaded_at = time.time()
+        self.last_modified = None
+        self._derived = dict(derived or {})
+        self._lock = threading.RLock()
+
+    @property
+    def tag(self):
+        """
+        Short hash of the version and the data file fingerprint.
+
+        Unlike ``version`` alone, it differs across restarts whenever the
+        data differs, so it can be handed to clients (e.g. in an ETag).
+        """
+        key = repr((self.version, self.fingerprint)).encode("utf-8")
+        return hashlib.sha1(key).hexdigest()[:16]
+
+    def derived(self, key, compute):
+        """
+        Return a value derived from this snapshot, computing it at most once.
+
+        Derived data lives and dies with the snapshot, so it is implicitly
+        keyed by the data version.
+
+        :param key: Hashable name of the derived value.
+        :param compute: Zero-argument callable producing the value.
+        """
+        try:
+            return self._derived[key]
+        except KeyError:
+            pass
+        with self._lock:
+            if key not in self._derived:
+                self._derived[key] = compute()
+            return self._derived[key]
+
+    def derived_items(self):
+        """
+        Return the derived values computed so far as a dict.
+        """
+        with self._lock:
+            return dict(self._derived)
+
+
+def _stat_files(paths):
+    """
+    Return (path, mtime_ns, size) for every data file; missing files have None stats.
+    """
+    stats = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            stats.append((path, None, None))
+            continue
+        stats.append((path, st.st_mtime_ns, st.st_size))
+    return tuple(stats)
+
+
+def digest_file(path, chunk_size=1 << 20):
+    """
+    Return the SHA-1 hex digest of a file's contents.
+    """
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class GraphStore:
+    """
+    Process-wide holder of the current graph snapshot.
+
+    The graph is built once and rebuilt only when one of the data files
+    changes. A cheap stat (mtime/size) is done at most every
+    ``check_interval`` seconds; if it differs, the file contents are hashed so
+    that a touched-but-unchanged file does not trigger a rebuild. New
+    snapshots replace the old one with a single reference assignment, so a
+    request that already holds a snapshot keeps a consistent view.
+
+    :param builder: Callable taking the data file paths and returning an nx.Graph,
+        or a (graph, derived) pair to seed the snapshot's derived values.
+    :param paths: Data file paths the graph is built from.
+    :param check_interval: Minimum seconds between file change checks.
+    """
+
+    def __init__(self, builder, paths, check_interval=1.0):
+        self._builder = builder
+        self._paths = tuple(paths)
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._stats = None
+        self._last_check = 0.0
+
+    @property
+    def version(self):
+        return self.snapshot().version
+
+    def snapshot(self):
+        """
+        Return the current snapshot, reloading it first if the data files changed.
+        """
+        current = self._snapshot
+        if current is not None and (
+            time.monotonic() - self._last_check < self._check_interval
+        ):
+            return current
+
+        with self._lock:
+            if self._snapshot is not None and (
+                time.monotonic() - self._last_check < self._check_interval
+            ):
+                return self._snapshot
+            self._refresh()
+            return self._snapshot
+
+    def graph(self):
+        """
+        Shortcut for ``snapshot().graph``.
+        """
+        return self.snapshot().graph
+
+    def reload(self):
+        """
+        Force a rebuild from the data files regardless of their fingerprint.
+        """
+        with self._lock:
+            self._stats = None
+            self._refresh(force=True)
+            return self._snapshot
+
+    def _refresh(self, force=False):
+        # Caller holds self._lock.
+        stats = _stat_files(self._paths)
+        self._last_check = time.monotonic()
+        if not force and self._snapshot is not None and stats == self._stats:
+            return
+
+        fingerprint = tuple(
+            (path, mtime, size, digest_file(path) if size is not None else None)
+            for path, mtime, size in stats
+        )
+        self._stats = stats
+        if (
+            not force
+            and self._snapshot is not None
+            and [f[3] for f in fingerprint]
+            == [f[3] for f in self._snapshot.fingerprint]
+        ):
+            # Files were touched but their contents are unchanged.
+            return
+
+        built = self._builder(*self._paths)
+        graph, derived = built if isinstance(built, tuple) else (built, None)
+        version = self._snapshot.version + 1 if self._snapshot is not None else 1
+        snapshot = GraphSnapshot(version, nx.freeze(graph), fingerprint, derived)
+        # HTTP dates have one-second resolution: a snapshot loaded in the same
+        # second as the previous one gets none, or If-Modified-Since would
+        # wrongly match the previous one's date.
+        second = int(snapshot.loaded_at)
+        if self._snapshot is None or int(self._snapshot.loaded_at) < second:
+            snapshot.last_modified = second
+        self._snapshot = snapshot
+
+    def apply(self, update):
+        """
+        Publish a new snapshot derived from the current one without a rebuild.
+
+        ``update`` runs under the store lock, so it can also write to the
+        data files (e.g. append to a log) without a concurrent check
+        mistaking that for an external change. It receives the current
+        snapshot and returns ``(graph, derived)``: the new graph (which must
+        not share mutable state with the old one) and the derived values to
+        carry over.
+
+        The new snapshot has no ``last_modified``: several may be published
+        within one second, so only its ETag identifies it.
+
+        :param update: Callable taking a GraphSnapshot and returning (graph, derived).
+        :return: The new GraphSnapshot.
+        """
+        with self._lock:
+            # Pick up external edits first; otherwise the stats recorded below
+            # would mark them as seen and they would never be loaded.
+            self._refresh()
+            current = self._snapshot
+            graph, derived = update(current)
+
+            # Our own writes are now part of the snapshot; record the new stats
+            # so the next check does not reload, but leave the digests unknown
+            # so an external edit still forces a rebuild.
+            stats = _stat_files(self._paths)
+            self._stats = stats
+            self._last_check = time.monotonic()
+            fingerprint = tuple(
+                (path, mtime, size, old[3] if (mtime, size) == old[1:3] else None)
+                for (path, mtime, size), old in zip(stats, current.fingerprint)
+            )
+            self._snapshot = GraphSnapshot(
+                current.version + 1, nx.freeze(graph), fingerprint, derived
+            )
+            return self._snapshot
@@ -0,0 +1,232 @@
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import Response, make_response, request
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+DEFAULT_MAX_BYTES = 64 * 2**20
+
+
+def negotiate_encoding():
+    """
+    Pick the content encoding for the current request from its Accept-Encoding.
+
+    :return: "br", "gzip" or None for identity.
+    """
+    accepted = request.accept_encodings
+    if brotli is not None and accepted.quality("br") > 0:
+        return "br"
+    if accepted.quality("gzip") > 0:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """
+    Incremental compressor with the same interface for gzip and brotli.
+    """
+
+    def __init__(self, encoding):
+        if encoding == "br":
+            self._compressor = brotli.Compressor()
+            self.compress = self._compressor.process
+            self.flush = self._compressor.finish
+        else:
+            # wbits=31 writes a gzip header and trailer
+            self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+            self.compress = self._compressor.compress
+            self.flush = self._compressor.flush
+
+
+def compress(body, encoding):
+    """
+    Compress a complete body with the given encoding.
+    """
+    compressor = _Compressor(encoding)
+    return compressor.compress(body) + compressor.flush()
+
+
+class ResponseCache:
+    """
+    LRU cache of encoded response bodies, bounded by their total size.
+
+    Entries belong to one data tag: storing an entry for a new tag drops
+    every entry of the previous one, since they can no longer be served.
+
+    :param max_bytes: Maximum total size of cached bodies.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._tag = None
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the (body, mimetype, encoding) cached under key, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, tag, key, body, mimetype, encoding):
+        """
+        Cache an encoded body under key, evicting the least recently used entries.
+        """
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if tag != self._tag:
+                self._entries.clear()
+                self._size = 0
+                self._tag = tag
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old[0])
+            self._entries[key] = (body, mimetype, encoding)
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, (evicted, _, _) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+def _encoded_stream(chunks, encoding, limit, store):
+    """
+    Encode a streamed body chunk by chunk, passing the full result to store() at the end.
+
+    Copies of the encoded chunks are kept only while they fit in limit bytes.
+    """
+    compressor = _Compressor(encoding) if encoding else None
+    kept = []
+    size = 0
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        if compressor is not None:
+            chunk = compressor.compress(chunk)
+        if not chunk:
+            continue
+        if kept is not None:
+            size += len(chunk)
+            if size <= limit:
+                kept.append(chunk)
+            else:
+                kept = None
+        yield chunk
+    if compressor is not None:
+        chunk = compressor.flush()
+        if kept is not None and size + len(chunk) <= limit:
+            kept.append(chunk)
+        else:
+            kept = None
+        yield chunk
+    if kept is not None:
+        store(b"".join(kept))
+
+
+def _set_validators(response, etag, modified):
+    response.set_etag(etag, weak=True)
+    if modified is not None:
+        response.last_modified = modified
+    # Clients may keep the body but must revalidate it on every use
+    response.cache_control.no_cache = True
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def versioned(cache, data_tag):
+    """
+    Decorate a GET view whose output depends only on the data version and the URL.
+
+    Responses get a weak ETag derived from the data tag and the request
+    URL, plus Last-Modified when the data has one; a matching
+    If-None-Match (or an If-Modified-Since not older than the data) is
+    answered with 304.
+    Successful bodies are gzip/brotli encoded per Accept-Encoding and
+    cached per (ETag, encoding), so repeat requests skip the view,
+    serialisation and compression. Streamed responses stay streamed and
+    are compressed chunk by chunk.
+
+    :param cache: ResponseCache.
+    :param data_tag: Callable returning (tag, last modified timestamp or None) of the
+        current data. Without a timestamp If-Modified-Since is ignored.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            tag, last_modified = data_tag()
+            etag = hashlib.sha1(f"{tag} {request.full_path}".encode("utf-8"))
+            etag = etag.hexdigest()[:20]
+            modified = None
+            if last_modified is not None:
+                modified = datetime.fromtimestamp(int(last_modified), timezone.utc)
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                since = request.if_modified_since
+                not_modified = (
+                    since is not None and modified is not None and modified <= since
+                )
+            if not_modified:
+                return _set_validators(Response(status=304), etag, modified)
+
+            encoding = negotiate_encoding()
+            key = (etag, encoding)
+            cached = cache.get(key)
+            if cached is not None:
+                body, mimetype, used = cached
+                response = Response(body, mimetype=mimetype)
+                if used:
+                    response.headers["Content-Encoding"] = used
+                return _set_validators(response, etag, modified)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or data_tag()[0] != tag:
+                # Errors are not cached, nor bodies built while the data changed
+                return response
+
+            mimetype = response.mimetype
+            if response.is_streamed:
+
+                def store(body):
+                    cache.put(tag, key, body, mimetype, encoding)
+
+                response.response = _encoded_stream(
+                    response.response, encoding, cache.max_bytes, store
+                )
+                used = encoding
+            else:
+                body = response.get_data()
+                used = encoding if len(body) >= MIN_COMPRESS_BYTES else None
+                if used:
+                    body = compress(body, used)
+                    response.set_data(body)
+                cache.put(tag, key, body, mimetype, used)
+            if used:
+                response.headers["Content-Encoding"] = used
+            return _set_validators(response, etag, modified)
+
+        return wrapper
+
+    return decorator
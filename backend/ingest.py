@@ -0,0 +1,312 @@
+import json
+import os
+import re
+import time
+
+import networkx as nx  # type: ignore
+
+from compact_graph import MISSING_TIMESTAMP, parse_timestamp
+
+CHUNK_SIZE = 1 << 20
+DEFAULT_BATCH_SIZE = 10000
+JSON_LINES_EXTENSIONS = (".jsonl", ".ndjson")
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+_NUMBER_END = re.compile(r"[,\]}\s]")
+
+
+class _Reader:
+    """
+    Buffered character reader that decodes one JSON value at a time.
+    """
+
+    def __init__(self, file, chunk_size=CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop consumed text so the buffer stays about one chunk long.
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """
+        Return the next non-whitespace character without consuming it ("" at EOF).
+        """
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} but found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        """
+        Decode and consume the next JSON value.
+        """
+        first = self.peek()
+        if first == "-" or first.isdigit():
+            # A number is only complete once a delimiter follows it.
+            while not _NUMBER_END.search(self.buffer, self.pos) and self._fill():
+                pass
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            self.pos = end
+            return value
+
+    def array(self):
+        """
+        Yield the elements of the JSON array at the current position.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            separator = self.peek()
+            self.pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or ']' but found {separator!r}")
+
+
+def _iter_json_lines(file):
+    for line_number, line in enumerate(file, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e}")
+
+
+def _iter_json_document(file, key):
+    reader = _Reader(file)
+    first = reader.peek()
+    if first == "[":
+        yield from reader.array()
+        return
+    if first != "{":
+        raise ValueError(f"Expected a JSON array or object but found {first!r}")
+
+    # Walk the top-level object, streaming past other arrays until `key`.
+    reader.expect("{")
+    while reader.peek() != "}":
+        name = reader.value()
+        reader.expect(":")
+        if name == key:
+            yield from reader.array()
+            return
+        if reader.peek() == "[":
+            for _ in reader.array():
+                pass
+        else:
+            reader.value()
+        if reader.peek() == ",":
+            reader.pos += 1
+    raise ValueError(f"Key {key!r} not found")
+
+
+def iter_records(path, key=None):
+    """
+    Stream records from a JSON or JSON Lines file without loading the whole file.
+
+    Supports a top-level JSON array, an object holding the records under
+    ``key`` (e.g. ``{"users": [...]}``), and JSON Lines files
+    (``.jsonl``/``.ndjson``). Only one chunk of text and one record are held
+    in memory at a time.
+
+    :param path: Path to the data file.
+    :param key: Top-level key holding the record array, for object documents.
+    :return: Iterator of records.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+    return _iter_file(path, key)
+
+
+def _iter_file(path, key):
+    with open(path, "r") as file:
+        if path.endswith(JSON_LINES_EXTENSIONS):
+            yield from _iter_json_lines(file)
+        else:
+            yield from _iter_json_document(file, key)
+
+
+def batched(iterable, size):
+    """
+    Yield lists of up to ``size`` items from an iterable.
+    """
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _pick_timestamp(current, new, later):
+    """
+    Return whichever of two ISO timestamps is earlier (or later), ignoring missing ones.
+    """
+    current_time, new_time = parse_timestamp(current), parse_timestamp(new)
+    if current_time == MISSING_TIMESTAMP:
+        return new
+    if new_time == MISSING_TIMESTAMP:
+        return current
+    if later:
+        return new if new_time > current_time else current
+    return new if new_time < current_time else current
+
+
+def merge_interaction(data, interaction):
+    """
+    Return the attributes of a user pair's edge after one more interaction.
+
+    The edge keeps the latest interaction's own fields, as add_edge() did,
+    and aggregates every interaction between the pair: ``weight`` is the
+    total weight, plus ``interaction_count``, ``type_counts`` per
+    interaction type and ``first_timestamp``/``last_timestamp``. ``data``
+    is not modified, so it may belong to a published snapshot.
+
+    :param data: Current edge attributes, or None for a new pair.
+    :param interaction: Interaction record.
+    :return: New attribute dictionary.
+    """
+    weight = interaction.get("weight", 1)
+    interaction_type = interaction.get("interaction_type") or "unknown"
+    timestamp = interaction.get("timestamp")
+    if data is None:
+        merged = dict(interaction)
+        merged.update(
+            weight=weight,
+            interaction_count=1,
+            type_counts={interaction_type: 1},
+            first_timestamp=timestamp,
+            last_timestamp=timestamp,
+        )
+        return merged
+
+    type_counts = dict(data["type_counts"])
+    type_counts[interaction_type] = type_counts.get(interaction_type, 0) + 1
+    merged = {**data, **interaction}
+    merged.update(
+        weight=data["weight"] + weight,
+        interaction_count=data["interaction_count"] + 1,
+        type_counts=type_counts,
+        first_timestamp=_pick_timestamp(data["first_timestamp"], timestamp, False),
+        last_timestamp=_pick_timestamp(data["last_timestamp"], timestamp, True),
+    )
+    return merged
+
+
+def aggregate_edges(graph, interactions):
+    """
+    Add interactions to a graph, aggregating repeated user pairs into one edge.
+
+    Records without both endpoints are skipped.
+
+    :param graph: Mutable NetworkX graph.
+    :param interactions: Iterable of interaction records.
+    """
+    adjacency = graph.adj
+    for interaction in interactions:
+        u, v = interaction.get("source_user"), interaction.get("target_user")
+        if not u or not v:
+            continue
+        data = adjacency[u].get(v) if u in adjacency else None
+        graph.add_edge(u, v, **merge_interaction(data, interaction))
+
+
+class Progress:
+    """
+    Counts ingested records and prints throughput at most every ``interval`` seconds.
+
+    :param label: Name printed with each report.
+    :param interval: Minimum seconds between reports; None disables reporting.
+    """
+
+    def __init__(self, label, interval=5.0):
+        self.label = label
+        self.interval = interval
+        self.count = 0
+        self.started = time.perf_counter()
+        self._last_report = self.started
+
+    @property
+    def rate(self):
+        elapsed = time.perf_counter() - self.started
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+    def update(self, count):
+        self.count += count
+        now = time.perf_counter()
+        if self.interval is not None and now - self._last_report >= self.interval:
+            self._last_report = now
+            self.report()
+
+    def report(self):
+        print(f"{self.label}: {self.count} records ({self.rate:,.0f} records/sec)")
+
+
+def build_graph_streaming(
+    users_path,
+    interactions_path,
+    batch_size=DEFAULT_BATCH_SIZE,
+    progress_interval=5.0,
+):
+    """
+    Build the interaction graph by streaming both data files in batches.
+
+    :param users_path: Users file (``{"users": [...]}``, array or JSON Lines).
+    :param interactions_path: Interactions file (``{"interactions": [...]}``, array or JSON Lines).
+    :param batch_size: Records handed to NetworkX per add_*_from call.
+    :param progress_interval: Seconds between progress reports; None for silence.
+    :return: NetworkX graph.
+    """
+    graph = nx.Graph()
+
+    progress = Progress("users", progress_interval)
+    for batch in batched(iter_records(users_path, "users"), batch_size):
+        # Skip records without a user_id
+        graph.add_nodes_from(
+            (user["user_id"], user) for user in batch if user.get("user_id")
+        )
+        progress.update(len(batch))
+    if progress_interval is not None:
+        progress.report()
+
+    progress = Progress("interactions", progress_interval)
+    for batch in batched(iter_records(interactions_path, "interactions"), batch_size):
+        aggregate_edges(graph, batch)
+        progress.update(len(batch))
+    if progress_interval is not None:
+        progress.report()
+
+    return graph
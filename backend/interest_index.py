@@ -0,0 +1,179 @@
+import numpy as np
+
+# Bits set in every byte value, for NumPy versions without bitwise_count
+_BYTE_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(
+    axis=1
+)
+
+
+def popcount(words):
+    """
+    Count the set bits of a uint64 bitset array along its last axis.
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    as_bytes = np.ascontiguousarray(words).view(np.uint8)
+    return _BYTE_POPCOUNT[as_bytes].sum(axis=-1, dtype=np.int64)
+
+
+def _words(n):
+    return max(1, (n + 63) // 64)
+
+
+def pack_bits(flags):
+    """
+    Pack a boolean array into uint64 bitset words along its last axis.
+
+    Bit ``j % 64`` of word ``j // 64`` is ``flags[..., j]``, as in InterestIndex.
+    """
+    flags = np.asarray(flags, dtype=np.bool_)
+    n = flags.shape[-1]
+    padded = np.zeros(flags.shape[:-1] + (_words(n) * 64,), dtype=np.bool_)
+    padded[..., :n] = flags
+    packed = np.packbits(padded, axis=-1, bitorder="little")
+    return packed.view("<u8").astype(np.uint64, copy=False)
+
+
+class InterestIndex:
+    """
+    Inverted index from each interest to the bitset of users listing it.
+
+    Users are numbered in graph node order; row ``i`` of ``bits`` holds
+    interest ``interests[i]`` as packed uint64 words (bit ``j % 64`` of word
+    ``j // 64`` is node ``j``). Counting users is a popcount and combining
+    interests is a bitwise AND/OR over the words.
+
+    :param nodes: Node IDs in bit order.
+    :param interests: Interest names in row order.
+    :param bits: uint64 array of shape (len(interests), words).
+    """
+
+    def __init__(self, nodes, interests, bits):
+        self.nodes = list(nodes)
+        self.index = {node: idx for idx, node in enumerate(self.nodes)}
+        self.interests = list(interests)
+        self.rows = {interest: row for row, interest in enumerate(self.interests)}
+        self.bits = bits
+
+    @classmethod
+    def from_graph(cls, graph):
+        """
+        Build the index from the "interests" attribute of every node.
+        """
+        nodes = list(graph.nodes)
+        rows = {}
+        postings = []
+        for idx, (_, data) in enumerate(graph.nodes(data=True)):
+            for interest in set(data.get("interests") or ()):
+                row = rows.setdefault(interest, len(rows))
+                postings.append((row, idx))
+
+        bits = np.zeros((len(rows), _words(len(nodes))), dtype=np.uint64)
+        if postings:
+            row, idx = np.array(postings, dtype=np.int64).T
+            np.bitwise_or.at(
+                bits,
+                (row, idx // 64),
+                np.left_shift(np.uint64(1), (idx % 64).astype(np.uint64)),
+            )
+        return cls(nodes, list(rows), bits)
+
+    def with_nodes(self, nodes):
+        """
+        Return a copy covering extra nodes that list no interests.
+        """
+        n = len(self.nodes) + len(nodes)
+        bits = self.bits
+        if _words(n) > bits.shape[1]:
+            bits = np.zeros((len(self.interests), _words(n)), dtype=np.uint64)
+            bits[:, : self.bits.shape[1]] = self.bits
+        return InterestIndex(self.nodes + list(nodes), self.interests, bits)
+
+    def counts(self):
+        """
+        Return (interest, user count) pairs, most common first.
+        """
+        counts = popcount(self.bits)
+        order = np.argsort(-counts, kind="stable")
+        return [(self.interests[row], int(counts[row])) for row in order]
+
+    def bitset(self, interests, match="all"):
+        """
+        Combine the bitsets of several interests.
+
+        :param interests: Interest names; unknown interests match no one.
+        :param match: "all" to AND the bitsets, "any" to OR them.
+        :return: uint64 word array.
+        """
+        if match not in ("all", "any"):
+            raise ValueError("match must be 'all' or 'any'.")
+        words = self.bits.shape[1]
+        empty = np.zeros(words, dtype=np.uint64)
+        rows = [self.bits[self.rows[i]] if i in self.rows else empty for i in interests]
+        if not rows:
+            return empty
+        combine = np.bitwise_and if match == "all" else np.bitwise_or
+        return combine.reduce(np.stack(rows), axis=0)
+
+    def members(self, bitset):
+        """
+        Return the dense node IDs set in a bitset, in node order.
+        """
+        as_bytes = bitset.astype("<u8", copy=False).view(np.uint8)
+        flags = np.unpackbits(as_bytes, bitorder="little")
+        return np.flatnonzero(flags[: len(self.nodes)])
+
+    def users_with(self, interests, match="all"):
+        """
+        Return the nodes listing all (or any) of the given interests.
+        """
+        return [self.nodes[idx] for idx in self.members(self.bitset(interests, match))]
+
+    def interest_vector(self, node):
+        """
+        Return a boolean vector over ``interests`` for one node.
+        """
+        idx = self.index[node]
+        word, bit = divmod(idx, 64)
+        return (self.bits[:, word] >> np.uint64(bit)) & np.uint64(1) == 1
+
+    def interest_bits(self, node):
+        """
+        Return one node's interests as a bitset over ``interests``.
+        """
+        return pack_bits(self.interest_vector(node))
+
+    def shared_interests(self, node, bitsets):
+        """
+        Count the interests a node shares with each of several interest bitsets.
+
+        The bitsets hold interests in ``interests`` order, like
+        interest_bits() of another user or pack_bits() of a community's
+        interest flags; the overlap is a bitwise AND and a popcount.
+
+        :param node: Node ID.
+        :param bitsets: uint64 array of shape (..., words).
+        :return: int array of shared interest counts, one per bitset.
+        """
+        return popcount(np.bitwise_and(bitsets, self.interest_bits(node)))
+
+
+def get_interest_index(snapshot):
+    """
+    Return the interest index for a graph snapshot, building it once per data version.
+
+    :param snapshot: GraphSnapshot.
+    :return: InterestIndex.
+    """
+    return snapshot.derived(
+        "interest_index", lambda: InterestIndex.from_graph(snapshot.graph)
+    )
+
+
+def update_interest_index(index, graph, changes, derived, key):
+    """
+    Extend the index with the nodes added by a live update (they list no interests).
+    """
+    if not changes.new_nodes:
+        return index
+    return index.with_nodes(changes.new_nodes)
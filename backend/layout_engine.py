@@ -0,0 +1,365 @@
+import numpy as np
+
+# Barnes-Hut opening angle: a cell is treated as one body if width / distance < THETA
+THETA = 1.2
+# Deepest quadtree level; coincident points below it are merged into one body
+MAX_DEPTH = 16
+# Coarsening stops at this many nodes, or when a level shrinks by less than MIN_SHRINK
+COARSEST_SIZE = 50
+MIN_SHRINK = 0.9
+# Strength of the pull towards the centre that keeps components together
+GRAVITY = 1.0
+COARSEST_ITERATIONS = 200
+REFINE_ITERATIONS = 15
+WARM_ITERATIONS = 20
+
+
+def _spread_bits(values):
+    """
+    Interleave zeros between the low 16 bits of each value (for Morton codes).
+    """
+    v = values.astype(np.uint64) & np.uint64(0xFFFF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x33333333)
+    v = (v | (v << np.uint64(1))) & np.uint64(0x55555555)
+    return v
+
+
+def _ranges(starts, ends):
+    """
+    Return the concatenation of arange(s, e) for every (s, e) pair.
+    """
+    lengths = ends - starts
+    total = int(lengths.sum())
+    offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return np.arange(total, dtype=np.int64) + offsets
+
+
+class _QuadTree:
+    """
+    Quadtree over 2-D points, stored level by level as arrays.
+
+    Points are sorted by Morton code, so every cell at every level is a
+    contiguous run of points; a level holds each non-empty cell's point
+    count, total mass and centre of mass, and the range of its children
+    in the next level. Levels stop as soon as every cell holds one point.
+    """
+
+    def __init__(self, z, mass):
+        n = len(z)
+        lo = complex(z.real.min(), z.imag.min())
+        size = max(z.real.max() - lo.real, z.imag.max() - lo.imag) or 1.0
+        cells = 1 << MAX_DEPTH
+        scaled = (z - lo) / size * cells
+        gx = np.minimum(scaled.real.astype(np.int64), cells - 1)
+        gy = np.minimum(scaled.imag.astype(np.int64), cells - 1)
+        codes = _spread_bits(gx) | (_spread_bits(gy) << np.uint64(1))
+        order = np.argsort(codes, kind="stable")
+        codes = codes[order]
+        sorted_mass = mass[order]
+        weighted = z[order] * sorted_mass
+
+        self.levels = []
+        for level in range(1, MAX_DEPTH + 1):
+            ids = codes >> np.uint64(2 * (MAX_DEPTH - level))
+            starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+            counts = np.diff(np.r_[starts, n])
+            cell_mass = np.add.reduceat(sorted_mass, starts)
+            centre = np.add.reduceat(weighted, starts) / cell_mass
+            self.levels.append(
+                {
+                    "ids": ids[starts],
+                    "single": counts == 1,
+                    "mass": cell_mass,
+                    "centre": centre,
+                    "width": size / (1 << level),
+                }
+            )
+            if counts.max() == 1:
+                break
+        for parent, child in zip(self.levels, self.levels[1:]):
+            parent_ids = child["ids"] >> np.uint64(2)
+            parent["child_start"] = np.searchsorted(parent_ids, parent["ids"], "left")
+            parent["child_end"] = np.searchsorted(parent_ids, parent["ids"], "right")
+
+    def repulsion(self, z, mass, theta=THETA):
+        """
+        Return the approximate repulsive force sum_j m_i m_j / conj(z_i - z_j).
+
+        Positions are complex numbers, so ``1 / conj(d)`` is the vector
+        ``d / |d|^2``. All (point, cell) pairs of a level are handled at
+        once: far cells, single points and cells of the last level are
+        accepted as bodies, the rest are replaced by their children in the
+        next level.
+        """
+        n = len(z)
+        force = np.zeros(n, dtype=np.complex128)
+        first = len(self.levels[0]["ids"])
+        points = np.repeat(np.arange(n, dtype=np.int32), first)
+        cells = np.tile(np.arange(first, dtype=np.int32), n)
+        last = len(self.levels) - 1
+        for depth, level in enumerate(self.levels):
+            delta = z[points] - level["centre"][cells]
+            dist2 = delta.real * delta.real + delta.imag * delta.imag
+            if depth == last:
+                accept = np.ones(len(points), dtype=bool)
+            else:
+                accept = level["single"][cells] | (
+                    dist2 > (level["width"] / theta) ** 2
+                )
+            # A point's own cell (or a coincident point) exerts no force
+            body = accept & (dist2 > 0)
+            body_points = points[body]
+            pushes = level["mass"][cells[body]] / np.conj(delta[body])
+            force.real += np.bincount(body_points, pushes.real, minlength=n)
+            force.imag += np.bincount(body_points, pushes.imag, minlength=n)
+            points = points[~accept]
+            cells = cells[~accept]
+            if not len(points):
+                break
+            starts = level["child_start"][cells]
+            ends = level["child_end"][cells]
+            points = np.repeat(points, ends - starts)
+            cells = _ranges(starts, ends).astype(np.int32)
+        return force * mass
+
+
+def _relax(z, sources, targets, weights, mass, iterations, start_step, end_step):
+    """
+    Run Fruchterman-Reingold iterations with Barnes-Hut repulsion (natural length 1).
+
+    Positions are complex numbers. The maximum step per node cools
+    geometrically from start_step to end_step.
+    """
+    n = len(z)
+    if n < 2:
+        return z
+    cooling = (end_step / start_step) ** (1 / max(1, iterations - 1))
+    step = start_step
+    for _ in range(iterations):
+        force = _QuadTree(z, mass).repulsion(z, mass)
+        delta = z[sources] - z[targets]
+        pull = delta * np.abs(delta) * weights
+        force.real += np.bincount(targets, pull.real, minlength=n)
+        force.real -= np.bincount(sources, pull.real, minlength=n)
+        force.imag += np.bincount(targets, pull.imag, minlength=n)
+        force.imag -= np.bincount(sources, pull.imag, minlength=n)
+        force -= GRAVITY * mass * (z - z.mean())
+
+        move = force / mass
+        size = np.abs(move)
+        z = z + move * (np.minimum(size, step) / np.where(size > 0, size, 1.0))
+        step *= cooling
+    return z
+
+
+def _coarsen(n, sources, targets, weights, mass, rng, rounds=3):
+    """
+    Merge nodes pairwise along a heavy-edge matching to build the next coarser graph.
+
+    Unmatched nodes propose to their heaviest unmatched neighbour (lightest
+    mass breaking ties, then a random jitter) and mutual proposals are
+    matched, for a few rounds. Leaves that stay unmatched then join their
+    neighbour, which collapses stars that matching alone cannot.
+
+    :return: (cluster ID per node, number of clusters, coarse sources,
+        coarse targets, coarse weights, coarse mass).
+    """
+    cluster = np.full(n, -1, dtype=np.int64)
+    both_u = np.concatenate([sources, targets])
+    both_v = np.concatenate([targets, sources])
+    both_w = np.concatenate([weights, weights])
+    # The same score in both directions makes proposals mutual along locally heaviest edges
+    jitter = np.tile(rng.random(len(sources)) * 1e-6, 2)
+    n_clusters = 0
+    for _ in range(rounds):
+        free = (cluster[both_u] < 0) & (cluster[both_v] < 0)
+        if not free.any():
+            break
+        u, v = both_u[free], both_v[free]
+        score = both_w[free] / (mass[u] * mass[v]) + jitter[free]
+        order = np.lexsort((-score, u))
+        first = np.r_[True, u[order][1:] != u[order][:-1]]
+        choice = np.full(n, -1, dtype=np.int64)
+        choice[u[order][first]] = v[order][first]
+        proposers = np.flatnonzero(choice >= 0)
+        partners = choice[proposers]
+        mutual = (choice[partners] == proposers) & (proposers < partners)
+        proposers, partners = proposers[mutual], partners[mutual]
+        ids = n_clusters + np.arange(len(proposers))
+        cluster[proposers] = ids
+        cluster[partners] = ids
+        n_clusters += len(proposers)
+
+    degree = np.bincount(both_u, minlength=n)
+    leaves = np.flatnonzero((cluster < 0) & (degree == 1))
+    unmatched = cluster < 0
+    single = np.flatnonzero(unmatched)
+    cluster[single] = n_clusters + np.arange(len(single))
+    n_clusters += len(single)
+    if len(leaves):
+        # Each leaf's only edge: find its neighbour and join the neighbour's cluster,
+        # unless the neighbour is itself a merged leaf (keeps this a single hop)
+        order = np.argsort(both_u, kind="stable")
+        neighbour = both_v[order][np.searchsorted(both_u[order], leaves)]
+        keep = ~np.isin(neighbour, leaves)
+        cluster[leaves[keep]] = cluster[neighbour[keep]]
+        _, cluster = np.unique(cluster, return_inverse=True)
+        n_clusters = int(cluster.max()) + 1
+
+    coarse_mass = np.bincount(cluster, weights=mass, minlength=n_clusters)
+    cu, cv = cluster[sources], cluster[targets]
+    inter = cu != cv
+    lo = np.minimum(cu[inter], cv[inter])
+    hi = np.maximum(cu[inter], cv[inter])
+    keys, inverse = np.unique(lo * n_clusters + hi, return_inverse=True)
+    coarse_weights = np.bincount(inverse, weights=weights[inter], minlength=len(keys))
+    return (
+        cluster,
+        n_clusters,
+        keys // n_clusters,
+        keys % n_clusters,
+        coarse_weights,
+        coarse_mass,
+    )
+
+
+def _noise(rng, scale, size):
+    return rng.normal(scale=scale, size=size) + 1j * rng.normal(scale=scale, size=size)
+
+
+def _place_unknown(z, known, sources, targets, rng, spread):
+    """
+    Put nodes without a position at the mean of their placed neighbours.
+
+    Two passes reach nodes two hops from a placed node; the rest are
+    scattered around the centre. A small jitter keeps new nodes apart.
+    """
+    n = len(z)
+    for _ in range(2):
+        if known.all():
+            break
+        total = np.zeros(n, dtype=np.complex128)
+        count = np.zeros(n)
+        for a, b in ((sources, targets), (targets, sources)):
+            edge = known[b] & ~known[a]
+            total.real += np.bincount(a[edge], z[b[edge]].real, minlength=n)
+            total.imag += np.bincount(a[edge], z[b[edge]].imag, minlength=n)
+            count += np.bincount(a[edge], minlength=n)
+        placed = count > 0
+        z[placed] = total[placed] / count[placed] + _noise(rng, 0.1, placed.sum())
+        known = known | placed
+    rest = ~known
+    centre = z[known].mean() if known.any() else 0.0
+    z[rest] = centre + _noise(rng, spread, rest.sum())
+    return z
+
+
+def _normalise(z):
+    """
+    Centre a layout on the origin and return it as (n, 2) coordinates in [-1, 1].
+    """
+    pos = np.column_stack([z.real, z.imag])
+    pos -= pos.mean(axis=0)
+    extent = np.abs(pos).max() if len(pos) else 0
+    return pos / extent if extent > 0 else pos
+
+
+def force_layout(n, sources, targets, weights=None, seed=42, initial=None):
+    """
+    Compute a force-directed layout in O(n log n) per iteration.
+
+    Repulsion uses a Barnes-Hut quadtree and every step is vectorised.
+    Without ``initial`` the graph is coarsened by repeated matching down to
+    a few dozen nodes, laid out there, and each finer level starts from
+    the coarser positions. With ``initial`` (e.g. the cached layout of a
+    previous data version) the known positions are refined directly and
+    new nodes start next to their neighbours.
+
+    :param n: Number of nodes.
+    :param sources: int array of edge source node IDs (0..n-1).
+    :param targets: int array of edge target node IDs.
+    :param weights: Edge weights (default 1); heavier edges pull harder.
+    :param seed: Random seed; the same inputs and seed give the same layout.
+    :param initial: Optional (n, 2) array of starting positions, NaN for unknown nodes.
+    :return: (n, 2) float array of positions scaled into [-1, 1].
+    """
+    rng = np.random.default_rng(seed)
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    weights = np.ones(len(sources)) if weights is None else np.asarray(weights, float)
+    loops = sources == targets
+    sources, targets, weights = sources[~loops], targets[~loops], weights[~loops]
+    if len(weights):
+        # A typical edge pulls with unit strength whatever the weight scale
+        weights = weights / (float(np.median(weights)) or 1.0)
+    if n < 2:
+        return np.zeros((n, 2))
+    mass = np.ones(n)
+
+    if initial is not None:
+        initial = np.asarray(initial, dtype=np.float64)
+        known = ~np.isnan(initial).any(axis=1)
+        if known.any():
+            # Layouts are stored in [-1, 1]; unit spacing needs a radius of about sqrt(n)
+            radius = np.sqrt(n)
+            z = np.where(known, initial[:, 0] + 1j * initial[:, 1], 0) * radius
+            z = _place_unknown(z, known, sources, targets, rng, radius / 10)
+            z = _relax(z, sources, targets, weights, mass, WARM_ITERATIONS, 1.0, 0.05)
+            return _normalise(z)
+
+    levels = [(sources, targets, weights, mass)]
+    clusters = []
+    size = n
+    while size > COARSEST_SIZE:
+        cluster, coarse_n, *coarse = _coarsen(size, *levels[-1], rng)
+        if coarse_n > MIN_SHRINK * size:
+            break
+        clusters.append(cluster)
+        levels.append(tuple(coarse))
+        size = coarse_n
+
+    z = (rng.uniform(-1, 1, size) + 1j * rng.uniform(-1, 1, size)) * np.sqrt(size)
+    z = _relax(z, *levels[-1], COARSEST_ITERATIONS, np.sqrt(size), 0.01 * np.sqrt(size))
+    for cluster, level in zip(reversed(clusters), reversed(levels[:-1])):
+        z = z[cluster] + _noise(rng, 0.1, len(cluster))
+        z = _relax(z, *level, REFINE_ITERATIONS, 2.0, 0.05)
+    return _normalise(z)
+
+
+def edges_from_networkx(graph, nodes=None):
+    """
+    Return (nodes, sources, targets, weights) arrays for a NetworkX graph.
+    """
+    nodes = list(graph) if nodes is None else list(nodes)
+    index = {node: idx for idx, node in enumerate(nodes)}
+    m = graph.number_of_edges()
+    sources = np.empty(m, dtype=np.int64)
+    targets = np.empty(m, dtype=np.int64)
+    weights = np.empty(m)
+    for eid, (u, v, weight) in enumerate(graph.edges(data="weight", default=1)):
+        sources[eid] = index[u]
+        targets[eid] = index[v]
+        weights[eid] = weight
+    return nodes, sources, targets, weights
+
+
+def graph_layout(graph, seed=42, initial=None):
+    """
+    Lay out a NetworkX graph with force_layout().
+
+    :param graph: NetworkX graph.
+    :param seed: Random seed.
+    :param initial: Optional {node: (x, y)} of a previous layout to warm-start from.
+    :return: Dictionary of node -> (x, y) numpy array, like nx.spring_layout.
+    """
+    nodes, sources, targets, weights = edges_from_networkx(graph)
+    start = None
+    if initial:
+        start = np.full((len(nodes), 2), np.nan)
+        for idx, node in enumerate(nodes):
+            if node in initial:
+                start[idx] = initial[node]
+    pos = force_layout(len(nodes), sources, targets, weights, seed=seed, initial=start)
+    return dict(zip(nodes, pos))
@@ -0,0 +1,191 @@
+import json
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+
+from community_detection import (
+    update_centrality,
+    update_community_activity,
+    update_partition,
+)
+from geo import update_location_index
+from graph_operations import update_interest_counts
+from ingest import merge_interaction
+from interest_index import update_interest_index
+from rollups import update_interaction_rollup
+
+# Derived snapshot values patched by a live update, in dependency order.
+# An updater applies to every derived key with that name (a tuple key's
+# first element); it takes (old value, new graph, changes, derived so far,
+# key) and returns the new value. Other derived values are recomputed on
+# demand.
+INCREMENTAL_UPDATERS = (
+    ("communities", update_partition),
+    ("community_activity", update_community_activity),
+    ("centrality", update_centrality),
+    ("interest_counts", update_interest_counts),
+    ("interest_index", update_interest_index),
+    ("interaction_rollup", update_interaction_rollup),
+    ("location_index", update_location_index),
+)
+
+
+def validate_interaction(record):
+    """
+    Check an incoming interaction and fill in the optional fields.
+
+    :param record: Interaction dictionary from a request body.
+    :return: Normalised interaction dictionary.
+    :raises ValueError: If a required field is missing or has the wrong type.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Each interaction must be a JSON object.")
+    for field in ("source_user", "target_user"):
+        if not isinstance(record.get(field), str) or not record[field]:
+            raise ValueError(f"{field} is required and must be a string.")
+    weight = record.get("weight", 1)
+    if isinstance(weight, bool) or not isinstance(weight, (int, float)):
+        raise ValueError("weight must be a number.")
+    shared_interests = record.get("shared_interests", [])
+    if not isinstance(shared_interests, list) or not all(
+        isinstance(interest, str) and interest for interest in shared_interests
+    ):
+        raise ValueError("shared_interests must be a list of non-empty strings.")
+    for field in ("interaction_type", "timestamp"):
+        if field in record and (
+            not isinstance(record[field], str) or not record[field]
+        ):
+            raise ValueError(f"{field} must be a non-empty string.")
+    if "timestamp" in record:
+        try:
+            datetime.fromisoformat(record["timestamp"])
+        except ValueError:
+            raise ValueError("timestamp must be an ISO 8601 date and time.")
+
+    interaction = dict(record)
+    interaction.setdefault("interaction_id", f"I-{uuid.uuid4().hex}")
+    interaction.setdefault("interaction_type", "message")
+    interaction.setdefault(
+        "timestamp",
+        datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0).isoformat(),
+    )
+    interaction["weight"] = weight
+    interaction["shared_interests"] = shared_interests
+    return interaction
+
+
+class InteractionLog:
+    """
+    Append-only JSON Lines file holding interactions received through the API.
+
+    :param path: Log file path; created on the first append.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, interactions):
+        """
+        Write interactions to the log and fsync before returning.
+        """
+        lines = "".join(json.dumps(record) + "\n" for record in interactions)
+        with self._lock:
+            with open(self.path, "a") as file:
+                file.write(lines)
+                file.flush()
+                os.fsync(file.fileno())
+
+
+class GraphChanges:
+    """
+    What a live update did to the graph.
+
+    :param new_nodes: Nodes that did not exist before, in insertion order.
+    :param edges: (u, v, old_data, new_data) per added interaction; old_data
+        is None for a new edge and the pair's previous aggregate otherwise.
+
+    ``moved`` maps a partition's derived key to {node: previous community ID}
+    for the nodes its updater moved.
+    """
+
+    def __init__(self, new_nodes, edges):
+        self.new_nodes = new_nodes
+        self.edges = edges
+        self.moved = {}
+
+
+def add_interactions(graph, interactions):
+    """
+    Return a copy of a graph with interactions added, sharing untouched state.
+
+    Only the node list and the adjacency rows of touched nodes are copied,
+    so the cost is proportional to the batch rather than to the graph and
+    the original (frozen) graph is left as it was.
+
+    :param graph: NetworkX graph of the current snapshot.
+    :param interactions: Validated interaction dictionaries.
+    :return: (graph, GraphChanges).
+    """
+    updated = graph.__class__()
+    updated.graph.update(graph.graph)
+    updated._node = dict(graph._node)
+    updated._adj = dict(graph._adj)
+
+    new_nodes = []
+    copied = set()
+    edges = []
+    for interaction in interactions:
+        u, v = interaction["source_user"], interaction["target_user"]
+        for node in (u, v):
+            if node not in updated._node:
+                updated._node[node] = {}
+                updated._adj[node] = {}
+                new_nodes.append(node)
+                copied.add(node)
+            elif node not in copied:
+                updated._adj[node] = dict(updated._adj[node])
+                copied.add(node)
+        old = updated._adj[u].get(v)
+        data = merge_interaction(old, interaction)
+        updated._adj[u][v] = data
+        updated._adj[v][u] = data
+        edges.append((u, v, old, data))
+    return updated, GraphChanges(new_nodes, edges)
+
+
+def apply_interactions(snapshot, interactions):
+    """
+    Build the next graph and patch the incrementally maintained derived values.
+
+    :param snapshot: Current GraphSnapshot.
+    :param interactions: Validated interaction dictionaries.
+    :return: (graph, derived) as expected by GraphStore.apply().
+    """
+    graph, changes = add_interactions(snapshot.graph, interactions)
+    previous = snapshot.derived_items()
+    derived = {}
+    for name, updater in INCREMENTAL_UPDATERS:
+        for key, value in previous.items():
+            if (key[0] if isinstance(key, tuple) else key) == name:
+                derived[key] = updater(value, graph, changes, derived, key)
+    return graph, derived
+
+
+def ingest_interactions(store, log, interactions):
+    """
+    Durably record interactions and publish them as a new graph snapshot.
+
+    :param store: GraphStore.
+    :param log: InteractionLog the interactions are appended to.
+    :param interactions: Validated interaction dictionaries.
+    :return: The new GraphSnapshot.
+    """
+
+    def update(snapshot):
+        result = apply_interactions(snapshot, interactions)
+        log.append(interactions)
+        return result
+
+    return store.apply(update)
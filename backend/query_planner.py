@@ -0,0 +1,168 @@
+import json
+import re
+
+from chat_data import API_ENDPOINTS, USER_APIS
+
+# "U12", "u12", "user 12", "User ID 12", "user #12", "user_id: 12"
+USER_ID_PATTERN = re.compile(
+    r"\b(?:u|user(?:[\s_-]*id)?[\s:#]*)(\d+)\b", flags=re.IGNORECASE
+)
+
+# API -> patterns of common questions it answers. Rules for per-user APIs
+# only apply when the query names a user; the others only when it names none.
+INTENT_RULES = {
+    "trending_interests": [
+        r"\b(trend\w*|popular|hot)\b.*\binterest",
+        r"\binterests?\b.*\b(trend\w*|popular)",
+    ],
+    "active_communities": [
+        r"\bactive\b.*\bcommunit",
+        r"\bcommunit\w*\b.*\b(active|activity)\b",
+    ],
+    "influence_analysis": [
+        r"\binfluen\w*",
+        r"\bcentral\w*",
+        r"\bmost (connected|important)\b",
+    ],
+    "interaction_trends": [
+        r"\binteraction\w*\b.*\b(trend\w*|over time|daily|weekly|monthly)\b",
+        r"\btrends?\b.*\binteraction",
+    ],
+    "user_search": [r"\b(who is|profile|details?|about|info\w*|look ?up|search)\b"],
+    "user_influence": [r"\binfluen\w*", r"\bcentral\w*", r"\bimportan\w*"],
+    "user_interaction": [r"\binteract\w*", r"\bactivity\b", r"\b(talk|messag)\w*"],
+    "recommended_connections": [
+        r"\b(recommend|suggest|should)\w*\b.*\b(connect\w*|friends?|follow\w*|people)\b",
+        r"\bconnect\w* (with|to)\b",
+    ],
+    "recommended_communities": [
+        r"\b(recommend|suggest|should|which|what)\w*\b.*\bcommunit\w*.*\b(join|fit|belong)",
+        r"\bjoin\b.*\bcommunit",
+    ],
+}
+INTENT_RULES = {
+    api: re.compile("|".join(patterns), flags=re.IGNORECASE)
+    for api, patterns in INTENT_RULES.items()
+}
+# Messages needing no data at all
+SMALL_TALK_PATTERN = re.compile(
+    r"\s*(hi|hello|hey|thanks?( you)?|thank you|bye|good (morning|afternoon|evening))"
+    r"\b[\s!.,?]*(there|again)?[\s!.,?]*",
+    flags=re.IGNORECASE,
+)
+
+PLANNER_PROMPT = """
+You are the query planner of a social media analytics assistant. Decide which APIs
+answer the user's query and extract the user IDs it mentions.
+APIs:
+- trending_interests
+- active_communities
+- influence_analysis
+- interaction_trends
+- user_search (requires user_id)
+- user_influence (requires user_id)
+- user_interaction (requires user_id)
+- recommended_connections (requires user_id)
+- recommended_communities (requires user_id)
+
+Reply with JSON only, in the form {{"apis": ["..."], "user_ids": ["U<number>"]}}.
+Use empty lists for small talk or queries no API can answer.
+
+User Query: "{query}"
+"""
+
+
+class QueryPlan:
+    """
+    The APIs and user IDs chosen to answer one chat message.
+
+    :param apis: API names from chat_data.API_ENDPOINTS, in call order.
+    :param user_ids: User IDs mentioned in the message, as "U<number>".
+    :param source: "local" if the keyword rules matched, "llm" if the model planned
+        it, "cache" if it was planned before.
+    """
+
+    def __init__(self, apis, user_ids, source):
+        self.apis = apis
+        self.user_ids = user_ids
+        self.source = source
+
+    def __repr__(self):
+        return f"QueryPlan(apis={self.apis}, user_ids={self.user_ids}, source={self.source!r})"
+
+
+def extract_user_ids(query):
+    """
+    Return the user IDs mentioned in a query as "U<number>", in order, without repeats.
+    """
+    user_ids = []
+    for number in USER_ID_PATTERN.findall(query):
+        user_id = f"U{int(number)}"
+        if user_id not in user_ids:
+            user_ids.append(user_id)
+    return user_ids
+
+
+def match_intents(query, user_ids):
+    """
+    Return the APIs whose keyword rules match a query.
+
+    :param query: The user's message.
+    :param user_ids: User IDs found in it; they select the per-user rules.
+    """
+    return [
+        api
+        for api, pattern in INTENT_RULES.items()
+        if (api in USER_APIS) == bool(user_ids) and pattern.search(query)
+    ]
+
+
+def parse_plan(text):
+    """
+    Parse the planner model's JSON reply into (apis, user_ids).
+
+    Code fences and text around the JSON object are ignored; unknown API
+    names and malformed user IDs are dropped.
+
+    :raises ValueError: If the reply holds no JSON object.
+    """
+    match = re.search(r"\{.*\}", text, flags=re.DOTALL)
+    if match is None:
+        raise ValueError(f"Planner reply is not JSON: {text[:200]!r}")
+    try:
+        reply = json.loads(match.group(0))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Planner reply is not JSON: {e}")
+    if not isinstance(reply, dict):
+        raise ValueError("Planner reply is not a JSON object.")
+    apis = [api for api in reply.get("apis") or [] if api in API_ENDPOINTS]
+    user_ids = extract_user_ids(" ".join(str(u) for u in reply.get("user_ids") or []))
+    return apis, user_ids
+
+
+def plan_query(query, ask):
+    """
+    Decide which APIs to call for a chat message.
+
+    User IDs are extracted with a regular expression and common questions
+    and small talk are matched with keyword rules, neither needing the
+    model. Only when no rule matches is the model asked, once, for both the APIs and the IDs.
+
+    :param query: The user's message.
+    :param ask: Callable sending a prompt to the model and returning its reply text.
+    :return: QueryPlan.
+    """
+    user_ids = extract_user_ids(query)
+    apis = match_intents(query, user_ids)
+    if apis or SMALL_TALK_PATTERN.fullmatch(query):
+        return QueryPlan(apis, user_ids, "local")
+
+    try:
+        apis, llm_user_ids = parse_plan(ask(PLANNER_PROMPT.format(query=query)))
+    except ValueError as e:
+        print(f"Error planning query: {str(e)}")
+        apis, llm_user_ids = [], []
+    for user_id in llm_user_ids:
+        if user_id not in user_ids:
+            user_ids.append(user_id)
+    return QueryPlan(apis, user_ids, "llm")
@@ -0,0 +1,235 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import networkx as nx  # type: ignore
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+DEFAULT_LAYOUT_SEED = 42
+DEFAULT_DPI = 100
+# Rendered images (and layouts) kept on disk; older files are deleted
+MAX_FILES = 64
+
+
+def cache_key(*params):
+    """
+    Return a file-name-safe hash of render or layout parameters.
+    """
+    return hashlib.sha1(repr(params).encode("utf-8")).hexdigest()
+
+
+def atomic_write(path, write):
+    """
+    Write a file via a temporary file in the same directory, then rename it into place.
+
+    Readers see either no file or the complete file, and concurrent writers
+    of the same path cannot interleave their output.
+
+    :param path: Destination path.
+    :param write: Callable taking a binary file object.
+    """
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _prune(directory, suffix, keep):
+    """
+    Delete all but the ``keep`` most recently modified files with a suffix.
+    """
+    paths = []
+    for name in os.listdir(directory):
+        if name.endswith(suffix):
+            path = os.path.join(directory, name)
+            try:
+                paths.append((os.path.getmtime(path), path))
+            except FileNotFoundError:
+                pass
+    for _, path in sorted(paths, reverse=True)[keep:]:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+class RenderJob:
+    """
+    State of one background render: "pending", "running", "done" or "failed".
+    """
+
+    def __init__(self, job_id, path):
+        self.job_id = job_id
+        self.path = path
+        self.status = "pending"
+        self.error = None
+        self.created_at = time.time()
+
+    def to_dict(self):
+        job = {"job_id": self.job_id, "status": self.status}
+        if self.error is not None:
+            job["error"] = self.error
+        return job
+
+
+class RenderCache:
+    """
+    On-disk cache of rendered images and their layouts, filled by background workers.
+
+    An image is identified by a key covering the data version and every
+    render parameter, and doubles as the job ID while it is being
+    rendered. Layouts are stored separately under their own key so that
+    renders differing only in image parameters reuse them. All files are
+    written atomically, and at most one job runs per key.
+
+    :param directory: Directory holding the images; layouts go in ``layouts/``.
+    :param workers: Number of background render threads.
+    :param max_files: Images and layouts kept on disk.
+    """
+
+    def __init__(self, directory, workers=1, max_files=MAX_FILES):
+        self.directory = directory
+        self.layout_directory = os.path.join(directory, "layouts")
+        self.max_files = max_files
+        os.makedirs(self.layout_directory, exist_ok=True)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="render"
+        )
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def image_path(self, key):
+        return os.path.join(self.directory, f"{key}.png")
+
+    def _load_layout(self, path):
+        try:
+            with np.load(path) as stored:
+                return dict(zip(stored["nodes"].tolist(), stored["positions"]))
+        except FileNotFoundError:
+            return None
+
+    def _save_layout(self, path, pos):
+        nodes = list(pos)
+        positions = np.array([pos[node] for node in nodes], dtype=np.float64)
+        atomic_write(
+            path,
+            lambda f: np.savez(f, nodes=np.array(nodes), positions=positions),
+        )
+
+    def layout(self, key, compute, family=None):
+        """
+        Return a stored layout, computing and storing it on first use.
+
+        Layouts of one ``family`` (e.g. the full graph with one seed) are
+        successive versions of each other: the latest one is kept as well
+        and handed to ``compute`` so it can warm-start from it.
+
+        :param key: Layout cache key.
+        :param compute: Callable taking the family's previous layout (or None)
+            and returning {node: (x, y)}.
+        :param family: Optional hashable naming the layout family.
+        """
+        path = os.path.join(self.layout_directory, f"{key}.npz")
+        pos = self._load_layout(path)
+        if pos is not None:
+            return pos
+        latest = None
+        if family is not None:
+            latest = os.path.join(
+                self.layout_directory, f"latest-{cache_key(family)}.npz"
+            )
+        pos = compute(self._load_layout(latest) if latest else None)
+        self._save_layout(path, pos)
+        if latest:
+            self._save_layout(latest, pos)
+        _prune(self.layout_directory, ".npz", self.max_files)
+        return pos
+
+    def request(self, key, render):
+        """
+        Return the job for an image, starting a background render if needed.
+
+        :param key: Image cache key (also the job ID).
+        :param render: Callable taking a binary file object and writing the PNG to it.
+        :return: RenderJob; its status is "done" if the image is already cached.
+        """
+        path = self.image_path(key)
+        with self._lock:
+            if os.path.exists(path):
+                job = self._jobs.pop(key, None) or RenderJob(key, path)
+                job.status = "done"
+                return job
+            job = self._jobs.get(key)
+            if job is not None:
+                # A failed job is reported once; the next request retries it
+                if job.status == "failed":
+                    del self._jobs[key]
+                return job
+            job = self._jobs[key] = RenderJob(key, path)
+        self._executor.submit(self._run, job, render)
+        return job
+
+    def job(self, job_id):
+        """
+        Return a render job by ID, or None if it is unknown.
+        """
+        if not re.fullmatch(r"[0-9a-f]{40}", job_id):
+            return None
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and os.path.exists(self.image_path(job_id)):
+            job = RenderJob(job_id, self.image_path(job_id))
+            job.status = "done"
+        return job
+
+    def _run(self, job, render):
+        job.status = "running"
+        try:
+            atomic_write(job.path, render)
+            _prune(self.directory, ".png", self.max_files)
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+            return
+        job.status = "done"
+
+
+def draw_png(f, parts, title, dpi=DEFAULT_DPI):
+    """
+    Draw graphs onto one figure and write it to a file as PNG.
+
+    Uses a standalone Figure rather than pyplot, whose global state is not
+    safe to share between render threads.
+
+    :param f: Binary file object.
+    :param parts: (graph, positions, node colour) triples drawn in order.
+    :param title: Figure title.
+    :param dpi: Image resolution.
+    """
+    figure = Figure(figsize=(12, 12))
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+    for graph, pos, color in parts:
+        nx.draw(
+            graph,
+            pos,
+            ax=ax,
+            with_labels=False,
+            node_size=50,
+            node_color=color,
+            edge_color="gray",
+            alpha=0.7,
+        )
+    ax.set_title(title, fontsize=16)
+    figure.savefig(f, format="png", dpi=dpi)
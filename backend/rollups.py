@@ -0,0 +1,203 @@
+import numpy as np
+
+from compact_graph import MISSING_TIMESTAMP, format_timestamp, parse_timestamp
+
+GRANULARITIES = ("hour", "day", "week", "month")
+DEFAULT_GRANULARITY = "day"
+
+_HOUR = 3600
+_DAY = 86400
+_WEEK = 7 * _DAY
+# 1970-01-01 was a Thursday; shift so weeks start on Monday
+_MONDAY_OFFSET = 4 * _DAY
+
+
+def bucket_start(timestamps, granularity):
+    """
+    Return the start (epoch seconds, UTC) of the bucket holding each timestamp.
+
+    :param timestamps: int64 array of epoch seconds.
+    :param granularity: One of GRANULARITIES.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if granularity == "hour":
+        return timestamps // _HOUR * _HOUR
+    if granularity == "day":
+        return timestamps // _DAY * _DAY
+    if granularity == "week":
+        return (timestamps - _MONDAY_OFFSET) // _WEEK * _WEEK + _MONDAY_OFFSET
+    if granularity == "month":
+        months = timestamps.astype("datetime64[s]").astype("datetime64[M]")
+        return months.astype("datetime64[s]").astype(np.int64)
+    raise ValueError(
+        f"Unknown granularity: {granularity}. Choose one of {', '.join(GRANULARITIES)}."
+    )
+
+
+class _Series:
+    """
+    Non-empty buckets of one granularity with per-type counts and their prefix sums.
+    """
+
+    def __init__(self, starts, counts):
+        self.starts = starts
+        self.counts = counts
+        self.prefix = np.zeros((len(starts) + 1, counts.shape[1]), dtype=np.int64)
+        np.cumsum(counts, axis=0, out=self.prefix[1:])
+
+    @classmethod
+    def build(cls, starts, type_codes, n_types):
+        keys, inverse = np.unique(starts, return_inverse=True)
+        counts = np.zeros((len(keys), n_types), dtype=np.int64)
+        np.add.at(counts, (inverse, type_codes), 1)
+        return cls(keys, counts)
+
+    def merged(self, other):
+        n_types = max(self.counts.shape[1], other.counts.shape[1])
+        starts = np.concatenate([self.starts, other.starts])
+        counts = np.zeros((len(starts), n_types), dtype=np.int64)
+        counts[: len(self.starts), : self.counts.shape[1]] = self.counts
+        counts[len(self.starts) :, : other.counts.shape[1]] = other.counts
+        keys, inverse = np.unique(starts, return_inverse=True)
+        combined = np.zeros((len(keys), n_types), dtype=np.int64)
+        np.add.at(combined, inverse, counts)
+        return _Series(keys, combined)
+
+
+class InteractionRollup:
+    """
+    Interaction counts per hour/day/week/month bucket, broken down by interaction type.
+
+    Each granularity keeps only its non-empty buckets, sorted, with prefix
+    sums over their per-type counts. A range query is two binary searches
+    plus a prefix-sum difference, so it costs O(log buckets + buckets
+    returned) whatever the number of interactions.
+
+    :param timestamps: int64 epoch seconds per interaction (MISSING_TIMESTAMP if unknown).
+    :param type_codes: Interaction type code per interaction.
+    :param interaction_types: Type names indexed by code.
+    """
+
+    def __init__(self, timestamps, type_codes, interaction_types):
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        type_codes = np.asarray(type_codes, dtype=np.int64)
+        known = timestamps != MISSING_TIMESTAMP
+        self.interaction_types = list(interaction_types)
+        self.missing = int(np.count_nonzero(~known))
+        self.series = {
+            granularity: _Series.build(
+                bucket_start(timestamps[known], granularity),
+                type_codes[known],
+                len(self.interaction_types),
+            )
+            for granularity in GRANULARITIES
+        }
+
+    @classmethod
+    def from_records(cls, interactions):
+        """
+        Build a rollup from interaction records.
+        """
+        timestamps = []
+        type_codes = []
+        type_index = {}
+        for interaction in interactions:
+            timestamps.append(parse_timestamp(interaction.get("timestamp")))
+            interaction_type = interaction.get("interaction_type") or "unknown"
+            type_codes.append(type_index.setdefault(interaction_type, len(type_index)))
+        return cls(timestamps, type_codes, list(type_index))
+
+    def with_records(self, interactions):
+        """
+        Return a new rollup with more interactions added; this one is unchanged.
+
+        Only the bucket arrays are merged, so the cost depends on the number
+        of buckets and the batch size, not on the interactions seen so far.
+        """
+        type_index = {name: code for code, name in enumerate(self.interaction_types)}
+        timestamps = []
+        type_codes = []
+        for interaction in interactions:
+            timestamps.append(parse_timestamp(interaction.get("timestamp")))
+            interaction_type = interaction.get("interaction_type") or "unknown"
+            type_codes.append(type_index.setdefault(interaction_type, len(type_index)))
+        batch = InteractionRollup(timestamps, type_codes, list(type_index))
+
+        rollup = InteractionRollup.__new__(InteractionRollup)
+        rollup.interaction_types = batch.interaction_types
+        rollup.missing = self.missing + batch.missing
+        rollup.series = {
+            granularity: series.merged(batch.series[granularity])
+            for granularity, series in self.series.items()
+        }
+        return rollup
+
+    def _type_counts(self, row):
+        return {self.interaction_types[code]: int(n) for code, n in enumerate(row) if n}
+
+    def query(self, granularity=DEFAULT_GRANULARITY, start=None, end=None):
+        """
+        Return the buckets between two timestamps together with their totals.
+
+        :param granularity: One of GRANULARITIES.
+        :param start: Epoch seconds; buckets from the one holding it onwards.
+        :param end: Epoch seconds; buckets up to and including the one holding it.
+        :return: Dictionary with the total, per-type totals and the bucket list.
+        """
+        if granularity not in self.series:
+            raise ValueError(
+                f"Unknown granularity: {granularity}. "
+                f"Choose one of {', '.join(GRANULARITIES)}."
+            )
+        series = self.series[granularity]
+        lo = 0
+        hi = len(series.starts)
+        if start is not None:
+            lo = np.searchsorted(series.starts, bucket_start([start], granularity)[0])
+        if end is not None:
+            hi = np.searchsorted(
+                series.starts, bucket_start([end], granularity)[0], side="right"
+            )
+        hi = max(lo, hi)
+
+        totals = series.prefix[hi] - series.prefix[lo]
+        buckets = [
+            {
+                "date": format_timestamp(series.starts[i]),
+                "interaction_count": int(series.counts[i].sum()),
+                "by_type": self._type_counts(series.counts[i]),
+            }
+            for i in range(lo, hi)
+        ]
+        return {
+            "total": int(totals.sum()),
+            "by_type": self._type_counts(totals),
+            "buckets": buckets,
+        }
+
+
+def get_interaction_rollup(snapshot, load_interactions):
+    """
+    Return the interaction rollup for a graph snapshot, building it once per data version.
+
+    Aggregated edges no longer hold every interaction, so the rollup is
+    built from the interaction records of the snapshot's data files.
+
+    :param snapshot: GraphSnapshot.
+    :param load_interactions: Callable returning an iterable of interaction records.
+    :return: InteractionRollup.
+    """
+    return snapshot.derived(
+        "interaction_rollup",
+        lambda: InteractionRollup.from_records(load_interactions()),
+    )
+
+
+def update_interaction_rollup(rollup, graph, changes, derived, key):
+    """
+    Add the interactions of a live update to the rollup.
+
+    Merged edge attributes carry the latest interaction's own timestamp
+    and type, so each change entry stands for one new interaction.
+    """
+    return rollup.with_records(new for _, _, _, new in changes.edges)
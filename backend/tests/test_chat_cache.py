@@ -0,0 +1,40 @@
+import chatbot
+from chat_cache import ChatCache
+from chat_sessions import ChatSession
+
+
+class FakeDataClient:
+    def data_tag(self):
+        return "tag"
+
+    def fetch_many(self, paths, limit=None):
+        return {key: {} for key in paths}
+
+
+def make_session(conversation_id, calls):
+    def complete(contents):
+        calls.append(conversation_id)
+        return f"answer {len(calls)} for {conversation_id}", None, None
+
+    return ChatSession(conversation_id, complete)
+
+
+def test_answers_given_with_history_stay_in_their_conversation(monkeypatch):
+    monkeypatch.setattr(chatbot, "chat_cache", ChatCache())
+    client = FakeDataClient()
+    question = "What are the trending interests?"
+    calls = []
+    first, second = make_session("first", calls), make_session("second", calls)
+
+    # Without history the answer does not depend on the conversation
+    answer = chatbot.get_chatbot_response(question, client, first)
+    assert chatbot.get_chatbot_response(question, client, second) == answer
+    assert calls == ["first"]
+
+    # With history it may, so another conversation does not get it
+    followup = chatbot.get_chatbot_response(question, client, first)
+    assert calls == ["first", "first"]
+    third = make_session("third", calls)
+    third.remember("Hello", "Hi")
+    assert chatbot.get_chatbot_response(question, client, third) != followup
+    assert calls == ["first", "first", "third"]
@@ -0,0 +1,48 @@
+import json
+
+from columnar import ColumnarDataset, build_graph_from_dataset, compile_dataset
+from ingest import build_graph_streaming
+
+
+def write_json(path, key, records):
+    with open(path, "w") as f:
+        json.dump({key: records}, f)
+    return str(path)
+
+
+def test_snapshot_graph_keeps_node_order_of_interaction_only_users(tmp_path):
+    users = write_json(tmp_path / "users.json", "users", [{"user_id": "U1"}])
+    interactions = write_json(
+        tmp_path / "interactions.json",
+        "interactions",
+        [
+            {
+                "interaction_id": "I1",
+                "source_user": "U9",
+                "target_user": "U2",
+                "interaction_type": "like",
+                "timestamp": "2024-01-01T10:00:00",
+            },
+            {
+                "interaction_id": "I2",
+                "source_user": "U1",
+                "target_user": "U9",
+                "interaction_type": "comment",
+                "timestamp": "2024-01-02T10:00:00",
+                "weight": 2,
+            },
+        ],
+    )
+    snapshot = compile_dataset(
+        users, interactions, str(tmp_path / "snapshot"), progress_interval=None
+    )
+    dataset = ColumnarDataset(snapshot)
+
+    graph = build_graph_from_dataset(dataset)
+    streamed = build_graph_streaming(users, interactions, progress_interval=None)
+
+    assert list(graph) == ["U1", "U9", "U2"]
+    assert list(graph) == dataset.compact_graph().nodes
+    assert list(graph.nodes(data=True)) == list(streamed.nodes(data=True))
+    for node in streamed:
+        assert list(graph.adj[node].items()) == list(streamed.adj[node].items())
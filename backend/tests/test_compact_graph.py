@@ -0,0 +1,65 @@
+import networkx as nx  # type: ignore
+import numpy as np
+import pytest
+
+from compact_graph import CompactGraph
+
+
+def interaction_graph():
+    """
+    Karate club graph with edge attributes in the form the compact graph stores them.
+    """
+    graph = nx.karate_club_graph()
+    for u, v, data in graph.edges(data=True):
+        interaction_type = ("like", "comment", "share")[(u + v) % 3]
+        data.clear()
+        data.update(
+            weight=float((u * v) % 4 + 1),
+            interaction_type=interaction_type,
+            timestamp=f"2024-01-{u % 28 + 1:02d}T10:00:00",
+            geographic_proximity=bool(u % 2),
+            interaction_count=2,
+            type_counts={interaction_type: 1, "message": 1},
+            first_timestamp=f"2023-12-{v % 28 + 1:02d}T08:30:00",
+            last_timestamp=f"2024-01-{u % 28 + 1:02d}T10:00:00",
+        )
+    graph.add_node(99, club="none")
+    return graph
+
+
+def test_networkx_round_trip():
+    graph = interaction_graph()
+    compact = CompactGraph.from_networkx(graph)
+    converted = compact.to_networkx(dict(graph.nodes(data=True)))
+
+    assert list(converted.nodes(data=True)) == list(graph.nodes(data=True))
+    assert converted.number_of_edges() == graph.number_of_edges()
+    for u, v, data in graph.edges(data=True):
+        assert converted.edges[u, v] == data
+
+
+def test_bfs_matches_networkx():
+    graph = interaction_graph()
+    compact = CompactGraph.from_networkx(graph)
+    source = compact.index[0]
+
+    expected = nx.single_source_shortest_path_length(graph, 0)
+    distance = compact.bfs(source)
+    for node, idx in compact.index.items():
+        assert distance[idx] == expected.get(node, -1)
+
+
+def test_jaccard_matches_networkx():
+    graph = interaction_graph()
+    compact = CompactGraph.from_networkx(graph)
+    candidates = [node for node in graph if node != 0]
+
+    scores = compact.jaccard(
+        compact.index[0], np.array([compact.index[node] for node in candidates])
+    )
+    expected = {
+        v: score
+        for _, v, score in nx.jaccard_coefficient(graph, [(0, v) for v in candidates])
+    }
+    for node, score in zip(candidates, scores):
+        assert score == pytest.approx(expected[node])
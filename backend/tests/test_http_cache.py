@@ -0,0 +1,41 @@
+import networkx as nx  # type: ignore
+from flask import Flask, jsonify
+
+from graph_store import GraphStore
+from http_cache import ResponseCache, versioned
+
+
+def make_client(state):
+    app = Flask(__name__)
+
+    @app.route("/data")
+    @versioned(ResponseCache(), lambda: state["data"])
+    def data():
+        return jsonify({"tag": state["data"][0]})
+
+    return app.test_client()
+
+
+def test_if_modified_since_is_ignored_without_a_date():
+    state = {"data": ("first", 1_700_000_000)}
+    client = make_client(state)
+    response = client.get("/data")
+    since = response.headers["Last-Modified"]
+    assert client.get("/data", headers={"If-Modified-Since": since}).status_code == 304
+
+    # A live update within the same second has no date of its own
+    state["data"] = ("second", None)
+    response = client.get("/data", headers={"If-Modified-Since": since})
+    assert response.status_code == 200
+    assert response.json == {"tag": "second"}
+    assert "Last-Modified" not in response.headers
+
+
+def test_live_snapshots_have_no_last_modified(tmp_path):
+    path = tmp_path / "data.txt"
+    path.write_text("x")
+    store = GraphStore(lambda _: nx.Graph(), [str(path)])
+
+    assert store.snapshot().last_modified == int(store.snapshot().loaded_at)
+    live = store.apply(lambda snapshot: (nx.Graph(snapshot.graph), {}))
+    assert live.last_modified is None
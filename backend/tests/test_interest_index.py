@@ -0,0 +1,62 @@
+import networkx as nx  # type: ignore
+import numpy as np
+
+from interest_index import InterestIndex, pack_bits
+
+INTERESTS = ["Music", "Investing", "Cryptocurrency", "Travel", "Cooking", "Art"]
+
+
+def interest_graph(num_users=150):
+    graph = nx.Graph()
+    for i in range(num_users):
+        interests = [name for j, name in enumerate(INTERESTS) if (i * (j + 3)) % 5 < 2]
+        graph.add_node(f"U{i}", interests=interests)
+    return graph
+
+
+def test_pack_bits_matches_members():
+    flags = np.arange(130) % 3 == 0
+    index = InterestIndex([f"U{i}" for i in range(130)], ["x"], pack_bits(flags)[None])
+
+    assert index.members(index.bits[0]).tolist() == np.flatnonzero(flags).tolist()
+
+
+def test_shared_interests_between_users_matches_sets():
+    graph = interest_graph()
+    index = InterestIndex.from_graph(graph)
+    others = list(graph)[:40]
+
+    shared = index.shared_interests(
+        "U7", np.stack([index.interest_bits(other) for other in others])
+    )
+    mine = set(graph.nodes["U7"]["interests"])
+    assert shared.tolist() == [
+        len(mine & set(graph.nodes[other]["interests"])) for other in others
+    ]
+
+
+def test_shared_interests_with_communities_matches_sets():
+    graph = interest_graph()
+    index = InterestIndex.from_graph(graph)
+    communities = [list(graph)[i::4] for i in range(4)]
+    flags = [
+        [
+            any(name in graph.nodes[member]["interests"] for member in community)
+            for name in index.interests
+        ]
+        for community in communities
+    ]
+
+    shared = index.shared_interests("U3", pack_bits(flags))
+    mine = set(graph.nodes["U3"]["interests"])
+    assert shared.tolist() == [
+        len(
+            mine
+            & {
+                name
+                for member in community
+                for name in graph.nodes[member]["interests"]
+            }
+        )
+        for community in communities
+    ]
@@ -0,0 +1,32 @@
+import os
+
+import pytest
+
+import app
+from live_ingest import InteractionLog, validate_interaction
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    log_path = str(tmp_path / "interactions_log.jsonl")
+    monkeypatch.setattr(app, "interaction_log", InteractionLog(log_path))
+    return app.app.test_client(), log_path
+
+
+@pytest.mark.parametrize("interests", [[{"a": 1}], ["music", ""], ["music", 3]])
+def test_validate_interaction_rejects_non_string_shared_interests(interests):
+    record = {"source_user": "U1", "target_user": "U2", "shared_interests": interests}
+    with pytest.raises(ValueError):
+        validate_interaction(record)
+
+
+def test_bad_shared_interests_are_rejected_before_logging(client):
+    client, log_path = client
+    response = client.post(
+        "/api/interactions",
+        json={"source_user": "U1", "target_user": "U2", "shared_interests": [{"a": 1}]},
+    )
+
+    assert response.status_code == 400
+    assert not os.path.exists(log_path)
+    assert client.get("/api/trending-interests").status_code == 200
@@ -0,0 +1,42 @@
+import networkx as nx  # type: ignore
+import pytest
+
+import app
+from compact_graph import CompactGraph
+from recommendations import recommend_connections
+
+NX_SCORES = {
+    "jaccard": nx.jaccard_coefficient,
+    "adamic_adar": nx.adamic_adar_index,
+    "resource_allocation": nx.resource_allocation_index,
+}
+
+
+@pytest.mark.parametrize("scorer", sorted(NX_SCORES))
+def test_scores_match_networkx(scorer):
+    graph = nx.karate_club_graph()
+    compact = CompactGraph.from_networkx(graph)
+
+    recommendations, total = recommend_connections(compact, 0, scorer=scorer, limit=5)
+
+    two_hop = {
+        v for friend in graph[0] for v in graph[friend] if v != 0 and v not in graph[0]
+    }
+    pairs = [(0, v) for v in two_hop]
+    expected = {v: score for _, v, score in NX_SCORES[scorer](graph, pairs)}
+    assert total == len(two_hop)
+    for _, v, score in recommendations:
+        assert score == pytest.approx(expected[v])
+    assert [score for _, _, score in recommendations] == pytest.approx(
+        sorted(expected.values(), reverse=True)[:5]
+    )
+
+
+@pytest.mark.parametrize("query", ["limit=abc", "offset=x", "limit=0", "offset=-1"])
+def test_invalid_paging_is_rejected(query):
+    client = app.app.test_client()
+    user_id = next(iter(app.graph_store.graph()))
+
+    response = client.get(f"/api/recommended-connections/{user_id}?{query}")
+
+    assert response.status_code == 400
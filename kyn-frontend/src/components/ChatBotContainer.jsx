@@ -9,6 +9,7 @@ const ChatBotContainer = () => {
   const [input, setInput] = useState("");
   const [chatbotCollapsed, setChatbotCollapsed] = useState(true);
   const [isLoading, setIsLoading] = useState(false);
+  const [conversationId, setConversationId] = useState(null); // Assigned by the server
   const messagesEndRef = useRef(null);
 
   const scrollToBottom = () => {
@@ -36,9 +37,12 @@ const ChatBotContainer = () => {
           headers: {
             "Content-Type": "application/json",
           },
-          body: JSON.stringify({ message: input }),
+          body: JSON.stringify({ message: input, conversation_id: conversationId }),
         });
         const data = await response.json();
+        if (data.conversation_id) {
+          setConversationId(data.conversation_id);
+        }
         setMessages((prevMessages) => [
           ...prevMessages,
           { text: data.response, sender: "bot" },
@@ -9,93 +9,100 @@ import ReactFlow, {
 import "reactflow/dist/style.css";
 import axios from "axios";
 
+const SCALE = 1000; // Server positions are in [-1, 1]
+
+const communityColor = (id, count) => `hsl(${(id * 360) / Math.max(count, 1)}, 70%, 50%)`;
+
+const toPosition = (position) =>
+  position
+    ? { x: position[0] * SCALE, y: position[1] * SCALE }
+    : { x: Math.random() * 2 * SCALE - SCALE, y: Math.random() * 2 * SCALE - SCALE };
+
 const CommunityGraphComponent = () => {
   const [nodes, setNodes, onNodesChange] = useNodesState([]);
   const [edges, setEdges, onEdgesChange] = useEdgesState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [highlightedNode, setHighlightedNode] = useState(null);
-  const [originalNodes, setOriginalNodes] = useState([]);
-  const [originalEdges, setOriginalEdges] = useState([]);
-  const [communities, setCommunities] = useState({});
+  const [quotient, setQuotient] = useState({ nodes: [], edges: [] });
   const [selectedCommunity, setSelectedCommunity] = useState("all");
 
+  // Level 0: one node per community, edges weighted by inter-community interactions
+  const showQuotient = (data) => {
+    const largest = Math.max(1, ...data.nodes.map((c) => c.size));
+    const maxWeight = Math.max(1, ...data.edges.map((e) => e.weight));
+    setNodes(
+      data.nodes.map((community) => {
+        const size = 30 + 90 * Math.sqrt(community.size / largest);
+        return {
+          id: String(community.id),
+          data: { label: `Community ${community.id} (${community.size})` },
+          position: toPosition(community.position),
+          style: {
+            background: communityColor(community.id, data.nodes.length),
+            width: size,
+            height: size,
+            borderRadius: "50%",
+            color: "#fff",
+            fontSize: "10px",
+          },
+        };
+      })
+    );
+    setEdges(
+      data.edges.map((edge) => ({
+        id: `${edge.source}-${edge.target}`,
+        source: String(edge.source),
+        target: String(edge.target),
+        style: { stroke: "gray", strokeWidth: 1 + 6 * (edge.weight / maxWeight) },
+      }))
+    );
+  };
+
+  // Level 1: the members of one community, loaded on demand
+  const showCommunity = async (communityId) => {
+    setLoading(true);
+    try {
+      const response = await axios.get(`/api/community-graph/${communityId}`);
+      const data = response.data;
+      const color = communityColor(communityId, quotient.nodes.length);
+      setNodes(
+        data.nodes.map((node) => ({
+          id: String(node.id),
+          data: { label: `User ${node.id}` },
+          position: toPosition(data.positions[node.id]),
+          style: {
+            background: color,
+            width: 50,
+            height: 50,
+            borderRadius: "50%",
+            color: "#fff",
+            fontSize: "10px",
+          },
+        }))
+      );
+      setEdges(
+        data.links.map((link) => ({
+          id: String(link.interaction_id),
+          source: String(link.source),
+          target: String(link.target),
+          label: link.interaction_type,
+          style: { stroke: link.geographic_proximity ? "green" : "red" },
+        }))
+      );
+    } catch (err) {
+      setError("Error fetching community graph data.");
+    } finally {
+      setLoading(false);
+    }
+  };
+
   useEffect(() => {
-    const fetchCommunityData = async () => {
+    const fetchQuotient = async () => {
       try {
-        const response = await axios.get("/api/community-graph");
-        const data = response.data.communities;
-
-        const allNodes = [];
-        const allEdges = [];
-        const connections = {};
-        const communityMap = {};
-
-        // Process nodes and edges
-        data.forEach((community, index) => {
-          const color = `hsl(${(index * 360) / data.length}, 70%, 50%)`; // Unique color for each community
-
-          // Map nodes and assign them to communities
-          community.nodes.forEach((node) => {
-            allNodes.push({
-              id: node.id,
-              data: { label: `User ${node.id}` },
-              position: {
-                x: Math.random() * 2000 - 1000,
-                y: Math.random() * 2000 - 1000,
-              },
-              style: {
-                background: color,
-                width: 50,
-                height: 50,
-                borderRadius: "50%",
-                color: "#fff",
-                fontSize: "10px",
-              },
-            });
-            communityMap[node.id] = index; // Assign node to its community
-          });
-
-          // Map edges and connections
-          community.links.forEach((link) => {
-            allEdges.push({
-              id: link.interaction_id,
-              source: link.source,
-              target: link.target,
-              label: link.interaction_type,
-              style: { stroke: link.geographic_proximity ? "green" : "red" },
-            });
-            connections[link.source] = connections[link.source] || [];
-            connections[link.target] = connections[link.target] || [];
-            connections[link.source].push(link.target);
-            connections[link.target].push(link.source);
-          });
-        });
-
-        // Filter out floating nodes (nodes with no connections)
-        const connectedNodes = allNodes.filter((node) => connections[node.id]);
-        const connectedEdges = allEdges.filter(
-          (edge) =>
-            connections[edge.source] && connections[edge.target]
-        );
-
-        // Randomly pick 200 nodes with connections
-        const shuffledNodes = connectedNodes.sort(() => 0.5 - Math.random());
-        const selectedNodes = shuffledNodes.slice(0, 200);
-        const selectedNodeIds = new Set(selectedNodes.map((node) => node.id));
-
-        const filteredEdges = connectedEdges.filter(
-          (edge) =>
-            selectedNodeIds.has(edge.source) &&
-            selectedNodeIds.has(edge.target)
-        );
-
-        // Set state
-        setOriginalNodes(selectedNodes);
-        setOriginalEdges(filteredEdges);
-        setNodes(selectedNodes);
-        setEdges(filteredEdges);
-        setCommunities(communityMap);
+        const response = await axios.get("/api/community-quotient-graph");
+        setQuotient(response.data);
+        showQuotient(response.data);
       } catch (err) {
         setError("Error fetching community graph data.");
       } finally {
@@ -103,72 +110,56 @@ const CommunityGraphComponent = () => {
       }
     };
 
-    fetchCommunityData();
+    fetchQuotient();
   }, []);
 
+  const handleCommunityFilter = (communityId) => {
+    setSelectedCommunity(communityId);
+    setHighlightedNode(null); // Reset highlight if any
+    if (communityId === "all") {
+      showQuotient(quotient);
+    } else {
+      showCommunity(communityId);
+    }
+  };
+
+  const handleNodeClick = (event, node) => {
+    // Clicking a community drills into it
+    if (selectedCommunity === "all") {
+      handleCommunityFilter(node.id);
+    }
+  };
+
   const handleNodeDoubleClick = (event, node) => {
     if (highlightedNode === node.id) {
-      // Reset graph to original or community-filtered view
+      // Reset graph to the current level
       handleCommunityFilter(selectedCommunity);
-      setHighlightedNode(null);
-    } else {
-      // Highlight node and its connections
-      const connectedNodes = new Set(
-        edges
-          .filter((edge) => edge.source === node.id || edge.target === node.id)
-          .flatMap((edge) => [edge.source, edge.target])
-      );
+      return;
+    }
+    // Highlight node and its connections
+    const connectedNodes = new Set(
+      edges
+        .filter((edge) => edge.source === node.id || edge.target === node.id)
+        .flatMap((edge) => [edge.source, edge.target])
+    );
 
-      const highlightedNodes = nodes.map((n) => ({
+    setNodes(
+      nodes.map((n) => ({
         ...n,
-        style: {
-          ...n.style,
-          opacity: connectedNodes.has(n.id) ? 1 : 0.2,
-        },
-      }));
-
-      const highlightedEdges = edges.map((e) => ({
+        style: { ...n.style, opacity: connectedNodes.has(n.id) ? 1 : 0.2 },
+      }))
+    );
+    setEdges(
+      edges.map((e) => ({
         ...e,
         style: {
           ...e.style,
           opacity:
-            connectedNodes.has(e.source) && connectedNodes.has(e.target)
-              ? 1
-              : 0.2,
+            connectedNodes.has(e.source) && connectedNodes.has(e.target) ? 1 : 0.2,
         },
-      }));
-
-      setNodes(highlightedNodes);
-      setEdges(highlightedEdges);
-      setHighlightedNode(node.id);
-    }
-  };
-
-  const handleCommunityFilter = (communityIndex) => {
-    setSelectedCommunity(communityIndex);
-
-    if (communityIndex === "all") {
-      setNodes(originalNodes);
-      setEdges(originalEdges);
-      setHighlightedNode(null); // Reset highlight if any
-      return;
-    }
-
-    // Filter nodes and edges by selected community
-    const filteredNodes = originalNodes.filter(
-      (node) => communities[node.id] === parseInt(communityIndex)
+      }))
     );
-
-    const filteredNodeIds = new Set(filteredNodes.map((node) => node.id));
-
-    const filteredEdges = originalEdges.filter(
-      (edge) =>
-        filteredNodeIds.has(edge.source) && filteredNodeIds.has(edge.target)
-    );
-
-    setNodes(filteredNodes);
-    setEdges(filteredEdges);
-    setHighlightedNode(null); // Reset highlight if any
+    setHighlightedNode(node.id);
   };
 
   if (loading) {
@@ -191,9 +182,9 @@ const CommunityGraphComponent = () => {
           onChange={(e) => handleCommunityFilter(e.target.value)}
         >
           <option value="all">Show All Communities</option>
-          {[...new Set(Object.values(communities))].map((community, index) => (
-            <option key={index} value={community}>
-              Community {community + 1}
+          {quotient.nodes.map((community) => (
+            <option key={community.id} value={String(community.id)}>
+              Community {community.id} ({community.size} users)
             </option>
           ))}
         </select>
@@ -206,6 +197,7 @@ const CommunityGraphComponent = () => {
           edges={edges}
           onNodesChange={onNodesChange}
           onEdgesChange={onEdgesChange}
+          onNodeClick={handleNodeClick}
           onNodeDoubleClick={handleNodeDoubleClick}
           fitView
           minZoom={0.1}